@@ -0,0 +1,63 @@
+"""one membership per member and year
+
+Revision ID: 1e2cc93e9251
+Revises: 9ad3cc9087c5
+Create Date: 2025-06-16 09:41:05.127663
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "1e2cc93e9251"
+down_revision: Union[str, None] = "9ad3cc9087c5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Duplicates must be resolved by hand: which row is right (amount,
+    # payment) is not something a migration can decide
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                """
+                SELECT member_id, year, array_agg(id ORDER BY id)
+                FROM memberships
+                GROUP BY member_id, year
+                HAVING count(*) > 1
+                ORDER BY member_id, year
+                """
+            )
+        )
+        .all()
+    )
+    if duplicates:
+        listed = "\n".join(
+            f"  member {member_id}, year {year}: membership ids {ids}"
+            for member_id, year, ids in duplicates
+        )
+        raise RuntimeError(
+            f"{len(duplicates)} member(s) have several memberships for the "
+            f"same year; merge or delete them and run the migration again:\n"
+            f"{listed}"
+        )
+    # Build the index without blocking writes, then attach it as the constraint
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "
+            "uq_memberships_member_id_year ON memberships (member_id, year)"
+        )
+    op.execute(
+        "ALTER TABLE memberships ADD CONSTRAINT uq_memberships_member_id_year "
+        "UNIQUE USING INDEX uq_memberships_member_id_year"
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_memberships_member_id_year", "memberships", type_="unique")
@@ -0,0 +1,81 @@
+"""publish member and membership changes with NOTIFY
+
+Revision ID: 5f0c8d2a7b31
+Revises: 1e2cc93e9251
+Create Date: 2025-06-23 10:12:44.318205
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5f0c8d2a7b31"
+down_revision: Union[str, None] = "1e2cc93e9251"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of models.MEMBER_CHANGES_* at the time of this revision
+CHANNEL = "member_changes"
+ALL = "*"
+MAX_PAYLOAD = 4000
+# Table -> column holding the member id
+TABLES = {"members": "id", "memberships": "member_id"}
+# Trigger event -> transition tables it references
+EVENTS = {
+    "insert": "REFERENCING NEW TABLE AS new_rows",
+    "update": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "delete": "REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    # One notification per statement, listing the changed member ids
+    for table, column in TABLES.items():
+        op.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION notify_{table}_change() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            DECLARE
+                payload text;
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    SELECT string_agg(DISTINCT {column}::text, ',') INTO payload
+                    FROM new_rows;
+                ELSIF TG_OP = 'DELETE' THEN
+                    SELECT string_agg(DISTINCT {column}::text, ',') INTO payload
+                    FROM old_rows;
+                ELSE
+                    SELECT string_agg(DISTINCT {column}::text, ',') INTO payload
+                    FROM (
+                        SELECT {column} FROM old_rows
+                        UNION ALL
+                        SELECT {column} FROM new_rows
+                    ) AS changed;
+                END IF;
+                IF length(payload) > {MAX_PAYLOAD} THEN
+                    payload := '{ALL}';
+                END IF;
+                IF payload IS NOT NULL THEN
+                    PERFORM pg_notify('{CHANNEL}', payload);
+                END IF;
+                RETURN NULL;
+            END
+            $$
+            """
+        )
+        for event, referencing in EVENTS.items():
+            op.execute(
+                f"CREATE TRIGGER {table}_notify_{event} "
+                f"AFTER {event.upper()} ON {table} {referencing} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION notify_{table}_change()"
+            )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        for event in EVENTS:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_{event} ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS notify_{table}_change()")
@@ -0,0 +1,109 @@
+"""add members.row_version, bumped by triggers, for ETags
+
+Revision ID: 8c4e1f6b2d90
+Revises: 5f0c8d2a7b31
+Create Date: 2025-06-30 15:26:08.904117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8c4e1f6b2d90"
+down_revision: Union[str, None] = "5f0c8d2a7b31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of models.TRANSITION_TABLES at the time of this revision
+TRANSITION_TABLES = {
+    "insert": "REFERENCING NEW TABLE AS new_rows",
+    "update": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "delete": "REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE IF NOT EXISTS member_version_seq")
+    # The volatile default rewrites the table once, numbering existing rows,
+    # under an ACCESS EXCLUSIVE lock: members is unreadable until it is done
+    op.add_column(
+        "members",
+        sa.Column(
+            "row_version",
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text("nextval('member_version_seq')"),
+        ),
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_member_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.row_version := nextval('member_version_seq');
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER members_bump_version BEFORE UPDATE ON members "
+        "FOR EACH ROW EXECUTE FUNCTION bump_member_version()"
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_membership_member_version()
+        RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            member_ids bigint[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                SELECT array_agg(DISTINCT member_id) INTO member_ids
+                FROM new_rows;
+            ELSIF TG_OP = 'DELETE' THEN
+                SELECT array_agg(DISTINCT member_id) INTO member_ids
+                FROM old_rows;
+            ELSE
+                SELECT array_agg(DISTINCT member_id) INTO member_ids
+                FROM (
+                    SELECT member_id FROM old_rows
+                    UNION ALL
+                    SELECT member_id FROM new_rows
+                ) AS changed;
+            END IF;
+            -- Lock the members in id order, so that concurrent
+            -- statements cannot deadlock on them
+            PERFORM 1 FROM members WHERE id = ANY (member_ids)
+            ORDER BY id FOR UPDATE;
+            -- members_bump_version sets the new versions
+            UPDATE members SET row_version = row_version
+            WHERE id = ANY (member_ids);
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    # Once per statement, for the distinct members of the changed rows
+    for event, referencing in TRANSITION_TABLES.items():
+        op.execute(
+            f"CREATE TRIGGER memberships_bump_member_version_{event} "
+            f"AFTER {event.upper()} ON memberships {referencing} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION bump_membership_member_version()"
+        )
+
+
+def downgrade() -> None:
+    for event in TRANSITION_TABLES:
+        op.execute(
+            f"DROP TRIGGER IF EXISTS memberships_bump_member_version_{event} "
+            "ON memberships"
+        )
+    op.execute("DROP FUNCTION IF EXISTS bump_membership_member_version()")
+    op.execute("DROP TRIGGER IF EXISTS members_bump_version ON members")
+    op.execute("DROP FUNCTION IF EXISTS bump_member_version()")
+    op.drop_column("members", "row_version")
+    op.execute("DROP SEQUENCE IF EXISTS member_version_seq")
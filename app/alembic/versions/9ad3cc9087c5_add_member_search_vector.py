@@ -0,0 +1,63 @@
+"""add generated tsvector column for ranked member search
+
+Revision ID: 9ad3cc9087c5
+Revises: e24239d12d93
+Create Date: 2025-06-09 14:03:27.550914
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9ad3cc9087c5"
+down_revision: Union[str, None] = "e24239d12d93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of models.SEARCH_VECTOR_SQL at the time of this revision
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(first_name, '')), 'A')"
+    " || setweight(to_tsvector('simple', coalesce(last_name, '')), 'A')"
+    " || setweight(to_tsvector('simple', coalesce(organization, '')), 'B')"
+    " || setweight(to_tsvector('simple', coalesce(city, '')), 'B')"
+    " || setweight(to_tsvector('simple', coalesce(email, '')), 'C')"
+    " || setweight(to_tsvector('simple', coalesce(notes, '')), 'D')"
+)
+
+
+def upgrade() -> None:
+    # Adding a stored generated column rewrites the table once
+    op.add_column(
+        "members",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_SQL, persisted=True),
+            nullable=False,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_members_search_vector",
+            "members",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_members_search_vector",
+            table_name="members",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column("members", "search_vector")
@@ -0,0 +1,50 @@
+"""add pg_trgm GIN indexes for the member search endpoints
+
+Revision ID: e24239d12d93
+Revises: ba80acc221a9
+Create Date: 2025-06-02 10:12:41.318207
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e24239d12d93"
+down_revision: Union[str, None] = "ba80acc221a9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns searched with ilike('%term%'); must match models.TRIGRAM_SEARCH_COLUMNS
+TRIGRAM_SEARCH_COLUMNS = ("first_name", "last_name", "city", "full_name")
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction, and it
+    # keeps the members table writable while the indexes are built
+    with op.get_context().autocommit_block():
+        for column in TRIGRAM_SEARCH_COLUMNS:
+            op.create_index(
+                f"ix_members_{column}_trgm",
+                "members",
+                [column],
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for column in TRIGRAM_SEARCH_COLUMNS:
+            op.drop_index(
+                f"ix_members_{column}_trgm",
+                table_name="members",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    # The pg_trgm extension is left installed, other objects may use it
@@ -0,0 +1,395 @@
+# app/api/member_common.py
+
+"""
+The database-free part of the member and membership routes.
+
+The sync routers (`routes_member`, `routes_membership`) and their async
+versions serve the same paths with the same responses. Everything but
+running the statements lives here: the routers execute the statements
+built below, pass the results back, and differ only in awaiting them.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from datetime import datetime
+
+from api.member_json import (
+    MEMBER_LOOKUP_FIELDS,
+    MEMBER_RESPONSE_FIELDS,
+    count_query,
+    member_body,
+    member_document_query,
+    member_version_query,
+    page_document_query,
+    search_body,
+)
+from api.pagination import PageParams
+from api.responses import FastJSONResponse, conditional_response, etag_matches
+from cache import member_cache
+from fastapi import HTTPException, Response
+from models import Member, Membership
+from schemas import (
+    MemberCreate,
+    MemberResponse,
+    MembershipCreate,
+    MembershipResponse,
+    MemberUpdate,
+)
+from sqlalchemy import ColumnElement, Float, Select, cast, func, select
+from sqlalchemy.engine import Result, Row
+from sqlalchemy.orm import selectinload
+
+
+def contains(column, term: str) -> ColumnElement[bool]:
+    """
+    Case-insensitive substring match, served by the column's trigram index.
+
+    LIKE wildcards in the term are escaped, so they match literally and a
+    search for "%" or "_" does not degrade into a match on every row.
+
+    Args:
+        column: Member column with a gin_trgm_ops index
+        term (str): Text to look for anywhere in the column
+
+    Returns:
+        ColumnElement[bool]: Filter criterion
+    """
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return column.ilike(f"%{escaped}%", escape="\\")
+
+
+def prefix_tsquery(text: str) -> str | None:
+    """
+    Turn free text into a tsquery source where every word is a prefix.
+
+    Only word characters and the punctuation of e-mail addresses are
+    kept, so tsquery operators typed by the user cannot make it invalid.
+
+    Args:
+        text (str): Search box input, e.g. "anna virt"
+
+    Returns:
+        str | None: e.g. "anna:* & virt:*", None if no word is left
+    """
+    words = (word.strip(".-@") for word in re.findall(r"[\w@.-]+", text))
+    return " & ".join(f"{word}:*" for word in words if word) or None
+
+
+def search_rank(tsquery: ColumnElement) -> ColumnElement[float]:
+    """
+    Relevance of a member for a full-text search, as a pagination key.
+
+    ts_rank returns a float4, which the cursor carries back as a float8
+    that never equals it, so members of equal rank would be repeated or
+    skipped between pages. Casting to float8 makes the key exact.
+    """
+    return cast(func.ts_rank(Member.search_vector, tsquery), Float(53))
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag of a response body: a digest of its bytes."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def member_etag(kind: str, version: int) -> str:
+    """Strong ETag of a member document: its kind and the row version."""
+    return f'"{kind}-{version}"'
+
+
+@dataclass(frozen=True)
+class MemberSearch:
+    """
+    A paginated member search: its filter, sort keys and message.
+
+    The member documents, memberships included, are built by PostgreSQL
+    in one query and passed through as they are. Bodies are cached until
+    the next member or membership change, and their digest is the ETag:
+    while a page is cached, a client polling with If-None-Match gets a
+    304 without any query.
+    """
+
+    # What was searched, ends the message, e.g. "in city 'Oulu'"
+    text: str
+    criterion: ColumnElement[bool]
+    # Sort keys, the last one unique, see `member_json.page_document_query`
+    keys: tuple[ColumnElement, ...]
+    descending: bool = False
+
+    def cache_key(self, page: PageParams) -> tuple:
+        """
+        Search cache key of a page of results.
+
+        The text names both the search and its value; the page parameters
+        are the validated ones, so omitted and explicit default values
+        share a key.
+        """
+        return (self.text, page.limit, page.cursor, page.count)
+
+    def count_query(self) -> Select:
+        return count_query(self.criterion)
+
+    def page_query(self, page: PageParams) -> Select:
+        return page_document_query(self.criterion, self.keys, page, self.descending)
+
+    def body(self, rows, page: PageParams, total: int | None) -> bytes:
+        """Response body from the rows of `page_query` and the count."""
+        return search_body(self.text, rows, page, total)
+
+
+def search_response(body: bytes, if_none_match: str | None) -> Response:
+    """Search response with the body's ETag, or 304 Not Modified."""
+    return conditional_response(body, body_etag(body), if_none_match)
+
+
+def full_text_search(q: str) -> MemberSearch:
+    """
+    Ranked full-text search over names, organization, city, e-mail and
+    notes, most relevant first; every word matches as a prefix.
+
+    Raises:
+        HTTPException: 400 if `q` has no words.
+    """
+    terms = prefix_tsquery(q)
+    if terms is None:
+        raise HTTPException(status_code=400, detail="Search has no words")
+    tsquery = func.to_tsquery("simple", terms)
+    return MemberSearch(
+        f"matching '{q}'",
+        Member.search_vector.op("@@")(tsquery),
+        (search_rank(tsquery), Member.id),
+        descending=True,
+    )
+
+
+def full_name_search(name: str) -> MemberSearch:
+    return MemberSearch(
+        f"matching full name '{name}'",
+        contains(Member.full_name, name),
+        (Member.full_name, Member.id),
+    )
+
+
+def name_search(name: str) -> MemberSearch:
+    return MemberSearch(
+        f"matching name '{name}'",
+        contains(Member.first_name, name) | contains(Member.last_name, name),
+        (Member.full_name, Member.id),
+    )
+
+
+def city_search(city: str) -> MemberSearch:
+    return MemberSearch(
+        f"in city '{city}'", contains(Member.city, city), (Member.city, Member.id)
+    )
+
+
+def postal_code_search(postal_code: str) -> MemberSearch:
+    return MemberSearch(
+        f"with postal code {postal_code}",
+        Member.postal_code == postal_code,
+        (Member.postal_code, Member.id),
+    )
+
+
+def cacheable_reference(reference_number: str) -> int | None:
+    """Reference number as the member cache key, None if it is not a number."""
+    if reference_number.isascii() and reference_number.isdigit():
+        return int(reference_number)
+    return None
+
+
+@dataclass(frozen=True)
+class ReferenceLookup:
+    """
+    The document of the member with a reference number, in one of the
+    member cache's kinds.
+
+    The ETag is the member's row version, which the database changes
+    with every change of the member or of their memberships. A document
+    in the member cache is served, or revalidated, without any query.
+    Otherwise a conditional request first reads the row version alone,
+    through the reference number index (`version_query`), and the
+    document is only built (`document_query`) when the client's copy is
+    outdated.
+    """
+
+    reference_number: str
+    # Cache key of the document's fields, e.g. "lookup"
+    kind: str
+    fields: tuple[str, ...]
+    message: str
+
+    def cached(self) -> tuple[str, int] | None:
+        """The cached document and row version, None on a miss."""
+        key = cacheable_reference(self.reference_number)
+        if key is None:
+            return None
+        return member_cache.get_by_reference(self.kind, key)
+
+    def version_query(self) -> Select:
+        return member_version_query(Member.reference_number == self.reference_number)
+
+    def not_modified(
+        self, version: int | None, if_none_match: str | None
+    ) -> Response | None:
+        """
+        304 Not Modified if the client holds this row version, else None.
+
+        Raises:
+            HTTPException: 404 if no member has this reference number.
+        """
+        if version is None:
+            raise HTTPException(status_code=404, detail="Member not found")
+        etag = member_etag(self.kind, version)
+        if etag_matches(if_none_match, etag):
+            return conditional_response(b"", etag, if_none_match)
+        return None
+
+    def document_query(self) -> Select:
+        return member_document_query(
+            Member.reference_number == self.reference_number, self.fields
+        )
+
+    def store(self, row: Row | None, generation: int) -> tuple[str, int]:
+        """
+        Put a row of `document_query` in the member cache.
+
+        Args:
+            row (Row | None): The row, None if there was none
+            generation (int): Member cache generation read before the query
+
+        Returns:
+            tuple: The member document and the member's row version
+
+        Raises:
+            HTTPException: 404 if no member has this reference number.
+        """
+        if row is None:
+            raise HTTPException(status_code=404, detail="Member not found")
+        document, member_id, reference, version = row
+        member_cache.put(self.kind, member_id, reference, document, version, generation)
+        return document, version
+
+    def response(
+        self, document: str, version: int, if_none_match: str | None
+    ) -> Response:
+        """Message and member document, or 304 Not Modified."""
+        return conditional_response(
+            member_body(self.message, document),
+            member_etag(self.kind, version),
+            if_none_match,
+        )
+
+
+def member_lookup(reference_number: str) -> ReferenceLookup:
+    """GET /members/search/{reference_number}: the smaller lookup document."""
+    return ReferenceLookup(
+        reference_number,
+        "lookup",
+        MEMBER_LOOKUP_FIELDS,
+        f"Member {reference_number} and their memberships fetched successfully.",
+    )
+
+
+def reference_search(reference_number: str) -> ReferenceLookup:
+    """GET /members/search/reference/{reference_number}: the full member."""
+    return ReferenceLookup(
+        reference_number,
+        "member",
+        MEMBER_RESPONSE_FIELDS,
+        f"Member with reference number {reference_number} found.",
+    )
+
+
+def member_query(criterion: ColumnElement[bool]) -> Select:
+    """
+    Select members with their memberships, reloading members already in
+    the session.
+
+    An async session cannot lazy-load, so the memberships every response
+    includes are loaded up front, with one extra query per statement.
+    """
+    return (
+        select(Member)
+        .options(selectinload(Member.memberships))
+        .where(criterion)
+        .execution_options(populate_existing=True)
+    )
+
+
+def one_member(result: Result) -> Member:
+    """
+    The member of an executed `member_query`.
+
+    Raises:
+        HTTPException: 404 if no member matched.
+    """
+    member = result.scalars().first()
+    if not member:
+        raise HTTPException(status_code=404, detail="Member not found")
+    return member
+
+
+def new_member(member_in: MemberCreate, with_membership: bool = False) -> Member:
+    """
+    Build a member to insert, with an unpaid membership for the current
+    year when `with_membership` is set, inserted in the same transaction.
+    """
+    member = Member(**member_in.model_dump())
+    if with_membership:
+        member.memberships.append(
+            Membership(
+                year=datetime.now().year,
+                amount=0,
+                is_paid=False,
+                discounted=False,
+            )
+        )
+    return member
+
+
+def update_fields(member: Member, updates: MemberUpdate):
+    """Set the fields sent in a MemberUpdate on the member."""
+    for key, value in updates.model_dump(exclude_unset=True).items():
+        setattr(member, key, value)
+
+
+def member_response(
+    message: str, member: Member, status_code: int = 200
+) -> FastJSONResponse:
+    return FastJSONResponse(
+        status_code=status_code,
+        content={"message": message, "member": MemberResponse.model_validate(member)},
+    )
+
+
+def deleted_response(member_id: int) -> dict:
+    return {"message": f"Member with ID {member_id} was deleted successfully."}
+
+
+def new_membership(member_id: int, membership_in: MembershipCreate) -> Membership:
+    """Build a membership to insert; the payment flags follow from the amount."""
+    return Membership(
+        member_id=member_id,
+        year=membership_in.year,
+        amount=membership_in.amount,
+    )
+
+
+def membership_conflict(member_id: int, year: int) -> HTTPException:
+    """409 for a membership year the member already has."""
+    return HTTPException(
+        status_code=409,
+        detail=f"Member {member_id} already has a membership for {year}",
+    )
+
+
+def membership_response(member_id: int, membership: Membership) -> FastJSONResponse:
+    return FastJSONResponse(
+        status_code=201,
+        content={
+            "message": f"Membership for year {membership.year} created for member ID {member_id}.",
+            "membership": MembershipResponse.model_validate(membership),
+        },
+    )
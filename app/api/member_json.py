@@ -0,0 +1,213 @@
+# app/api/member_json.py
+
+"""
+Member documents assembled by PostgreSQL.
+
+The read endpoints return members with their memberships. Instead of
+loading ORM objects, validating them with Pydantic and serializing them
+again, PostgreSQL builds each member's JSON document with
+json_build_object, aggregating the memberships with json_agg over a
+single join, and the API passes the text through into the response body.
+The documents have the fields and order of `schemas.MemberResponse`.
+"""
+
+import json
+
+from api.pagination import PageParams, decode_cursor, encode_cursor
+from models import Member, Membership
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    Text,
+    cast,
+    func,
+    literal_column,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+# Fields of schemas.MemberResponse, in its order
+MEMBER_RESPONSE_FIELDS = (
+    "first_name",
+    "last_name",
+    "city",
+    "email",
+    "street_address",
+    "postal_code",
+    "phone",
+    "notes",
+    "organization",
+    "no_postal_mail",
+    "id",
+    "reference_number",
+)
+# Fields of the member returned by GET /members/search/{reference_number}
+MEMBER_LOOKUP_FIELDS = (
+    "id",
+    "first_name",
+    "last_name",
+    "email",
+    "city",
+    "postal_code",
+    "notes",
+    "reference_number",
+    "no_postal_mail",
+)
+MEMBERSHIP_FIELDS = ("year", "amount", "is_paid", "discounted")
+
+memberships = Membership.__table__
+
+
+def _json_object(columns, fields: tuple[str, ...], *extra) -> ColumnElement:
+    pairs = []
+    for field in fields:
+        pairs += [literal_column(f"'{field}'"), columns[field]]
+    return func.json_build_object(*pairs, *extra)
+
+
+def _document(columns, fields: tuple[str, ...]) -> ColumnElement[str]:
+    """
+    JSON text of a member and its memberships (oldest first), for rows
+    of `columns` left-joined to memberships and grouped by member.
+    """
+    membership = _json_object(memberships.c, MEMBERSHIP_FIELDS)
+    aggregated = func.coalesce(
+        func.json_agg(aggregate_order_by(membership, memberships.c.year)).filter(
+            memberships.c.id.is_not(None)
+        ),
+        literal_column("'[]'::json"),
+    )
+    return cast(
+        _json_object(columns, fields, literal_column("'memberships'"), aggregated),
+        Text,
+    )
+
+
+def member_document_query(
+    criterion: ColumnElement[bool], fields: tuple[str, ...] = MEMBER_RESPONSE_FIELDS
+) -> Select:
+    """
+    Select the JSON document of the members matching `criterion`.
+
+    Args:
+        criterion: Filter on Member columns, e.g. on the reference number
+        fields (tuple): Member fields of the document
+
+    Returns:
+        Select: One row per member: its document as text, id, reference
+            number and row version
+    """
+    members = Member.__table__
+    return (
+        select(
+            _document(members.c, fields),
+            members.c.id,
+            members.c.reference_number,
+            members.c.row_version,
+        )
+        .select_from(
+            members.outerjoin(memberships, memberships.c.member_id == members.c.id)
+        )
+        .where(criterion)
+        .group_by(members.c.id)
+    )
+
+
+def member_version_query(criterion: ColumnElement[bool]) -> Select:
+    """Select the row version of the members matching `criterion`, alone."""
+    return select(Member.row_version).where(criterion)
+
+
+def page_document_query(
+    criterion: ColumnElement[bool],
+    keys: tuple[ColumnElement, ...],
+    params: PageParams,
+    descending: bool = False,
+) -> Select:
+    """
+    Select the documents of one page of members, keyset-paginated.
+
+    Members are ordered by `keys` and the page starts right after the
+    cursor's key values. The last key must be unique (normally the
+    primary key) so that the order is total, and no key may be NULL in
+    the matching rows. The page, plus one row telling whether another
+    follows, is chosen first from members alone, so the memberships are
+    only joined for the members returned.
+
+    Returns:
+        Select: Rows of (document text, *key values) in page order
+    """
+    page = select(
+        *(getattr(Member, field) for field in MEMBER_RESPONSE_FIELDS),
+        *(key.label(f"key_{i}") for i, key in enumerate(keys)),
+    ).where(criterion)
+    if params.cursor:
+        types = tuple(key.type.python_type for key in keys)
+        after = tuple_(*decode_cursor(params.cursor, types))
+        page = page.where(
+            tuple_(*keys) < after if descending else tuple_(*keys) > after
+        )
+    order_by = [key.desc() for key in keys] if descending else keys
+    page = page.order_by(*order_by).limit(params.limit + 1).subquery("page")
+
+    page_keys = [page.c[f"key_{i}"] for i in range(len(keys))]
+    return (
+        select(_document(page.c, MEMBER_RESPONSE_FIELDS), *page_keys)
+        .select_from(page.outerjoin(memberships, memberships.c.member_id == page.c.id))
+        .group_by(*page.c)
+        .order_by(*(key.desc() if descending else key for key in page_keys))
+    )
+
+
+def count_query(criterion: ColumnElement[bool]) -> Select:
+    return select(func.count()).select_from(Member).where(criterion)
+
+
+def _json(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False).encode()
+
+
+def search_body(
+    criterion: str, rows, params: PageParams, total: int | None = None
+) -> bytes:
+    """
+    Build the body of a paginated search response around the documents.
+
+    The fields of every paginated member search: message, results,
+    next_cursor and total.
+
+    Args:
+        criterion (str): What was searched, ends the message
+        rows: Rows of `page_document_query`
+        params (PageParams): Limit of the page
+        total (int | None): Count of all matching members, if asked for
+
+    Returns:
+        bytes: JSON response body
+    """
+    documents = [row[0] for row in rows[: params.limit]]
+    next_cursor = None
+    if len(rows) > params.limit:
+        next_cursor = encode_cursor(tuple(rows[params.limit - 1][1:]))
+    found = total if total is not None else len(documents)
+    return b"".join(
+        [
+            b'{"message":',
+            _json(f"Found {found} member(s) {criterion}."),
+            b',"results":[',
+            ",".join(documents).encode(),
+            b'],"next_cursor":',
+            _json(next_cursor),
+            b',"total":',
+            _json(total),
+            b"}",
+        ]
+    )
+
+
+def member_body(message: str, document: str) -> bytes:
+    """Body of a single-member response: message and member document."""
+    return b"".join(
+        [b'{"message":', _json(message), b',"member":', document.encode(), b"}"]
+    )
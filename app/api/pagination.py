@@ -0,0 +1,78 @@
+# app/api/pagination.py
+
+"""
+Keyset (seek) pagination for the search endpoints.
+
+Results are ordered by (sort key, id) and each page starts right after
+the last row of the previous one, which the client passes back as an
+opaque cursor. Unlike OFFSET, a deep page costs the same as the first
+one, and rows inserted meanwhile do not shift the pages.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Query
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+@dataclass
+class PageParams:
+    limit: int = DEFAULT_LIMIT
+    cursor: str | None = None
+    count: bool = False
+
+
+def page_params(
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    count: bool = Query(False, description="Also count all matching rows"),
+) -> PageParams:
+    """FastAPI dependency reading the pagination query parameters."""
+    return PageParams(limit=limit, cursor=cursor, count=count)
+
+
+def encode_cursor(values: tuple) -> str:
+    payload = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def _is_key_value(value, expected: type) -> bool:
+    """Whether a decoded cursor value can be compared with a key of a type."""
+    if expected is float:
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if expected is str:
+        # PostgreSQL text cannot hold NUL characters
+        return isinstance(value, str) and "\x00" not in value
+    return type(value) is expected
+
+
+def decode_cursor(cursor: str, types: tuple[type, ...]) -> tuple:
+    """
+    Decode a cursor made by `encode_cursor`.
+
+    Args:
+        cursor (str): Cursor sent by the client
+        types (tuple[type, ...]): Python type of each sort key, e.g.
+            (str, int), for a tampered cursor not to reach the database
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed, of another length
+            or holds a value of another type than its key.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or not all(map(_is_key_value, values, types))
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return tuple(values)
@@ -0,0 +1,162 @@
+# app/api/responses.py
+
+"""
+Response classes shared by the API routes.
+"""
+
+import re
+from typing import Any
+from urllib.parse import quote
+
+from pydantic import TypeAdapter
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+_SINGLE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Serializes any value pydantic-core knows, models included, by inference
+_json_adapter = TypeAdapter(Any)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an entity tag (weak comparison).
+
+    Args:
+        if_none_match (str | None): Header value from the request
+        etag (str): Quoted entity tag of the current representation
+
+    Returns:
+        bool: True if the client already holds this representation
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in tags
+
+
+def conditional_response(
+    body: bytes,
+    etag: str,
+    if_none_match: str | None,
+    media_type: str = "application/json",
+) -> Response:
+    """
+    Respond with `body` and its ETag, or 304 if the client holds it.
+
+    Clients revalidate on every use (no-cache), so a changed resource is
+    never served from their cache.
+
+    Args:
+        body (bytes): Response body, unused for a 304
+        etag (str): Quoted strong entity tag of the body
+        if_none_match (str | None): If-None-Match header of the request
+
+    Returns:
+        Response: 200 with the body, or 304 Not Modified
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response serialized in a single pass by pydantic-core.
+
+    The content may hold Pydantic models, dates, decimals and the like:
+    they are written straight to JSON bytes, without the intermediate
+    dicts of `model_dump()` and the second pass of `json.dumps` that
+    `JSONResponse` makes.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return _json_adapter.dump_json(content)
+
+
+def content_disposition(filename: str, disposition_type: str = "attachment") -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition_type}; filename*=utf-8''{quoted}"
+    return f'{disposition_type}; filename="{filename}"'
+
+
+class BytesRangeResponse(Response):
+    """
+    In-memory response honouring single byte-range requests.
+
+    A satisfiable `Range: bytes=...` gives a 206 with the requested slice,
+    an unsatisfiable one a 416. Multiple ranges and malformed headers get
+    the whole body, as RFC 9110 allows. An `If-Range` that does not match
+    the ETag also gets the whole body, so a resumed download never mixes
+    two versions of the content.
+    """
+
+    def __init__(
+        self,
+        content: bytes,
+        status_code: int = 200,
+        headers: dict[str, str] | None = None,
+        media_type: str | None = None,
+        filename: str | None = None,
+        content_disposition_type: str = "attachment",
+    ):
+        super().__init__(content, status_code, headers, media_type)
+        self.headers.setdefault("accept-ranges", "bytes")
+        if filename is not None:
+            self.headers.setdefault(
+                "content-disposition",
+                content_disposition(filename, content_disposition_type),
+            )
+
+    def _requested_range(self, scope: Scope) -> tuple[int, int] | None | bool:
+        """
+        Return the (start, end) slice to send, None for the whole body, or
+        False if the range cannot be satisfied.
+        """
+        request_headers = Headers(scope=scope)
+        http_range = request_headers.get("range")
+        if http_range is None or self.status_code != 200:
+            return None
+        if_range = request_headers.get("if-range")
+        if if_range is not None and if_range != self.headers.get("etag"):
+            return None
+        match = _SINGLE_RANGE.match(http_range.strip().lower())
+        if match is None or match.groups() == ("", ""):
+            return None
+
+        size = len(self.body)
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last) + 1, size) if last else size
+            if start >= size or end <= start:
+                return False
+        else:
+            suffix = int(last)
+            if suffix == 0 or size == 0:
+                return False
+            start, end = max(size - suffix, 0), size
+        return start, end
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        requested = self._requested_range(scope)
+        if requested is False:
+            response = Response(
+                status_code=416,
+                headers={"content-range": f"bytes */{len(self.body)}"},
+            )
+            return await response(scope, receive, send)
+        if requested is not None:
+            start, end = requested
+            self.headers["content-range"] = f"bytes {start}-{end - 1}/{len(self.body)}"
+            self.headers["content-length"] = str(end - start)
+            self.body = self.body[start:end]
+            self.status_code = 206
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,242 @@
+# File: app/api/routes_bulk.py
+
+"""
+Routes for bulk operations on members: import, export and payments.
+
+Uploads are sent as the raw request body (text/csv or
+application/x-ndjson). The body is spooled to a temporary file as it
+arrives, so large files never sit in memory, then imported in batches
+in the threadpool.
+"""
+
+import tempfile
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import BinaryIO
+
+from bulk.export import (
+    EXPORT_FORMATS,
+    EXPORT_LAYOUTS,
+    MEDIA_TYPES,
+    export_query,
+    stream_export,
+)
+from bulk.members import import_members
+from bulk.memberships import count_outcomes, upsert_memberships
+from bulk.payments import (
+    STATEMENT_FORMATS,
+    read_payments,
+    reconcile_payments,
+    statement_format,
+)
+from bulk.readers import FORMATS, detect_format, read_rows
+from cache import members_changed
+from config import settings
+from database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from schemas import MembershipBulkUpsert
+from sqlalchemy.orm import Session
+
+router = APIRouter(prefix="/members", tags=["bulk"])
+
+# Upload bytes kept in memory before spooling to disk
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+@asynccontextmanager
+async def spool_body(request: Request) -> AsyncIterator[BinaryIO]:
+    """
+    Copy the request body into a temporary file, chunk by chunk.
+
+    The file is closed on leaving the context, also when reading the
+    body fails, e.g. because the client disconnected.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        yield spool
+
+
+def upload_format(request: Request, format: str | None) -> str:
+    """
+    Resolve the upload format from the query string or the content type.
+
+    Raises:
+        HTTPException: 415 if it is neither CSV nor NDJSON.
+    """
+    fmt = format or detect_format(request.headers.get("content-type"))
+    if fmt not in FORMATS:
+        raise HTTPException(
+            status_code=415,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=",
+        )
+    return fmt
+
+
+@router.post("/import")
+async def import_members_upload(
+    request: Request,
+    format: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk import members from a CSV or NDJSON upload.
+
+    CSV needs a header line with the `MemberCreate` field names. Rows are
+    validated against `MemberCreate`; invalid rows and already registered
+    e-mail addresses are reported by line and do not stop the import.
+
+    Args:
+        request (Request): Upload in the request body.
+        format (str | None): "csv" or "ndjson", overrides the content type.
+        db (Session): SQLAlchemy DB session (injected).
+
+    Returns:
+        JSONResponse: Inserted and rejected counts, and the row errors.
+    """
+    fmt = upload_format(request, format)
+    async with spool_body(request) as spool:
+        report = await run_in_threadpool(
+            import_members,
+            db,
+            read_rows(spool, fmt),
+            settings.BULK_IMPORT_BATCH_SIZE,
+        )
+    members_changed()
+    return JSONResponse(
+        status_code=200,
+        content={
+            "message": f"Imported {report.inserted} member(s), "
+            f"rejected {report.rejected} row(s).",
+            **report.to_dict(max_errors=settings.BULK_IMPORT_MAX_REPORTED_ERRORS),
+        },
+    )
+
+
+@router.post("/memberships/bulk")
+def bulk_upsert_memberships(
+    payload: MembershipBulkUpsert, db: Session = Depends(get_db)
+):
+    """
+    Record many memberships, e.g. a season's payments, in one transaction.
+
+    Each row names its member by id or reference number. Existing
+    memberships of the same year are updated; is_paid and discounted are
+    computed from the amount as for a single membership.
+
+    Args:
+        payload (MembershipBulkUpsert): Up to 10 000 (member, year, amount) rows.
+        db (Session): SQLAlchemy DB session (injected).
+
+    Returns:
+        JSONResponse: Outcome counts and the outcome of every row.
+    """
+    results = upsert_memberships(db, payload.memberships)
+    db.commit()
+    members_changed(
+        *{result.member_id for result in results if result.member_id is not None}
+    )
+    return JSONResponse(
+        status_code=200,
+        content={
+            "message": f"Processed {len(results)} membership(s).",
+            "counts": count_outcomes(results),
+            "results": [result.to_dict() for result in results],
+        },
+    )
+
+
+@router.post("/payments/reconcile")
+async def reconcile_bank_statement(
+    request: Request,
+    year: int | None = None,
+    format: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Record the payments of a bank statement as membership amounts.
+
+    Payments are matched to members by reference number. The statement is
+    a CSV export (text/csv) or camt.053 XML (application/xml) in the body.
+
+    Args:
+        request (Request): Statement in the request body.
+        year (int | None): Membership year paid for, defaults to this year.
+        format (str | None): "csv" or "camt053", overrides the content type.
+        db (Session): SQLAlchemy DB session (injected).
+
+    Returns:
+        JSONResponse: Outcome counts, and the unmatched, duplicate,
+            lower and invalid payments.
+    """
+    fmt = format or statement_format(request.headers.get("content-type"))
+    if fmt not in STATEMENT_FORMATS:
+        raise HTTPException(
+            status_code=415,
+            detail="Send text/csv or application/xml, or pass ?format=",
+        )
+    year = year or datetime.now().year
+    async with spool_body(request) as spool:
+        try:
+            report = await run_in_threadpool(
+                reconcile_payments,
+                db,
+                read_payments(spool, fmt),
+                year,
+                settings.BULK_IMPORT_BATCH_SIZE,
+            )
+        except (ValueError, SyntaxError) as e:
+            # Unreadable statement: missing CSV columns or malformed XML
+            db.rollback()
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception:
+            # The statement is one transaction: nothing of it was recorded
+            db.rollback()
+            raise
+    # The report does not list the members the payments were for
+    members_changed()
+    return JSONResponse(
+        status_code=200,
+        content={
+            "message": f"Reconciled {report.payments} payment(s) for {year}.",
+            **report.to_dict(),
+        },
+    )
+
+
+@router.get("/export")
+def export_members(
+    format: str = Query("csv", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+    layout: str = Query("flat", pattern=f"^({'|'.join(EXPORT_LAYOUTS)})$"),
+    year: int | None = None,
+    is_paid: bool | None = None,
+    city: str | None = None,
+):
+    """
+    Stream all members and their memberships as CSV or NDJSON.
+
+    Rows are read from a server-side cursor and written as they come, so
+    memory use does not grow with the number of members.
+
+    Args:
+        format (str): "csv" or "ndjson".
+        layout (str): "flat" for one row per membership, "nested" for one
+            row per member with their memberships.
+        year (int | None): Only memberships of this year.
+        is_paid (bool | None): Only paid or only unpaid memberships.
+        city (str | None): Only members in this city.
+
+    Returns:
+        StreamingResponse: The export, as a file download.
+    """
+    stmt = export_query(year=year, is_paid=is_paid, city=city)
+    filename = f"members_{datetime.now():%Y%m%d}.{format}"
+    return StreamingResponse(
+        stream_export(stmt, format, layout),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,276 @@
+# File: app/api/routes_letters.py
+
+"""
+Routes for welcome letter generation.
+
+Letters are rendered by background jobs; the routes only queue work and
+report on it, so a burst of requests never ties up the API threadpool.
+A single letter can also be rendered in memory and returned directly.
+"""
+
+import asyncio
+from concurrent.futures import Future
+from pathlib import Path
+
+from api.responses import BytesRangeResponse, etag_matches
+from config import settings
+from database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, Response
+from models import Member, Membership
+from pdf.cache import letter_cache, render_key
+from pdf.generate_welcome_letter import (
+    letter_context,
+    letter_filename,
+    render_letter,
+    render_letter_bytes,
+    renderer,
+)
+from pdf.jobs import Job, JobState, letter_jobs
+from pdf.print_run import print_run_job
+from sqlalchemy.orm import Session, joinedload
+
+router = APIRouter(prefix="/members", tags=["letters"])
+
+LETTERS_DIR = Path("output/letters")
+
+
+def get_job_or_404(job_id: str) -> Job:
+    job = letter_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+async def rendered(future: Future):
+    """
+    Await a render of the job pool without blocking a thread.
+
+    Raises:
+        HTTPException: 504 if it takes longer than LETTER_RENDER_TIMEOUT.
+    """
+    try:
+        return await asyncio.wait_for(
+            asyncio.wrap_future(future), settings.LETTER_RENDER_TIMEOUT
+        )
+    except TimeoutError:
+        raise HTTPException(status_code=504, detail="Letter rendering timed out")
+
+
+def get_letter_membership(member_id: int, db: Session) -> tuple[Member, Membership]:
+    """
+    Look up a member and the latest membership their letter is about.
+
+    Raises:
+        HTTPException: 404 if the member does not exist, 400 without memberships.
+    """
+    member = (
+        db.query(Member)
+        .options(joinedload(Member.memberships))
+        .filter(Member.id == member_id)
+        .first()
+    )
+    if not member:
+        raise HTTPException(status_code=404, detail="Member not found")
+
+    if not member.memberships:
+        raise HTTPException(status_code=400, detail="Member has no memberships")
+
+    return member, max(member.memberships, key=lambda m: m.year)
+
+
+@router.post(
+    "/members/{member_id}/generate_welcome_letter",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def generate_letter(member_id: int, db: Session = Depends(get_db)):
+    """
+    Queue the generation of a PDF welcome letter for a given member.
+
+    Repeated requests for a member whose letter is still being rendered
+    return the same job.
+
+    Args:
+        member_id (int): ID of the member.
+        db (Session): SQLAlchemy database session.
+
+    Returns:
+        JSONResponse: Job id and the URL to poll for its state.
+    """
+    member, membership = get_letter_membership(member_id, db)
+
+    job = letter_jobs.submit(
+        f"welcome_letter:{member.id}",
+        render_letter,
+        letter_context(member, membership),
+        LETTERS_DIR,
+    )
+    return JSONResponse(
+        status_code=202,
+        content={
+            "message": "PDF generation queued",
+            **job.to_dict(),
+            "status_url": f"/members/letter_jobs/{job.id}",
+        },
+    )
+
+
+@router.get("/members/{member_id}/welcome_letter.pdf")
+async def download_welcome_letter(
+    member_id: int,
+    request: Request,
+    save: bool = False,
+    inline: bool = False,
+    db: Session = Depends(get_db),
+):
+    """
+    Render the welcome letter of a member and return the PDF itself.
+
+    The ETag is the render cache key, so a client holding the current
+    letter gets a 304 without any rendering. A letter already cached on
+    disk is served from its file; otherwise it is rendered in memory by
+    the job pool and nothing is written, unless `save` is set. Both
+    paths answer Range requests. The handler awaits the render on the
+    event loop, so slow renders never hold threadpool threads, and gives
+    up with a 504 after LETTER_RENDER_TIMEOUT seconds.
+
+    Args:
+        member_id (int): ID of the member.
+        request (Request): Incoming request, for the conditional headers.
+        save (bool): Also write the letter to the letters directory.
+        inline (bool): Ask the browser to display the PDF, not download it.
+        db (Session): SQLAlchemy database session.
+
+    Returns:
+        Response: The PDF, or 304 Not Modified.
+    """
+    member, membership = await run_in_threadpool(get_letter_membership, member_id, db)
+    context = letter_context(member, membership)
+    filename = letter_filename(context)
+    key = render_key(context, renderer.sources)
+    etag = f'"{key}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    disposition = "inline" if inline else "attachment"
+    path = None
+    if settings.LETTER_CACHE_ENABLED:
+        path = await run_in_threadpool(letter_cache(LETTERS_DIR).lookup, filename, key)
+    if path is None and save:
+        path = await rendered(letter_jobs.call(render_letter, context, LETTERS_DIR))
+    if path is not None:
+        return FileResponse(
+            path,
+            headers=headers,
+            media_type="application/pdf",
+            filename=filename,
+            content_disposition_type=disposition,
+        )
+
+    content = await rendered(letter_jobs.call(render_letter_bytes, context))
+    return BytesRangeResponse(
+        content,
+        headers=headers,
+        media_type="application/pdf",
+        filename=filename,
+        content_disposition_type=disposition,
+    )
+
+
+@router.get("/letter_jobs/{job_id}")
+def get_letter_job(job_id: str):
+    """
+    Report the state of a letter job.
+
+    Args:
+        job_id (str): Id returned when the job was queued.
+
+    Returns:
+        dict: Job state, error if it failed, and the download URLs once done.
+    """
+    job = get_job_or_404(job_id)
+    content = job.to_dict()
+    if job.state is JobState.DONE and job.result:
+        download_url = f"/members/letter_jobs/{job.id}/download"
+        content["files"] = [
+            {"path": str(path), "download_url": f"{download_url}?volume={number}"}
+            for number, path in enumerate(job.result.paths, start=1)
+        ]
+        content["path"] = str(job.result.paths[0])
+        content["download_url"] = download_url
+    return content
+
+
+@router.get("/letter_jobs/{job_id}/download")
+def download_letter_job(job_id: str, volume: int = Query(1, ge=1)):
+    """
+    Download a PDF produced by a finished letter job.
+
+    Args:
+        job_id (str): Id returned when the job was queued.
+        volume (int): Which file to download when the job produced several.
+
+    Returns:
+        FileResponse: The generated PDF.
+
+    Raises:
+        HTTPException: 404 if the job or volume is unknown, 409 if it has no PDF yet.
+    """
+    job = get_job_or_404(job_id)
+    if job.state is not JobState.DONE or job.result is None:
+        raise HTTPException(
+            status_code=409, detail=f"Job is {job.status.value}, no PDF available"
+        )
+    if volume > len(job.result.paths):
+        raise HTTPException(status_code=404, detail="Volume not found")
+    path = job.result.paths[volume - 1]
+    return FileResponse(path, media_type="application/pdf", filename=path.name)
+
+
+@router.post("/letters/print_run", status_code=status.HTTP_202_ACCEPTED)
+def start_print_run(
+    year: int | None = None,
+    city: str | None = None,
+    postal_code_from: str | None = None,
+    postal_code_to: str | None = None,
+    volume_size: int = Query(0, ge=0),
+):
+    """
+    Queue a print run: unpaid-membership letters merged into large PDFs.
+
+    Members who opted out of postal mail are skipped and letters are sorted
+    by postal code, as the bulk postal rate requires.
+
+    Args:
+        year (int | None): Only memberships of this year.
+        city (str | None): Only members in this city.
+        postal_code_from (str | None): Lowest postal code, inclusive.
+        postal_code_to (str | None): Highest postal code, inclusive.
+        volume_size (int): Letters per PDF, 0 for one single PDF.
+
+    Returns:
+        JSONResponse: Job id and the URL to poll for its state.
+    """
+    filters = {
+        "year": year,
+        "city": city,
+        "postal_code_from": postal_code_from,
+        "postal_code_to": postal_code_to,
+    }
+    job = letter_jobs.submit(
+        f"print_run:{sorted(filters.items())}:{volume_size}",
+        print_run_job,
+        filters,
+        volume_size,
+    )
+    return JSONResponse(
+        status_code=202,
+        content={
+            "message": "Print run queued",
+            **job.to_dict(),
+            "status_url": f"/members/letter_jobs/{job.id}",
+        },
+    )
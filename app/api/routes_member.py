@@ -2,188 +2,261 @@
 
 """
 Routes for member-related search and query operations.
-"""
 
-from datetime import datetime
-from pathlib import Path
+The statements and responses are built by `api.member_common`, shared
+with the async routes of `api.routes_member_async`.
+"""
 
+from api.member_common import (
+    MemberSearch,
+    ReferenceLookup,
+    city_search,
+    deleted_response,
+    full_name_search,
+    full_text_search,
+    member_lookup,
+    member_query,
+    member_response,
+    name_search,
+    new_member,
+    one_member,
+    postal_code_search,
+    reference_search,
+    search_response,
+    update_fields,
+)
+from api.pagination import PageParams, page_params
+from api.responses import FastJSONResponse
+from cache import member_cache, members_changed, search_cache
 from database import get_db
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
-from models import Member, Membership
-from pdf.generate_welcome_letter import generate_pdf
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from models import Member
 from schemas import MemberCreate, MemberResponse, MemberUpdate
+from sqlalchemy import ColumnElement
 from sqlalchemy.orm import Session
 
-router = APIRouter(prefix="/members", tags=["members"])
+router = APIRouter(
+    prefix="/members", tags=["members"], default_response_class=FastJSONResponse
+)
+
+
+def get_member(db: Session, criterion: ColumnElement[bool]) -> Member:
+    """
+    Fetch one member with memberships, reloading it if already in the session.
+
+    Raises:
+        HTTPException: 404 if no member matches.
+    """
+    return one_member(db.execute(member_query(criterion)))
+
+
+def search_documents(
+    db: Session,
+    search: MemberSearch,
+    page: PageParams,
+    if_none_match: str | None = None,
+) -> Response:
+    """
+    Build the response of a paginated member search.
+
+    Args:
+        search (MemberSearch): Filter, sort keys and message of the search
+        page (PageParams): limit, cursor and count query parameters
+        if_none_match (str | None): If-None-Match header of the request
+
+    Returns:
+        Response: Message, members of the page and pagination fields, or
+            304 Not Modified
+    """
+
+    def query() -> bytes:
+        total = None
+        if page.count:
+            total = db.execute(search.count_query()).scalar_one()
+        rows = db.execute(search.page_query(page)).all()
+        return search.body(rows, page, total)
+
+    body = search_cache.get_or_compute(search.cache_key(page), query)
+    return search_response(body, if_none_match)
+
+
+def reference_response(
+    db: Session, lookup: ReferenceLookup, if_none_match: str | None
+) -> Response:
+    """
+    Respond with the document of the member with a reference number.
+
+    Args:
+        lookup (ReferenceLookup): Reference number and document kind
+        if_none_match (str | None): If-None-Match header of the request
+
+    Returns:
+        Response: Message and member document, or 304 Not Modified
+
+    Raises:
+        HTTPException: 404 if no member has this reference number.
+    """
+    cached = lookup.cached()
+    if cached is None and if_none_match:
+        version = db.execute(lookup.version_query()).scalar()
+        not_modified = lookup.not_modified(version, if_none_match)
+        if not_modified is not None:
+            return not_modified
+    if cached is None:
+        generation = member_cache.generation
+        row = db.execute(lookup.document_query()).first()
+        cached = lookup.store(row, generation)
+    return lookup.response(*cached, if_none_match)
+
+
+@router.get("/search")
+def search_members(
+    q: str = Query(..., min_length=1, max_length=200),
+    page: PageParams = Depends(page_params),
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Ranked full-text search over names, organization, city, e-mail and notes.
+
+    Every word of `q` matches as a prefix, so the endpoint suits type-ahead.
+    Members are ordered by relevance, names weighing most and notes least.
+
+    Args:
+        q (str): Words to search for.
+        page (PageParams): limit, cursor and count query parameters.
+        if_none_match (str | None): ETag of the page the client holds.
+
+    Returns:
+        dict: One page of matching members and the cursor of the next one.
+    """
+    return search_documents(db, full_text_search(q), page, if_none_match)
 
 
 @router.get("/search/{reference_number}")
-def get_member_by_reference(reference_number: str, db: Session = Depends(get_db)):
+def get_member_by_reference(
+    reference_number: str,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
     """
     Fetch a member and their memberships by reference number.
 
     Args:
         reference_number (str): Unique reference number of the member.
+        if_none_match (str | None): ETag of the copy the client holds.
         db (Session): SQLAlchemy DB session (injected).
 
     Returns:
-        dict: Member details including memberships.
+        dict: Member details including memberships, or 304 Not Modified.
 
     Raises:
         HTTPException: If no member is found.
     """
-    member = (
-        db.query(Member).filter(Member.reference_number == reference_number).first()
-    )
-
-    if not member:
-        raise HTTPException(status_code=404, detail="Member not found")
-
-    memberships = db.query(Membership).filter(Membership.member_id == member.id).all()
-
-    return JSONResponse(
-        status_code=200,
-        content={
-            "message": f"Member {reference_number} and their memberships fetched successfully.",
-            "member": {
-                "id": member.id,
-                "first_name": member.first_name,
-                "last_name": member.last_name,
-                "email": member.email,
-                "city": member.city,
-                "postal_code": member.postal_code,
-                "notes": member.notes,
-                "reference_number": member.reference_number,
-                "no_postal_mail": member.no_postal_mail,
-                "memberships": [
-                    {
-                        "year": m.year,
-                        "amount": m.amount,
-                        "is_paid": m.is_paid,
-                        "discounted": m.discounted,
-                    }
-                    for m in memberships
-                ],
-            },
-        },
-    )
+    return reference_response(db, member_lookup(reference_number), if_none_match)
 
 
 @router.get("/search/full_name/{name}")
-def search_by_full_name(name: str, db: Session = Depends(get_db)):
+def search_by_full_name(
+    name: str,
+    page: PageParams = Depends(page_params),
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
     """
-    Search members by partial or full name.
+    Search members by partial or full name, ordered by full name.
 
     Args:
         name (str): Full or partial name string.
+        page (PageParams): limit, cursor and count query parameters.
+        if_none_match (str | None): ETag of the page the client holds.
 
     Returns:
-        dict: List of matching members.
+        dict: One page of matching members and the cursor of the next one.
     """
-    members = db.query(Member).filter(Member.full_name.ilike(f"%{name}%")).all()
-    return JSONResponse(
-        status_code=200,
-        content={
-            "message": f"Found {len(members)} member(s) matching full name '{name}'.",
-            "results": [MemberResponse.model_validate(m).model_dump() for m in members],
-        },
-    )
+    return search_documents(db, full_name_search(name), page, if_none_match)
 
 
 @router.get("/search/name/{name}")
-def search_by_name(name: str, db: Session = Depends(get_db)):
+def search_by_name(
+    name: str,
+    page: PageParams = Depends(page_params),
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
     """
-    Search members by first or last name.
+    Search members by first or last name, ordered by full name.
 
     Args:
         name (str): Name string to match.
+        page (PageParams): limit, cursor and count query parameters.
+        if_none_match (str | None): ETag of the page the client holds.
 
     Returns:
-        dict: List of matching members.
+        dict: One page of matching members and the cursor of the next one.
     """
-    members = (
-        db.query(Member)
-        .filter(
-            (Member.first_name.ilike(f"%{name}%"))
-            | (Member.last_name.ilike(f"%{name}%"))
-        )
-        .all()
-    )
-    return JSONResponse(
-        status_code=200,
-        content={
-            "message": f"Found {len(members)} member(s) matching name '{name}'.",
-            "results": [MemberResponse.model_validate(m).model_dump() for m in members],
-        },
-    )
+    return search_documents(db, name_search(name), page, if_none_match)
 
 
 @router.get("/search/city/{city}")
-def search_by_city(city: str, db: Session = Depends(get_db)):
+def search_by_city(
+    city: str,
+    page: PageParams = Depends(page_params),
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
     """
-    Search members by city name.
+    Search members by city name, ordered by city.
 
     Args:
         city (str): City name.
+        page (PageParams): limit, cursor and count query parameters.
+        if_none_match (str | None): ETag of the page the client holds.
 
     Returns:
-        dict: List of members in the specified city.
+        dict: One page of members in the specified city and the next cursor.
     """
-    members = db.query(Member).filter(Member.city.ilike(f"%{city}%")).all()
-    return JSONResponse(
-        status_code=200,
-        content={
-            "message": f"Found {len(members)} member(s) in city '{city}'.",
-            "results": [MemberResponse.model_validate(m).model_dump() for m in members],
-        },
-    )
+    return search_documents(db, city_search(city), page, if_none_match)
 
 
 @router.get("/search/postal/{postal_code}")
-def search_by_postal(postal_code: str, db: Session = Depends(get_db)):
+def search_by_postal(
+    postal_code: str,
+    page: PageParams = Depends(page_params),
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
     """
-    Search members by postal code.
+    Search members by postal code, ordered by id.
 
     Args:
         postal_code (str): Postal code to match.
+        page (PageParams): limit, cursor and count query parameters.
+        if_none_match (str | None): ETag of the page the client holds.
 
     Returns:
-        dict: List of members with that postal code.
+        dict: One page of members with that postal code and the next cursor.
     """
-    members = db.query(Member).filter(Member.postal_code == postal_code).all()
-    return JSONResponse(
-        status_code=200,
-        content={
-            "message": f"Found {len(members)} member(s) with postal code {postal_code}.",
-            "results": [MemberResponse.model_validate(m).model_dump() for m in members],
-        },
-    )
+    return search_documents(db, postal_code_search(postal_code), page, if_none_match)
 
 
 @router.get("/search/reference/{reference_number}")
-def search_by_reference(reference_number: str, db: Session = Depends(get_db)):
+def search_by_reference(
+    reference_number: str,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
     """
     Search a member by reference number (exact match).
 
     Args:
         reference_number (str): Member's unique reference number.
+        if_none_match (str | None): ETag of the copy the client holds.
 
     Returns:
-        dict or HTTPException: The matched member or 404.
+        dict or HTTPException: The matched member, 304 Not Modified or 404.
     """
-    member = (
-        db.query(Member).filter(Member.reference_number == reference_number).first()
-    )
-    if not member:
-        raise HTTPException(status_code=404, detail="Member not found")
-    return JSONResponse(
-        status_code=200,
-        content={
-            "message": f"Member with reference number {reference_number} found.",
-            "member": MemberResponse.model_validate(member).model_dump(),
-        },
-    )
+    return reference_response(db, reference_search(reference_number), if_none_match)
 
 
 @router.post("/", response_model=MemberResponse, status_code=status.HTTP_201_CREATED)
@@ -196,20 +269,16 @@ def create_member(member_in: MemberCreate, db: Session = Depends(get_db)):
         db (Session): SQLAlchemy DB session (injected).
 
     Returns:
-        JSONResponse: Success message and created member data.
+        FastJSONResponse: Success message and created member data.
     """
-    member = Member(**member_in.model_dump())
+    member = new_member(member_in)
     db.add(member)
     db.commit()
-    db.refresh(member)
+    members_changed(member.id)
+    # Reload the values set by the database (reference number, full name...)
+    member = get_member(db, Member.id == member.id)
 
-    return JSONResponse(
-        status_code=201,
-        content={
-            "message": "Member created successfully.",
-            "member": MemberResponse.model_validate(member).model_dump(),
-        },
-    )
+    return member_response("Member created successfully.", member, 201)
 
 
 @router.put("/{id}", response_model=MemberResponse)
@@ -223,25 +292,15 @@ def update_member(id: int, updates: MemberUpdate, db: Session = Depends(get_db))
         db (Session): SQLAlchemy DB session (injected).
 
     Returns:
-        JSONResponse: Confirmation message and updated data.
+        FastJSONResponse: Confirmation message and updated data.
     """
-    member = db.query(Member).filter(Member.id == id).first()
-    if not member:
-        raise HTTPException(status_code=404, detail="Member not found")
-
-    for key, value in updates.model_dump(exclude_unset=True).items():
-        setattr(member, key, value)
-
+    member = get_member(db, Member.id == id)
+    update_fields(member, updates)
     db.commit()
-    db.refresh(member)
+    members_changed(id)
+    member = get_member(db, Member.id == id)
 
-    return JSONResponse(
-        status_code=200,
-        content={
-            "message": f"Member {member.id} updated successfully.",
-            "member": MemberResponse.model_validate(member).model_dump(),
-        },
-    )
+    return member_response(f"Member {member.id} updated successfully.", member)
 
 
 @router.post(
@@ -251,33 +310,16 @@ def register_new_member(member_in: MemberCreate, db: Session = Depends(get_db)):
     """
     Register a new member and automatically create an unpaid membership.
 
-    This is the primary intake endpoint (e.g., from email form).
+    This is the primary intake endpoint (e.g., from email form). The
+    member and the membership are inserted in one transaction.
     """
-    # Create the member
-    member = Member(**member_in.model_dump())
+    member = new_member(member_in, with_membership=True)
     db.add(member)
     db.commit()
-    db.refresh(member)
-
-    # Create default unpaid membership for current year
-    membership = Membership(
-        member_id=member.id,
-        year=datetime.now().year,
-        amount=0,
-        is_paid=False,
-        discounted=False,
-    )
-    db.add(membership)
-    db.commit()
+    members_changed(member.id)
+    member = get_member(db, Member.id == member.id)
 
-    db.refresh(member)
-    return JSONResponse(
-        status_code=201,
-        content={
-            "message": "Member created successfully.",
-            "member": MemberResponse.model_validate(member).model_dump(),
-        },
-    )
+    return member_response("Member created successfully.", member, 201)
 
 
 @router.delete("/members/{member_id}", status_code=200)
@@ -295,40 +337,10 @@ def delete_member(member_id: int, db: Session = Depends(get_db)) -> dict:
     Returns:
         dict: JSON message with deletion confirmation.
     """
-    member = db.query(Member).filter(Member.id == member_id).first()
-    if not member:
-        raise HTTPException(status_code=404, detail="Member not found")
-
+    # Memberships are loaded with the member, for the delete to cascade to them
+    member = get_member(db, Member.id == member_id)
     db.delete(member)
     db.commit()
+    members_changed(member_id)
 
-    return {"message": f"Member with ID {member_id} was deleted successfully."}
-
-
-@router.post("/members/{member_id}/generate_welcome_letter")
-def generate_letter(member_id: int, db: Session = Depends(get_db)):
-    """
-    Generate and save a PDF welcome letter for a given member.
-
-    Args:
-        member_id (int): ID of the member.
-        db (Session): SQLAlchemy database session.
-
-    Returns:
-        dict: Confirmation message and path to generated file.
-    """
-    member = db.query(Member).filter(Member.id == member_id).first()
-    if not member:
-        raise HTTPException(status_code=404, detail="Member not found")
-
-    if not member.memberships:
-        raise HTTPException(status_code=400, detail="Member has no memberships")
-
-    membership = sorted(member.memberships, key=lambda m: m.year, reverse=True)[0]
-
-    try:
-        filepath = generate_pdf(member, membership, output_dir=Path("output/letters"))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"PDF generation failed: {e}")
-
-    return {"message": "PDF generated successfully", "path": str(filepath)}
+    return deleted_response(member_id)
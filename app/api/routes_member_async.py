@@ -0,0 +1,267 @@
+# File: app/api/routes_member_async.py
+
+"""
+Async versions of the member routes, served when ASYNC_DB_ENABLED is set.
+
+The handlers await an asyncio database session instead of blocking a
+threadpool worker, so concurrent requests are bounded by the connection
+pool rather than by the thread count. Paths, parameters and responses are
+those of `api.routes_member`: both build their statements and responses
+with `api.member_common`, and the handlers here only await the queries.
+"""
+
+from api.member_common import (
+    MemberSearch,
+    ReferenceLookup,
+    city_search,
+    deleted_response,
+    full_name_search,
+    full_text_search,
+    member_lookup,
+    member_query,
+    member_response,
+    name_search,
+    new_member,
+    one_member,
+    postal_code_search,
+    reference_search,
+    search_response,
+    update_fields,
+)
+from api.pagination import PageParams, page_params
+from api.responses import FastJSONResponse
+from cache import member_cache, members_changed, search_cache
+from database import get_async_db
+from fastapi import APIRouter, Depends, Header, Query, Response, status
+from models import Member
+from schemas import MemberCreate, MemberResponse, MemberUpdate
+from sqlalchemy import ColumnElement
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter(
+    prefix="/members", tags=["members"], default_response_class=FastJSONResponse
+)
+
+
+async def get_member(db: AsyncSession, criterion: ColumnElement[bool]) -> Member:
+    """
+    Fetch one member with memberships, reloading it if already in the session.
+
+    Raises:
+        HTTPException: 404 if no member matches.
+    """
+    return one_member(await db.execute(member_query(criterion)))
+
+
+async def search_documents(
+    db: AsyncSession,
+    search: MemberSearch,
+    page: PageParams,
+    if_none_match: str | None = None,
+) -> Response:
+    """Async version of `routes_member.search_documents`."""
+
+    async def query() -> bytes:
+        total = None
+        if page.count:
+            total = (await db.execute(search.count_query())).scalar_one()
+        rows = (await db.execute(search.page_query(page))).all()
+        return search.body(rows, page, total)
+
+    body = await search_cache.get_or_compute_async(search.cache_key(page), query)
+    return search_response(body, if_none_match)
+
+
+async def reference_response(
+    db: AsyncSession, lookup: ReferenceLookup, if_none_match: str | None
+) -> Response:
+    """Async version of `routes_member.reference_response`."""
+    cached = lookup.cached()
+    if cached is None and if_none_match:
+        version = (await db.execute(lookup.version_query())).scalar()
+        not_modified = lookup.not_modified(version, if_none_match)
+        if not_modified is not None:
+            return not_modified
+    if cached is None:
+        generation = member_cache.generation
+        row = (await db.execute(lookup.document_query())).first()
+        cached = lookup.store(row, generation)
+    return lookup.response(*cached, if_none_match)
+
+
+@router.get("/search")
+async def search_members(
+    q: str = Query(..., min_length=1, max_length=200),
+    page: PageParams = Depends(page_params),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Ranked full-text search over names, organization, city, e-mail and notes.
+
+    Args:
+        q (str): Words to search for.
+        page (PageParams): limit, cursor and count query parameters.
+        if_none_match (str | None): ETag of the page the client holds.
+
+    Returns:
+        dict: One page of matching members and the cursor of the next one.
+    """
+    return await search_documents(db, full_text_search(q), page, if_none_match)
+
+
+@router.get("/search/{reference_number}")
+async def get_member_by_reference(
+    reference_number: str,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Fetch a member and their memberships by reference number.
+
+    Args:
+        reference_number (str): Unique reference number of the member.
+        if_none_match (str | None): ETag of the copy the client holds.
+        db (AsyncSession): Async SQLAlchemy DB session (injected).
+
+    Returns:
+        dict: Member details including memberships, or 304 Not Modified.
+    """
+    return await reference_response(db, member_lookup(reference_number), if_none_match)
+
+
+@router.get("/search/full_name/{name}")
+async def search_by_full_name(
+    name: str,
+    page: PageParams = Depends(page_params),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Search members by partial or full name, ordered by full name.
+    """
+    return await search_documents(db, full_name_search(name), page, if_none_match)
+
+
+@router.get("/search/name/{name}")
+async def search_by_name(
+    name: str,
+    page: PageParams = Depends(page_params),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Search members by first or last name, ordered by full name.
+    """
+    return await search_documents(db, name_search(name), page, if_none_match)
+
+
+@router.get("/search/city/{city}")
+async def search_by_city(
+    city: str,
+    page: PageParams = Depends(page_params),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Search members by city name, ordered by city.
+    """
+    return await search_documents(db, city_search(city), page, if_none_match)
+
+
+@router.get("/search/postal/{postal_code}")
+async def search_by_postal(
+    postal_code: str,
+    page: PageParams = Depends(page_params),
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Search members by postal code, ordered by id.
+    """
+    return await search_documents(
+        db, postal_code_search(postal_code), page, if_none_match
+    )
+
+
+@router.get("/search/reference/{reference_number}")
+async def search_by_reference(
+    reference_number: str,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Search a member by reference number (exact match).
+    """
+    return await reference_response(
+        db, reference_search(reference_number), if_none_match
+    )
+
+
+@router.post("/", response_model=MemberResponse, status_code=status.HTTP_201_CREATED)
+async def create_member(
+    member_in: MemberCreate, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Create a new member (admin-initiated, no membership auto-created).
+    """
+    member = new_member(member_in)
+    db.add(member)
+    await db.commit()
+    members_changed(member.id)
+    # Reload the values set by the database (reference number, full name...)
+    member = await get_member(db, Member.id == member.id)
+
+    return member_response("Member created successfully.", member, 201)
+
+
+@router.put("/{id}", response_model=MemberResponse)
+async def update_member(
+    id: int, updates: MemberUpdate, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Update an existing member by ID.
+    """
+    member = await get_member(db, Member.id == id)
+    update_fields(member, updates)
+    await db.commit()
+    members_changed(id)
+    member = await get_member(db, Member.id == id)
+
+    return member_response(f"Member {member.id} updated successfully.", member)
+
+
+@router.post(
+    "/new_member", response_model=MemberResponse, status_code=status.HTTP_201_CREATED
+)
+async def register_new_member(
+    member_in: MemberCreate, db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Register a new member and automatically create an unpaid membership.
+
+    The member and the membership are inserted in one transaction.
+    """
+    member = new_member(member_in, with_membership=True)
+    db.add(member)
+    await db.commit()
+    members_changed(member.id)
+    member = await get_member(db, Member.id == member.id)
+
+    return member_response("Member created successfully.", member, 201)
+
+
+@router.delete("/members/{member_id}", status_code=200)
+async def delete_member(
+    member_id: int, db: AsyncSession = Depends(get_async_db)
+) -> dict:
+    """
+    Delete a member by ID and return a confirmation message.
+    """
+    # Memberships are loaded with the member, for the delete to cascade to them
+    member = await get_member(db, Member.id == member_id)
+    await db.delete(member)
+    await db.commit()
+    members_changed(member_id)
+
+    return deleted_response(member_id)
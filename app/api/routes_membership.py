@@ -1,13 +1,18 @@
 # ./app/api/routes_membership.py
 
+from api.member_common import membership_conflict, membership_response, new_membership
+from api.responses import FastJSONResponse
+from cache import members_changed
 from database import get_db
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
-from models import Member, Membership
+from models import Member
 from schemas import MembershipCreate, MembershipResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-router = APIRouter(prefix="/members", tags=["members"])
+router = APIRouter(
+    prefix="/members", tags=["members"], default_response_class=FastJSONResponse
+)
 
 
 @router.post(
@@ -27,25 +32,17 @@ def create_membership_for_member(
     The user provides 'amount' (default 0) and optionally the 'year'.
     We compute 'is_paid' and 'discounted' based on amount.
     """
-    # Lookup member existence
-    member = db.query(Member).filter(Member.id == member_id).first()
-    if not member:
+    if db.get(Member, member_id) is None:
         raise HTTPException(status_code=404, detail="Member not found")
 
-    # Create and persist the Membership
-    membership = Membership(
-        member_id=member_id,
-        year=membership_in.year,
-        amount=membership_in.amount,
-    )
+    membership = new_membership(member_id, membership_in)
     db.add(membership)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise membership_conflict(member_id, membership_in.year)
+    members_changed(member_id)
     db.refresh(membership)
 
-    return JSONResponse(
-        status_code=201,
-        content={
-            "message": f"Membership for year {membership.year} created for member ID {member_id}.",
-            "membership": MembershipResponse.model_validate(membership).model_dump(),
-        },
-    )
+    return membership_response(member_id, membership)
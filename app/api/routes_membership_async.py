@@ -0,0 +1,54 @@
+# ./app/api/routes_membership_async.py
+
+"""
+Async version of the membership routes, served when ASYNC_DB_ENABLED is set.
+
+Both versions build the membership and the responses with
+`api.member_common`.
+"""
+
+from api.member_common import membership_conflict, membership_response, new_membership
+from api.responses import FastJSONResponse
+from cache import members_changed
+from database import get_async_db
+from fastapi import APIRouter, Depends, HTTPException, status
+from models import Member
+from schemas import MembershipCreate, MembershipResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter(
+    prefix="/members", tags=["members"], default_response_class=FastJSONResponse
+)
+
+
+@router.post(
+    "/{member_id}/memberships",
+    response_model=MembershipResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_membership_for_member(
+    member_id: int,
+    membership_in: MembershipCreate,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Admin-only: Manually create a new membership for an existing member.
+
+    The user provides 'amount' (default 0) and optionally the 'year'.
+    We compute 'is_paid' and 'discounted' based on amount.
+    """
+    if await db.get(Member, member_id) is None:
+        raise HTTPException(status_code=404, detail="Member not found")
+
+    membership = new_membership(member_id, membership_in)
+    db.add(membership)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise membership_conflict(member_id, membership_in.year)
+    members_changed(member_id)
+    await db.refresh(membership)
+
+    return membership_response(member_id, membership)
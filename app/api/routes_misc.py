@@ -1,6 +1,7 @@
 # ./app/api/routes_misc.py
 # API routes for miscellaneous operations
 
+from database import slow_query_log
 from fastapi import APIRouter
 
 router = APIRouter(prefix="/misc", tags=["misc"])
@@ -65,3 +66,34 @@ def get_docs():
         "status": "ok",
         "message": "API documentation is available at /docs or /redoc.",
     }
+
+
+@router.get("/slow_queries")
+def get_slow_queries():
+    """
+    Admin endpoint listing the latest slow SQL statements, newest first.
+
+    Each record has the duration, the statement, the types of its
+    parameters (never their values), the route that ran it and, for a
+    sample of SELECTs, the EXPLAIN (ANALYZE, BUFFERS) plan.
+
+    Returns:
+        dict: Threshold in ms and the recorded statements.
+    """
+    return {
+        "status": "ok",
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "queries": slow_query_log.snapshot(),
+    }
+
+
+@router.delete("/slow_queries")
+def clear_slow_queries():
+    """
+    Admin endpoint emptying the slow query log.
+
+    Returns:
+        dict: Confirmation message.
+    """
+    slow_query_log.clear()
+    return {"status": "ok", "message": "Slow query log cleared"}
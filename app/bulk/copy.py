@@ -0,0 +1,59 @@
+# app/bulk/copy.py
+
+"""
+COPY FROM STDIN for SQLAlchemy connections on psycopg2 or psycopg 3.
+"""
+
+import io
+from collections.abc import Iterable, Sequence
+
+from sqlalchemy.engine import Connection
+
+_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _text_value(value) -> str:
+    """Encode one value in the COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return str(value).translate(_ESCAPES)
+
+
+def copy_rows(
+    connection: Connection,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence],
+) -> int:
+    """
+    Load rows into a table with COPY, in the connection's transaction.
+
+    Args:
+        connection (Connection): SQLAlchemy connection, e.g. `session.connection()`
+        table (str): Target table, trusted (not quoted)
+        columns (Sequence[str]): Target columns, in the order of the row values
+        rows (Iterable[Sequence]): Row values; None is loaded as NULL
+
+    Returns:
+        int: Number of rows copied
+    """
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write("\t".join(_text_value(value) for value in row))
+        buffer.write("\n")
+        count += 1
+    buffer.seek(0)
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    cursor = connection.connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):  # psycopg2
+            cursor.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+    return count
@@ -0,0 +1,205 @@
+# app/bulk/export.py
+
+"""
+Streaming export of members and their memberships as CSV or NDJSON.
+
+Rows come from a server-side cursor ordered by member, so members can be
+grouped on the fly and only one batch of rows is in memory at a time,
+whatever the size of the table. Output is produced as encoded chunks
+ready to be written to a file or a streaming response.
+"""
+
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from itertools import groupby
+
+from database import SessionLocal
+from models import Member, Membership
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_LAYOUTS = ("flat", "nested")
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+MEMBER_EXPORT_FIELDS = (
+    "id",
+    "reference_number",
+    "first_name",
+    "last_name",
+    "organization",
+    "email",
+    "phone",
+    "street_address",
+    "postal_code",
+    "city",
+    "no_postal_mail",
+    "notes",
+    "created_at",
+    "modified_at",
+)
+MEMBERSHIP_EXPORT_FIELDS = ("year", "amount", "is_paid", "discounted")
+
+# Output is flushed in chunks of about this many bytes
+CHUNK_SIZE = 64 * 1024
+
+
+def export_query(
+    year: int | None = None, is_paid: bool | None = None, city: str | None = None
+) -> Select:
+    """
+    Build the export query: one row per membership, ordered by member.
+
+    Without membership filters, members without memberships are exported
+    too, with empty membership fields. With a year or paid filter, only
+    members with a matching membership are.
+
+    Args:
+        year (int | None): Only memberships of this year
+        is_paid (bool | None): Only paid (True) or unpaid (False) memberships
+        city (str | None): Only members in this city (case-insensitive)
+
+    Returns:
+        Select: The export query
+    """
+    membership_filter = []
+    if year is not None:
+        membership_filter.append(Membership.year == year)
+    if is_paid is not None:
+        membership_filter.append(
+            Membership.is_paid.is_(True) if is_paid else Membership.is_paid.is_not(True)
+        )
+    stmt = (
+        select(
+            *(getattr(Member, field) for field in MEMBER_EXPORT_FIELDS),
+            *(getattr(Membership, field) for field in MEMBERSHIP_EXPORT_FIELDS),
+        )
+        .join(
+            Membership,
+            Membership.member_id == Member.id,
+            isouter=not membership_filter,
+        )
+        .where(*membership_filter)
+        .order_by(Member.id, Membership.year)
+    )
+    if city is not None:
+        # Exact match: the city must not act as a LIKE pattern
+        stmt = stmt.where(func.lower(Member.city) == city.lower())
+    return stmt
+
+
+def iter_export_records(
+    db: Session, stmt: Select, layout: str = "flat", batch_size: int = 1000
+) -> Iterator[dict]:
+    """
+    Stream export records through a server-side cursor.
+
+    Args:
+        db (Session): SQLAlchemy DB session, kept open while iterating
+        stmt (Select): Query from `export_query`
+        layout (str): "flat" for one record per membership, "nested" for
+            one record per member with a list of memberships
+        batch_size (int): Rows fetched from the cursor at a time
+
+    Yields:
+        dict: Export record
+    """
+    rows = (
+        row._mapping
+        for partition in db.execute(
+            stmt.execution_options(yield_per=batch_size)
+        ).partitions()
+        for row in partition
+    )
+    if layout == "flat":
+        for row in rows:
+            yield dict(row)
+        return
+    for _, member_rows in groupby(rows, key=lambda row: row["id"]):
+        memberships = []
+        for row in member_rows:
+            if row["year"] is not None:
+                memberships.append({f: row[f] for f in MEMBERSHIP_EXPORT_FIELDS})
+        record = {f: row[f] for f in MEMBER_EXPORT_FIELDS}
+        record["memberships"] = memberships
+        yield record
+
+
+def _json_default(value):
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def _chunks(lines: Iterable[str]) -> Iterator[bytes]:
+    """Join lines into chunks of about CHUNK_SIZE bytes."""
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+def _ndjson_lines(records: Iterable[dict]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, default=_json_default, ensure_ascii=False) + "\n"
+
+
+def _csv_lines(records: Iterable[dict], layout: str) -> Iterator[str]:
+    columns = MEMBER_EXPORT_FIELDS + (
+        MEMBERSHIP_EXPORT_FIELDS if layout == "flat" else ("memberships",)
+    )
+    line = io.StringIO()
+    writer = csv.writer(line)
+
+    def render(values) -> str:
+        line.seek(0)
+        line.truncate()
+        writer.writerow(values)
+        return line.getvalue()
+
+    yield render(columns)
+    for record in records:
+        if layout == "nested":
+            record = {
+                **record,
+                "memberships": json.dumps(record["memberships"], default=_json_default),
+            }
+        yield render(
+            "" if record[c] is None else _json_default(record[c]) for c in columns
+        )
+
+
+def encode_export(records: Iterable[dict], fmt: str, layout: str) -> Iterator[bytes]:
+    """
+    Encode export records as CSV (with a header line) or NDJSON chunks.
+
+    In CSV the nested layout puts each member's memberships in one
+    "memberships" column as a JSON array.
+    """
+    if fmt == "csv":
+        return _chunks(_csv_lines(records, layout))
+    if fmt == "ndjson":
+        return _chunks(_ndjson_lines(records))
+    raise ValueError(f"Unsupported format {fmt!r}, expected one of {EXPORT_FORMATS}")
+
+
+def stream_export(
+    stmt: Select, fmt: str, layout: str, batch_size: int = 1000
+) -> Iterator[bytes]:
+    """
+    Export in chunks with a session of its own, closed when the export ends.
+
+    A streaming response keeps iterating after the request's own session
+    has been closed, so the export cannot borrow it.
+    """
+    db = SessionLocal()
+    try:
+        records = iter_export_records(db, stmt, layout, batch_size)
+        yield from encode_export(records, fmt, layout)
+    finally:
+        db.close()
@@ -0,0 +1,178 @@
+# app/bulk/members.py
+
+"""
+Bulk member import: validate in batches, COPY into staging, merge in SQL.
+
+Each batch is one transaction. Valid rows are copied into a temporary
+staging table and inserted into members by a single INSERT ... SELECT,
+which takes the reference numbers from reference_number_seq in file
+order. Invalid rows and e-mail addresses already in use are reported
+per line and never abort the import.
+"""
+
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from bulk.copy import copy_rows
+from bulk.readers import RawRow, batches
+from models import Member
+from pydantic import ValidationError
+from schemas import MemberCreate
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+STAGING_TABLE = "member_import"
+MEMBER_COLUMNS = tuple(MemberCreate.model_fields)
+# Lengths the schema does not check, but that would make the COPY fail
+COLUMN_LENGTHS = {
+    column: Member.__table__.c[column].type.length
+    for column in MEMBER_COLUMNS
+    if getattr(Member.__table__.c[column].type, "length", None)
+}
+
+_CREATE_STAGING = text(
+    f"""
+    CREATE TEMPORARY TABLE {STAGING_TABLE} (
+        line integer NOT NULL,
+        first_name varchar(100),
+        last_name varchar(100),
+        city varchar(100),
+        email varchar(320),
+        street_address varchar(200),
+        postal_code varchar(20),
+        phone varchar(20),
+        notes varchar(2000),
+        organization varchar(200),
+        no_postal_mail boolean
+    ) ON COMMIT DROP
+    """
+)
+
+# Drop rows whose e-mail is already taken, by a member or an earlier line
+_REJECT_DUPLICATE_EMAILS = text(
+    f"""
+    DELETE FROM {STAGING_TABLE} s
+    USING (
+        SELECT line
+        FROM (
+            SELECT
+                line,
+                email,
+                row_number() OVER (PARTITION BY email ORDER BY line) AS n
+            FROM {STAGING_TABLE}
+            WHERE email IS NOT NULL
+        ) ranked
+        WHERE n > 1 OR EXISTS (SELECT 1 FROM members m WHERE m.email = ranked.email)
+    ) taken
+    WHERE s.line = taken.line
+    RETURNING s.line
+    """
+)
+
+_MERGE = text(
+    f"""
+    INSERT INTO members ({", ".join(MEMBER_COLUMNS)}, reference_number)
+    SELECT {", ".join(MEMBER_COLUMNS)}, nextval('reference_number_seq')
+    FROM {STAGING_TABLE}
+    ORDER BY line
+    """
+)
+
+
+@dataclass
+class RowError:
+    line: int
+    errors: list[str]
+
+
+@dataclass
+class ImportReport:
+    inserted: int = 0
+    errors: list[RowError] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def rejected(self) -> int:
+        return len(self.errors)
+
+    def to_dict(self, max_errors: int | None = None) -> dict:
+        errors = self.errors if max_errors is None else self.errors[:max_errors]
+        return {
+            "inserted": self.inserted,
+            "rejected": self.rejected,
+            "elapsed": round(self.elapsed, 3),
+            "errors": [{"line": e.line, "errors": e.errors} for e in errors],
+            "errors_truncated": len(errors) < len(self.errors),
+        }
+
+
+def validate_row(row: RawRow) -> MemberCreate | RowError:
+    """Validate one parsed row against `MemberCreate`."""
+    if row.error is not None:
+        return RowError(row.line, [row.error])
+    try:
+        member = MemberCreate.model_validate(row.data)
+    except ValidationError as e:
+        return RowError(
+            row.line,
+            [
+                f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}"
+                for err in e.errors()
+            ],
+        )
+    too_long = [
+        f"{column}: at most {length} characters"
+        for column, length in COLUMN_LENGTHS.items()
+        if len(getattr(member, column) or "") > length
+    ]
+    return RowError(row.line, too_long) if too_long else member
+
+
+def import_members(
+    db: Session, rows: Iterable[RawRow], batch_size: int = 5000
+) -> ImportReport:
+    """
+    Import members from parsed upload rows.
+
+    Args:
+        db (Session): SQLAlchemy DB session; each batch is committed
+        rows (Iterable[RawRow]): Rows from `read_rows`
+        batch_size (int): Rows validated, copied and merged per transaction
+
+    Returns:
+        ImportReport: Inserted count and the errors per line
+    """
+    report = ImportReport()
+    start = time.perf_counter()
+    for batch in batches(rows, batch_size):
+        valid = []
+        for row in batch:
+            result = validate_row(row)
+            if isinstance(result, RowError):
+                report.errors.append(result)
+            else:
+                valid.append((row.line, result))
+        if not valid:
+            continue
+
+        connection = db.connection()
+        connection.execute(_CREATE_STAGING)
+        copy_rows(
+            connection,
+            STAGING_TABLE,
+            ("line", *MEMBER_COLUMNS),
+            (
+                (line, *(getattr(member, column) for column in MEMBER_COLUMNS))
+                for line, member in valid
+            ),
+        )
+        duplicates = connection.execute(_REJECT_DUPLICATE_EMAILS).scalars().all()
+        report.errors.extend(
+            RowError(line, ["email: already registered"]) for line in duplicates
+        )
+        report.inserted += connection.execute(_MERGE).rowcount
+        db.commit()
+    report.errors.sort(key=lambda e: e.line)
+    report.elapsed = time.perf_counter() - start
+    return report
@@ -0,0 +1,154 @@
+# app/bulk/memberships.py
+
+"""
+Bulk upsert of memberships in one statement.
+
+The rows are sent as parallel arrays and unnested server-side, members
+are resolved by id or reference number with indexed joins, the payment
+flags are computed in SQL with the same rule as
+`Membership._compute_payment_flags`, and everything is written by one
+INSERT ... ON CONFLICT (member_id, year). Payment reconciliation keeps
+a recorded amount higher than the new one, and reports the row instead.
+"""
+
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass
+from enum import Enum
+
+from config import settings
+from schemas import MembershipUpsert
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+class UpsertOutcome(str, Enum):
+    CREATED = "created"
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    # A later row in the same request set this member's year
+    SUPERSEDED = "superseded"
+    # keep_higher: the amount already recorded is higher and was kept
+    LOWER_AMOUNT = "lower_amount"
+    MEMBER_NOT_FOUND = "member_not_found"
+
+
+@dataclass
+class UpsertResult:
+    index: int
+    member_id: int | None
+    year: int
+    outcome: UpsertOutcome
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "member_id": self.member_id,
+            "year": self.year,
+            "outcome": self.outcome.value,
+        }
+
+
+_UPSERT = text(
+    """
+    WITH input AS (
+        SELECT *
+        FROM unnest(
+            CAST(:member_ids AS bigint[]),
+            CAST(:reference_numbers AS bigint[]),
+            CAST(:years AS integer[]),
+            CAST(:amounts AS integer[])
+        ) WITH ORDINALITY AS t(member_id, reference_number, year, amount, idx)
+    ),
+    resolved AS (
+        SELECT i.idx, coalesce(by_id.id, by_ref.id) AS member_id, i.year, i.amount
+        FROM input i
+        LEFT JOIN members by_id ON by_id.id = i.member_id
+        LEFT JOIN members by_ref ON by_ref.reference_number = i.reference_number
+    ),
+    latest AS (
+        SELECT DISTINCT ON (member_id, year) idx, member_id, year, amount
+        FROM resolved
+        WHERE member_id IS NOT NULL
+        ORDER BY member_id, year, idx DESC
+    ),
+    upserted AS (
+        INSERT INTO memberships (member_id, year, amount, is_paid, discounted)
+        SELECT
+            member_id,
+            year,
+            amount,
+            amount > :unpaid,
+            amount > :unpaid AND amount < :standard_fee
+        FROM latest
+        ON CONFLICT (member_id, year) DO UPDATE
+        SET amount = EXCLUDED.amount,
+            is_paid = EXCLUDED.is_paid,
+            discounted = EXCLUDED.discounted
+        WHERE (memberships.amount, memberships.is_paid, memberships.discounted)
+            IS DISTINCT FROM (EXCLUDED.amount, EXCLUDED.is_paid, EXCLUDED.discounted)
+            AND NOT (CAST(:keep_higher AS boolean)
+                AND memberships.amount > EXCLUDED.amount)
+        RETURNING member_id, year, xmax = 0 AS inserted
+    )
+    SELECT
+        r.idx,
+        r.member_id,
+        r.year,
+        CASE
+            WHEN r.member_id IS NULL THEN 'member_not_found'
+            WHEN l.idx <> r.idx THEN 'superseded'
+            WHEN u.member_id IS NULL AND CAST(:keep_higher AS boolean)
+                AND m.amount > r.amount THEN 'lower_amount'
+            WHEN u.member_id IS NULL THEN 'unchanged'
+            WHEN u.inserted THEN 'created'
+            ELSE 'updated'
+        END AS outcome
+    FROM resolved r
+    LEFT JOIN latest l ON l.member_id = r.member_id AND l.year = r.year
+    LEFT JOIN upserted u ON u.member_id = r.member_id AND u.year = r.year
+    -- The statement's snapshot: amounts as they were before the upsert
+    LEFT JOIN memberships m ON m.member_id = r.member_id AND m.year = r.year
+    ORDER BY r.idx
+    """
+)
+
+
+def upsert_memberships(
+    db: Session, rows: Sequence[MembershipUpsert], keep_higher: bool = False
+) -> list[UpsertResult]:
+    """
+    Create or update many memberships in one statement.
+
+    The caller owns the transaction: nothing is committed here.
+
+    Args:
+        db (Session): SQLAlchemy DB session
+        rows (Sequence[MembershipUpsert]): Memberships to record
+        keep_higher (bool): Never lower a recorded amount; such rows are
+            left as they are with the LOWER_AMOUNT outcome
+
+    Returns:
+        list[UpsertResult]: One outcome per row, in the order of `rows`
+    """
+    result = db.execute(
+        _UPSERT,
+        {
+            "member_ids": [row.member_id for row in rows],
+            "reference_numbers": [row.reference_number for row in rows],
+            "years": [row.year for row in rows],
+            "amounts": [row.amount for row in rows],
+            "unpaid": settings.UNPAID_MEMBERSHIP,
+            "standard_fee": settings.STANDARD_MEMBERSHIP_FEE,
+            "keep_higher": keep_higher,
+        },
+    )
+    return [
+        UpsertResult(idx - 1, member_id, year, UpsertOutcome(outcome))
+        for idx, member_id, year, outcome in result
+    ]
+
+
+def count_outcomes(results: Sequence[UpsertResult]) -> dict[str, int]:
+    counts = Counter(result.outcome.value for result in results)
+    return {outcome.value: counts[outcome.value] for outcome in UpsertOutcome}
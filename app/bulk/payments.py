@@ -0,0 +1,343 @@
+# app/bulk/payments.py
+
+"""
+Reconciliation of bank statements against memberships.
+
+Members pay their membership with their reference number (printed on
+the welcome letter). A statement is streamed, either as a CSV export or
+as camt.053 XML, and every incoming payment is recorded as the amount
+of that member's membership for the year, unless a higher amount is
+already recorded. Matching and updating is done by the bulk membership
+upsert, one statement per batch of payments.
+"""
+
+import csv
+import io
+import re
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from decimal import ROUND_DOWN, Decimal, InvalidOperation
+from pathlib import Path
+from typing import BinaryIO
+from xml.etree.ElementTree import iterparse
+
+from bulk.memberships import UpsertOutcome, count_outcomes, upsert_memberships
+from bulk.readers import batches
+from schemas import MembershipUpsert
+from sqlalchemy.orm import Session
+
+STATEMENT_FORMATS = ("csv", "camt053")
+
+# Accepted CSV headers (lowercase) for each field; Finnish banks' names included
+CSV_HEADERS = {
+    "reference": ("reference", "reference_number", "viite", "viitenumero"),
+    "amount": ("amount", "määrä", "maara", "summa"),
+    "payer": ("payer", "name", "maksaja", "saaja/maksaja"),
+    "date": ("date", "booking_date", "kirjauspäivä", "maksupäivä"),
+}
+
+
+@dataclass
+class Payment:
+    # CSV line number, or the transaction's ordinal in camt.053
+    position: int
+    reference: str | None
+    amount: Decimal | None
+    payer: str | None = None
+    date: str | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "position": self.position,
+            "reference": self.reference,
+            "amount": str(self.amount) if self.amount is not None else None,
+            "payer": self.payer,
+            "date": self.date,
+        }
+
+
+@dataclass
+class ReconciliationReport:
+    year: int
+    payments: int = 0
+    counts: dict[str, int] = field(default_factory=dict)
+    unmatched: list[Payment] = field(default_factory=list)
+    duplicates: list[Payment] = field(default_factory=list)
+    # Payments lower than the amount already recorded, which is kept
+    lower_amounts: list[Payment] = field(default_factory=list)
+    invalid: list[tuple[Payment, str]] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "year": self.year,
+            "payments": self.payments,
+            "counts": self.counts,
+            "unmatched": [p.to_dict() for p in self.unmatched],
+            "duplicates": [p.to_dict() for p in self.duplicates],
+            "lower_amounts": [p.to_dict() for p in self.lower_amounts],
+            "invalid": [{**p.to_dict(), "error": e} for p, e in self.invalid],
+            "elapsed": round(self.elapsed, 3),
+        }
+
+
+def statement_format(
+    content_type: str | None = None, filename: str | None = None
+) -> str | None:
+    """
+    Guess the format of a bank statement from its content type or file name.
+
+    Returns:
+        str | None: "csv", "camt053" or None if neither matches
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    suffix = Path(filename).suffix.lower() if filename else ""
+    if media_type in ("text/csv", "application/csv") or suffix == ".csv":
+        return "csv"
+    if media_type in ("application/xml", "text/xml") or suffix == ".xml":
+        return "camt053"
+    return None
+
+
+def parse_reference(value: str | None) -> int | None:
+    """
+    Normalise a payment reference to a member reference number.
+
+    Spaces and leading zeros are ignored, and an RF creditor reference
+    ("RF18 2000 0000 03") is reduced to its national part.
+
+    Returns:
+        int | None: The reference number, None if there are no digits
+    """
+    if not value:
+        return None
+    compact = re.sub(r"\s", "", value).upper()
+    if compact.startswith("RF"):
+        compact = compact[4:]
+    return int(compact) if compact.isdigit() else None
+
+
+def parse_amount(value: str | None) -> Decimal | None:
+    """
+    Parse "25.00", "25,00", "1 234,50 €" or "1,234.50" into a Decimal.
+
+    When both "." and "," occur, the last one is the decimal separator
+    and the other groups thousands; a separator repeated alone groups
+    thousands too. A single separator before exactly three digits, as in
+    "1,234", could be either and is rejected.
+
+    Returns:
+        Decimal | None: The amount, None if it is invalid or ambiguous
+    """
+    if not value:
+        return None
+    compact = re.sub(r"[\s€]", "", value).replace("−", "-")
+    separators = re.sub(r"[^.,]", "", compact)
+    if len(set(separators)) == 2:
+        # "1,234.50" or "1.234,50": the last one is the decimal separator
+        point = separators[-1]
+        if separators.count(point) > 1:
+            return None
+    elif len(separators) == 1:
+        point = separators
+        if len(compact.rpartition(point)[2]) == 3:
+            return None  # "1,234": decimals or thousands?
+    else:
+        point = ""  # None, or "1.234.567": thousands groups only
+    if point:
+        whole, _, fraction = compact.rpartition(point)
+        compact = re.sub(r"[.,]", "", whole) + "." + fraction
+    else:
+        compact = re.sub(r"[.,]", "", compact)
+    try:
+        return Decimal(compact)
+    except InvalidOperation:
+        return None
+
+
+def read_csv_payments(stream: BinaryIO) -> Iterator[Payment]:
+    """
+    Stream payments from a CSV export with a header line.
+
+    The delimiter (",", ";" or tab) is guessed from the header. Outgoing
+    payments, i.e. negative amounts, are skipped.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    header = text.readline()
+    delimiter = max(",;\t", key=header.count)
+    names = [
+        name.strip().lower() for name in next(csv.reader([header], delimiter=delimiter))
+    ]
+    columns = {
+        key: next((names.index(a) for a in aliases if a in names), None)
+        for key, aliases in CSV_HEADERS.items()
+    }
+    if columns["reference"] is None or columns["amount"] is None:
+        raise ValueError("The statement needs reference and amount columns")
+
+    def cell(row: list[str], key: str) -> str | None:
+        index = columns[key]
+        return (
+            row[index].strip() or None
+            if index is not None and index < len(row)
+            else None
+        )
+
+    reader = csv.reader(text, delimiter=delimiter)
+    for row in reader:
+        if not row:
+            continue
+        amount = parse_amount(cell(row, "amount"))
+        if amount is not None and amount < 0:
+            continue
+        yield Payment(
+            reader.line_num + 1,  # The header was read before the reader
+            cell(row, "reference"),
+            amount,
+            cell(row, "payer"),
+            cell(row, "date"),
+        )
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _find(element, *path: str):
+    """Find a descendant by local names, ignoring the XML namespace."""
+    for name in path:
+        element = next((c for c in element if _local(c.tag) == name), None)
+        if element is None:
+            return None
+    return element
+
+
+def _text(element, *path: str) -> str | None:
+    found = _find(element, *path)
+    return found.text.strip() if found is not None and found.text else None
+
+
+def read_camt053_payments(stream: BinaryIO) -> Iterator[Payment]:
+    """
+    Stream incoming payments from a camt.053 bank-to-customer statement.
+
+    Entries are parsed one at a time with iterparse and cleared once
+    read, so memory stays flat for statements of any length. Every
+    transaction of a batched credit entry is one payment; debit entries
+    are skipped.
+    """
+    position = 0
+    open_elements = []
+    for event, element in iterparse(stream, events=("start", "end")):
+        if event == "start":
+            open_elements.append(element)
+            continue
+        open_elements.pop()
+        if _local(element.tag) != "Ntry":
+            continue
+        if _text(element, "CdtDbtInd") == "CRDT":
+            date = _text(element, "BookgDt", "Dt") or _text(element, "ValDt", "Dt")
+            transactions = [
+                tx
+                for details in element
+                if _local(details.tag) == "NtryDtls"
+                for tx in details
+                if _local(tx.tag) == "TxDtls"
+            ] or [element]
+            for tx in transactions:
+                position += 1
+                amount = _text(tx, "AmtDtls", "TxAmt", "Amt") or _text(tx, "Amt")
+                if amount is None and tx is not element:
+                    amount = _text(element, "Amt")
+                yield Payment(
+                    position,
+                    _text(tx, "RmtInf", "Strd", "CdtrRefInf", "Ref"),
+                    parse_amount(amount),
+                    _text(tx, "RltdPties", "Dbtr", "Nm"),
+                    date,
+                )
+        # Drop the parsed entry, so the statement is never held whole
+        open_elements[-1].remove(element)
+
+
+def read_payments(stream: BinaryIO, fmt: str) -> Iterator[Payment]:
+    if fmt == "csv":
+        return read_csv_payments(stream)
+    if fmt == "camt053":
+        return read_camt053_payments(stream)
+    raise ValueError(f"Unsupported format {fmt!r}, expected one of {STATEMENT_FORMATS}")
+
+
+def reconcile_payments(
+    db: Session, payments: Iterable[Payment], year: int, batch_size: int = 5000
+) -> ReconciliationReport:
+    """
+    Record statement payments as the year's membership amounts.
+
+    A reference paid more than once in the statement is recorded once,
+    from its first payment; the others are reported as duplicates, or as
+    unmatched like the first one when the reference is no member's. Cents
+    are dropped, so a payment short of a fee by cents is not recorded as
+    the full fee. An amount already recorded is never lowered: such
+    payments are reported and left unapplied. The whole statement is one
+    transaction, committed at the end.
+
+    Args:
+        db (Session): SQLAlchemy DB session
+        payments (Iterable[Payment]): Incoming payments, e.g. from `read_payments`
+        year (int): Membership year the payments are for
+        batch_size (int): Payments matched and upserted per statement
+
+    Returns:
+        ReconciliationReport: Outcome counts, unmatched, duplicate, lower
+            and invalid payments
+    """
+    report = ReconciliationReport(year=year)
+    start = time.perf_counter()
+    seen: set[int] = set()
+    unmatched: set[int] = set()
+    counts = Counter()
+
+    def valid_payments() -> Iterator[tuple[Payment, MembershipUpsert]]:
+        for payment in payments:
+            report.payments += 1
+            reference = parse_reference(payment.reference)
+            if reference is None:
+                report.invalid.append((payment, "No reference number"))
+            elif payment.amount is None:
+                report.invalid.append((payment, "No amount"))
+            else:
+                amount = int(payment.amount.to_integral_value(ROUND_DOWN))
+                yield payment, MembershipUpsert(
+                    reference_number=reference, year=year, amount=amount
+                )
+
+    for batch in batches(valid_payments(), batch_size):
+        first, repeated = [], []
+        for payment, row in batch:
+            if row.reference_number in seen:
+                repeated.append((payment, row))
+            else:
+                seen.add(row.reference_number)
+                first.append((payment, row))
+        rows = [row for _, row in first]
+        results = upsert_memberships(db, rows, keep_higher=True) if rows else []
+        for (payment, row), result in zip(first, results):
+            if result.outcome is UpsertOutcome.MEMBER_NOT_FOUND:
+                unmatched.add(row.reference_number)
+                report.unmatched.append(payment)
+            elif result.outcome is UpsertOutcome.LOWER_AMOUNT:
+                report.lower_amounts.append(payment)
+        # Repeats are sorted once their reference is matched
+        for payment, row in repeated:
+            if row.reference_number in unmatched:
+                report.unmatched.append(payment)
+            else:
+                report.duplicates.append(payment)
+        counts.update(count_outcomes(results))
+    db.commit()
+    report.counts = {outcome.value: counts[outcome.value] for outcome in UpsertOutcome}
+    report.elapsed = time.perf_counter() - start
+    return report
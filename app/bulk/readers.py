@@ -0,0 +1,106 @@
+# app/bulk/readers.py
+
+"""
+Incremental readers for uploaded CSV and NDJSON files.
+
+Both read the upload line by line from a binary stream, so a file of any
+size is parsed in constant memory.
+"""
+
+import csv
+import io
+import json
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+FORMATS = ("csv", "ndjson")
+
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+_SUFFIXES = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+def batches(items: Iterable, size: int) -> Iterator[list]:
+    """Split a stream into lists of at most `size` items."""
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class RawRow(NamedTuple):
+    line: int
+    data: dict | None
+    error: str | None = None
+
+
+def detect_format(
+    content_type: str | None = None, filename: str | None = None
+) -> str | None:
+    """
+    Guess the format of an upload from its content type or file name.
+
+    Returns:
+        str | None: "csv", "ndjson" or None if neither matches
+    """
+    if content_type:
+        media_type = content_type.split(";")[0].strip().lower()
+        if media_type in _CONTENT_TYPES:
+            return _CONTENT_TYPES[media_type]
+    if filename:
+        return _SUFFIXES.get(Path(filename).suffix.lower())
+    return None
+
+
+def read_rows(stream: BinaryIO, fmt: str) -> Iterator[RawRow]:
+    """
+    Parse an upload into rows, keeping the line number of each.
+
+    CSV needs a header line; empty cells become None. In NDJSON every
+    non-blank line is one JSON object. A line that cannot be parsed is
+    yielded with its error instead of failing the whole file.
+
+    Args:
+        stream (BinaryIO): UTF-8 encoded upload, a BOM is ignored
+        fmt (str): "csv" or "ndjson"
+
+    Yields:
+        RawRow: Line number, parsed fields or parse error
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        header = reader.fieldnames  # Reads the header line
+        if not header:
+            return  # An empty upload has no rows either
+        end = reader.line_num
+        for record in reader:
+            # A quoted value may span lines, report the first one
+            line, end = end + 1, reader.line_num
+            if None in record:
+                yield RawRow(line, None, "More values than headers")
+                continue
+            yield RawRow(
+                line, {key: value or None for key, value in record.items() if key}
+            )
+    elif fmt == "ndjson":
+        for line, content in enumerate(text, start=1):
+            if not content.strip():
+                continue
+            try:
+                data = json.loads(content)
+            except ValueError as e:
+                yield RawRow(line, None, f"Invalid JSON: {e}")
+                continue
+            if not isinstance(data, dict):
+                yield RawRow(line, None, "Expected a JSON object")
+                continue
+            yield RawRow(line, data)
+    else:
+        raise ValueError(f"Unsupported format {fmt!r}, expected one of {FORMATS}")
@@ -0,0 +1,352 @@
+# app/cache.py
+
+"""
+In-process caches of serialized member documents and search results.
+
+Front-desk staff look members up by the reference number on payment
+slips far more often than members change, so the JSON document of a
+looked-up member is kept in memory with its row version, by member id,
+with an index from reference number to id. Entries expire after a TTL
+and the least recently used ones are evicted beyond a maximum count. Routes that
+change a member or its memberships invalidate the member's entries
+right after committing, so this worker never serves a stale document;
+the TTL bounds how long other workers can. Every invalidation bumps a
+generation number: a document read from the database is only cached if
+no invalidation happened while it was being read, so a lookup racing an
+update cannot put the old document back.
+
+Search result pages are cached by search and page parameters. Rather
+than working out which pages a change affects, every change of any
+member or membership bumps a global write generation and pages of an
+older generation are never served. Identical searches that miss at the
+same time are coalesced: one of them queries the database and the
+others wait for its result.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from concurrent.futures import Future
+
+from config import settings
+from prometheus_client import Counter, Gauge
+
+cache_hits = Counter(
+    "member_cache_hits_total", "Member documents served from the cache", ["kind"]
+)
+cache_misses = Counter(
+    "member_cache_misses_total", "Member documents not found in the cache", ["kind"]
+)
+cache_evictions = Counter(
+    "member_cache_evictions_total",
+    "Member documents dropped from the cache",
+    ["reason"],
+)
+cache_entries = Gauge("member_cache_entries", "Member documents in the cache")
+
+search_cache_hits = Counter(
+    "search_cache_hits_total", "Search result pages served from the cache"
+)
+search_cache_misses = Counter(
+    "search_cache_misses_total", "Search result pages queried from the database"
+)
+search_cache_coalesced = Counter(
+    "search_cache_coalesced_total",
+    "Searches that waited for an identical search already querying",
+)
+
+
+class MemberCache:
+    """
+    Thread-safe LRU/TTL cache of member documents.
+
+    A member can have one document per kind, e.g. the full member
+    response and the smaller lookup document; all of them are dropped
+    together when the member is invalidated.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        # (kind, member id) -> (expiry, document, row version), least
+        # recently used first
+        self._entries: OrderedDict[tuple[str, int], tuple[float, str, int]] = (
+            OrderedDict()
+        )
+        self._kinds_by_id: dict[int, set[str]] = {}
+        self._id_by_reference: dict[int, int] = {}
+        self._reference_by_id: dict[int, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Number of invalidations so far; read it before querying a document."""
+        return self._generation
+
+    def get_by_reference(
+        self, kind: str, reference_number: int
+    ) -> tuple[str, int] | None:
+        """
+        Return the cached document of the member with this reference number.
+
+        Args:
+            kind (str): Document kind, e.g. "member" or "lookup"
+            reference_number (int): Member's reference number
+
+        Returns:
+            tuple | None: The document and the member's row version, None
+                on a miss or when disabled
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            member_id = self._id_by_reference.get(reference_number)
+            document = None if member_id is None else self._get(kind, member_id)
+        (cache_hits if document is not None else cache_misses).labels(kind).inc()
+        return document
+
+    def _get(self, kind: str, member_id: int) -> tuple[str, int] | None:
+        entry = self._entries.get((kind, member_id))
+        if entry is None:
+            return None
+        expiry, document, version = entry
+        if expiry <= time.monotonic():
+            self._drop(member_id)
+            cache_evictions.labels("expired").inc()
+            return None
+        self._entries.move_to_end((kind, member_id))
+        return document, version
+
+    def put(
+        self,
+        kind: str,
+        member_id: int,
+        reference_number: int,
+        document: str,
+        version: int,
+        generation: int,
+    ):
+        """
+        Cache a member's document, evicting the least recently used ones.
+
+        Args:
+            kind (str): Document kind, e.g. "member" or "lookup"
+            member_id (int): Member's id
+            reference_number (int): Member's reference number
+            document (str): JSON document
+            version (int): Member's row version when the document was read
+            generation (int): `generation` read before querying the document;
+                if there were invalidations since, the document is not cached
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[(kind, member_id)] = (
+                time.monotonic() + self.ttl,
+                document,
+                version,
+            )
+            self._entries.move_to_end((kind, member_id))
+            self._kinds_by_id.setdefault(member_id, set()).add(kind)
+            self._id_by_reference[reference_number] = member_id
+            self._reference_by_id[member_id] = reference_number
+            while len(self._entries) > self.max_entries:
+                (old_kind, old_id), _ = self._entries.popitem(last=False)
+                kinds = self._kinds_by_id[old_id]
+                kinds.discard(old_kind)
+                if not kinds:
+                    self._drop(old_id)
+                cache_evictions.labels("size").inc()
+            cache_entries.set(len(self._entries))
+
+    def invalidate(self, *member_ids: int):
+        """Drop every document of these members."""
+        self.invalidate_many(member_ids)
+
+    def invalidate_many(self, member_ids: Iterable[int]):
+        with self._lock:
+            self._generation += 1
+            for member_id in member_ids:
+                if member_id in self._kinds_by_id:
+                    self._drop(member_id)
+                    cache_evictions.labels("invalidated").inc()
+            cache_entries.set(len(self._entries))
+
+    def clear(self):
+        """Drop everything, e.g. after a bulk change of unknown members."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._kinds_by_id.clear()
+            self._id_by_reference.clear()
+            self._reference_by_id.clear()
+            cache_entries.set(0)
+
+    def _drop(self, member_id: int):
+        for kind in self._kinds_by_id.pop(member_id, ()):
+            self._entries.pop((kind, member_id), None)
+        reference_number = self._reference_by_id.pop(member_id, None)
+        if self._id_by_reference.get(reference_number) == member_id:
+            del self._id_by_reference[reference_number]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SearchCache:
+    """
+    LRU/TTL cache of search response bodies, valid for one write generation.
+
+    `get_or_compute` runs in threadpool workers (sync routes) and
+    `get_or_compute_async` on the event loop (async routes); each
+    coalesces the concurrent misses of its own kind.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        # key -> (generation, expiry, body), least recently used first
+        self._entries: OrderedDict[Hashable, tuple[int, float, bytes]] = OrderedDict()
+        # (key, generation) -> future of the body being queried
+        self._flights: dict[tuple[Hashable, int], Future] = {}
+        self._async_flights: dict[tuple[Hashable, int], asyncio.Future] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def bump(self):
+        """Start a new write generation, making every cached page stale."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def _lookup(self, key: Hashable) -> tuple[int, bytes | None]:
+        """Current generation and the body cached for it, under the lock."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            generation, expiry, body = entry
+            if generation == self._generation and expiry > time.monotonic():
+                self._entries.move_to_end(key)
+                return self._generation, body
+            del self._entries[key]
+        return self._generation, None
+
+    def _store(self, key: Hashable, generation: int, body: bytes | None):
+        with self._lock:
+            if body is None or generation != self._generation:
+                return
+            self._entries[key] = (generation, time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], bytes]) -> bytes:
+        """
+        Return the cached body for `key`, or compute and cache it.
+
+        When another thread is already computing the same key in the
+        same generation, wait for its body instead. If it fails, e.g.
+        with a 404, each waiting thread computes its own.
+
+        Args:
+            key (Hashable): Search and page parameters
+            compute (Callable): Queries the database for the body
+
+        Returns:
+            bytes: The response body
+        """
+        if not self.enabled:
+            return compute()
+        with self._lock:
+            generation, body = self._lookup(key)
+            flight = self._flights.get((key, generation))
+            leader = body is None and flight is None
+            if leader:
+                flight = self._flights[(key, generation)] = Future()
+        if body is not None:
+            search_cache_hits.inc()
+            return body
+        if not leader:
+            search_cache_coalesced.inc()
+            return flight.result() or compute()
+
+        search_cache_misses.inc()
+        try:
+            body = compute()
+        finally:
+            self._store(key, generation, body)
+            with self._lock:
+                del self._flights[(key, generation)]
+            flight.set_result(body)
+        return body
+
+    async def get_or_compute_async(
+        self, key: Hashable, compute: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """Async version of `get_or_compute`, for the async routes."""
+        if not self.enabled:
+            return await compute()
+        with self._lock:
+            generation, body = self._lookup(key)
+            flight = self._async_flights.get((key, generation))
+            leader = body is None and flight is None
+            if leader:
+                flight = asyncio.get_running_loop().create_future()
+                self._async_flights[(key, generation)] = flight
+        if body is not None:
+            search_cache_hits.inc()
+            return body
+        if not leader:
+            search_cache_coalesced.inc()
+            # A waiting request being cancelled must not cancel the flight
+            return await asyncio.shield(flight) or await compute()
+
+        search_cache_misses.inc()
+        try:
+            body = await compute()
+        finally:
+            self._store(key, generation, body)
+            with self._lock:
+                del self._async_flights[(key, generation)]
+            flight.set_result(body)
+        return body
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+member_cache = MemberCache(
+    max_entries=settings.MEMBER_CACHE_MAX_ENTRIES,
+    ttl=settings.MEMBER_CACHE_TTL,
+    enabled=settings.MEMBER_CACHE_ENABLED,
+)
+search_cache = SearchCache(
+    max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+    ttl=settings.SEARCH_CACHE_TTL,
+    enabled=settings.SEARCH_CACHE_ENABLED,
+)
+
+
+def members_changed(*member_ids: int):
+    """
+    Invalidate the caches after a commit changing members or memberships.
+
+    Args:
+        *member_ids (int): Members changed, or their memberships; none
+            when they are not known, which empties the member cache
+    """
+    if member_ids:
+        member_cache.invalidate_many(member_ids)
+    else:
+        member_cache.clear()
+    search_cache.bump()
@@ -0,0 +1,140 @@
+# app/cache_invalidation.py
+
+"""
+Cross-worker invalidation of the member caches with LISTEN/NOTIFY.
+
+Statement triggers on the members and memberships tables publish the
+ids of the members each statement changed on
+`models.MEMBER_CHANGES_CHANNEL` when the transaction commits, or
+`models.MEMBER_CHANGES_ALL` when too many changed. Each API worker runs
+one listener thread on a connection of its own, outside the engine
+pools, and evicts the members it is notified of. Notifications sent
+while the listener is disconnected are lost, so the caches are emptied
+whenever it (re)connects.
+"""
+
+import logging
+import threading
+
+import psycopg
+from cache import members_changed
+from config import settings
+from models import MEMBER_CHANGES_ALL, MEMBER_CHANGES_CHANNEL
+from prometheus_client import Counter, Gauge
+from psycopg import sql
+from sqlalchemy import make_url
+
+logger = logging.getLogger(__name__)
+
+notifications_received = Counter(
+    "cache_invalidation_notifications_total",
+    "Member change notifications received by the cache invalidation listener",
+)
+listener_connected = Gauge(
+    "cache_invalidation_listener_connected",
+    "Whether the cache invalidation listener is connected (1) or not (0)",
+)
+
+
+def listener_conninfo(database_url: str) -> str:
+    """libpq connection string of a SQLAlchemy database URL, any driver."""
+    return (
+        make_url(database_url)
+        .set(drivername="postgresql")
+        .render_as_string(hide_password=False)
+    )
+
+
+def handle_notification(payload: str):
+    """
+    Evict the members listed by a notification, e.g. "12,15,31".
+
+    Everything is evicted for MEMBER_CHANGES_ALL, and for an unreadable
+    payload.
+    """
+    notifications_received.inc()
+    if payload == MEMBER_CHANGES_ALL:
+        members_changed()
+        return
+    try:
+        member_ids = [int(member_id) for member_id in payload.split(",")]
+    except ValueError:
+        logger.warning("Unexpected member change payload", extra={"payload": payload})
+        members_changed()
+        return
+    members_changed(*member_ids)
+
+
+class InvalidationListener:
+    """
+    Background thread receiving member change notifications.
+
+    The thread waits for notifications at most `poll_interval` seconds
+    at a time, so `stop` returns promptly; a lost connection is retried
+    every `retry_delay` seconds.
+    """
+
+    def __init__(
+        self,
+        conninfo: str,
+        channel: str = MEMBER_CHANGES_CHANNEL,
+        poll_interval: float = 1.0,
+        retry_delay: float = 5.0,
+    ):
+        self.conninfo = conninfo
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.retry_delay = retry_delay
+        self._stopping = threading.Event()
+        self._listening = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="cache-invalidation", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def wait_listening(self, timeout: float | None = None) -> bool:
+        """Wait until the listener has subscribed, e.g. before a test writes."""
+        return self._listening.wait(timeout)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                self._listen()
+            except (psycopg.Error, OSError) as e:
+                logger.warning(
+                    "Cache invalidation listener disconnected",
+                    extra={"error": str(e), "retry_in": self.retry_delay},
+                )
+            finally:
+                self._listening.clear()
+                listener_connected.set(0)
+            self._stopping.wait(self.retry_delay)
+
+    def _listen(self):
+        with psycopg.connect(self.conninfo, autocommit=True) as conn:
+            conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+            # Changes committed while not listening were missed
+            members_changed()
+            listener_connected.set(1)
+            self._listening.set()
+            logger.info("Listening for member changes", extra={"channel": self.channel})
+            while not self._stopping.is_set():
+                for notify in conn.notifies(timeout=self.poll_interval):
+                    handle_notification(notify.payload)
+
+
+invalidation_listener = InvalidationListener(
+    listener_conninfo(settings.CACHE_INVALIDATION_DATABASE_URL or settings.DATABASE_URL)
+)
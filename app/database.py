@@ -1,17 +1,192 @@
 # app/database.py
 
 # app/database.py
-import sys
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
 
 from config import settings
-from sqlalchemy import create_engine
+from db_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+from query_stats import current_route
+from sqlalchemy import URL, create_engine, event, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
+logger = logging.getLogger(__name__)
+
+
+def parameters_shape(parameters, executemany: bool = False):
+    """
+    Describe statement parameters by type only, so no value is recorded.
+
+    Returns:
+        {"name": "str", ...} for named parameters, ["int", ...] for
+        positional ones; for executemany, the shape of the first set
+        and the number of sets.
+    """
+    if executemany:
+        rows = list(parameters or [])
+        return {
+            "rows": len(rows),
+            "each": parameters_shape(rows[0]) if rows else None,
+        }
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+@dataclass
+class SlowQuery:
+    timestamp: str
+    duration_ms: float
+    statement: str
+    parameters: dict | list
+    route: str | None
+    # EXPLAIN (ANALYZE, BUFFERS) output, for sampled SELECT statements
+    plan: str | None = None
+
+
+class SlowQueryLog:
+    """
+    Ring buffer of the statements that ran longer than a threshold.
+
+    A sampled fraction of slow SELECT statements on PostgreSQL is run
+    again under EXPLAIN (ANALYZE, BUFFERS), right after the original and
+    on the same connection, to capture the plan with real timings. Only
+    SELECTs are explained, as ANALYZE executes the statement. The
+    EXPLAIN runs in a savepoint so that its failure cannot abort the
+    request's transaction.
+    """
+
+    def __init__(self, threshold_ms: float, explain_sample_rate: float, size: int):
+        self.threshold = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+        self.records: deque[SlowQuery] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def attach(self, target=Engine):
+        """Time the statements of an engine, or of all engines by default."""
+        event.listen(target, "before_cursor_execute", self._before_execute)
+        event.listen(target, "after_cursor_execute", self._after_execute)
+
+    def detach(self, target=Engine):
+        event.remove(target, "before_cursor_execute", self._before_execute)
+        event.remove(target, "after_cursor_execute", self._after_execute)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, many):
+        context._slow_query_start = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, many):
+        duration = time.perf_counter() - context._slow_query_start
+        if duration < self.threshold:
+            return
+        record = SlowQuery(
+            timestamp=datetime.now(UTC).isoformat(),
+            duration_ms=round(duration * 1000, 3),
+            statement=statement,
+            parameters=parameters_shape(parameters, many),
+            route=current_route(),
+        )
+        if (
+            conn.dialect.name == "postgresql"
+            and not many
+            and not context.execution_options.get("stream_results")
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and random.random() < self.explain_sample_rate
+        ):
+            record.plan = self._explain(conn, statement, parameters)
+        with self._lock:
+            self.records.append(record)
+        logger.warning(
+            "Slow query (%.1f ms) from %s: %s",
+            record.duration_ms,
+            record.route,
+            statement,
+            extra={"duration_ms": record.duration_ms, "route": record.route},
+        )
+
+    def _explain(self, conn, statement: str, parameters) -> str | None:
+        dbapi_connection = conn.connection.dbapi_connection
+        in_transaction = not getattr(dbapi_connection, "autocommit", False)
+        cursor = dbapi_connection.cursor()
+        try:
+            if in_transaction:
+                cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            except conn.dialect.loaded_dbapi.Error as exc:
+                # The driver's own errors: the cursor is the raw DBAPI one
+                if in_transaction:
+                    cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                return f"EXPLAIN failed: {exc}"
+            if in_transaction:
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            return plan
+        finally:
+            cursor.close()
+
+    def snapshot(self) -> list[dict]:
+        """The recorded statements, newest first."""
+        with self._lock:
+            return [asdict(record) for record in reversed(self.records)]
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+
+slow_query_log = SlowQueryLog(
+    settings.SLOW_QUERY_THRESHOLD_MS,
+    settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    settings.SLOW_QUERY_LOG_SIZE,
+)
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.attach()
+
+
+def engine_options(url: URL) -> dict:
+    """
+    Connection pool and driver options of an engine, from the DB_* settings.
+
+    In PgBouncer mode psycopg 3 never prepares statements on the server:
+    with transaction pooling, the next transaction may run on a server
+    connection where the prepared statement does not exist. psycopg2 does
+    not prepare statements, so it needs no change.
+
+    Args:
+        url (URL): Database URL of the engine
+
+    Returns:
+        dict: Keyword arguments for create_engine / create_async_engine
+    """
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_PGBOUNCER and url.get_driver_name() == "psycopg":
+        options["connect_args"] = {"prepare_threshold": None}
+    return options
+
+
 # The URL now comes straight from settings.DATABASE_URL
-print(
-    f"[DB] creating engine with DATABASE_URL={settings.DATABASE_URL!r}", file=sys.stderr
+database_url = make_url(settings.DATABASE_URL)
+logger.debug("Creating engine", extra={"database_url": repr(database_url)})
+engine = create_engine(
+    database_url,
+    poolclass=InstrumentedQueuePool,
+    pool_logging_name="sync",
+    future=True,
+    **engine_options(database_url),
 )
-engine = create_engine(settings.DATABASE_URL, future=True)
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -20,6 +195,24 @@ SessionLocal = sessionmaker(
     future=True,
 )
 
+# Same database on psycopg 3, whose asyncio support backs the async routes.
+# No connection is opened until the first async session is used.
+async_database_url = database_url.set(drivername="postgresql+psycopg")
+async_engine = create_async_engine(
+    async_database_url,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_logging_name="async",
+    **engine_options(async_database_url),
+)
+
+# Attributes are not expired on commit: an async session cannot reload
+# them implicitly, so handlers reload what the database changed.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
 
@@ -32,3 +225,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Yields a new async database session for each request, then closes it.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,107 @@
+# app/db_metrics.py
+
+"""
+Prometheus metrics of the database connection pools.
+
+The pool classes time every checkout, i.e. how long a request waited for
+a connection, and count checkouts that timed out. The collector reads the
+pool gauges (size, idle, in use, overflow) at each scrape, so they are
+exact at that moment and cost nothing between scrapes. Pools are
+labelled with the engine's `pool_logging_name`.
+"""
+
+import time
+
+from prometheus_client import REGISTRY, Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+checkout_timeouts = Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after the pool timeout",
+    ["pool"],
+)
+
+
+class _TimedCheckout:
+    """Pool mixin recording the wait of every checkout."""
+
+    def _do_get(self):
+        label = self.logging_name or "default"
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            checkout_timeouts.labels(label).inc()
+            raise
+        finally:
+            checkout_wait.labels(label).observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+class PoolCollector(Collector):
+    """
+    Publish the state of engines' connection pools as gauges.
+
+    The pool is looked up on every scrape, as `engine.dispose()` replaces it.
+    """
+
+    def __init__(self, engines: dict):
+        # Label -> Engine (for an AsyncEngine, its sync_engine)
+        self.engines = engines
+
+    def collect(self):
+        gauges = {
+            "size": GaugeMetricFamily(
+                "db_pool_size", "Configured pool size", labels=["pool"]
+            ),
+            "checkedin": GaugeMetricFamily(
+                "db_pool_checked_in", "Idle connections in the pool", labels=["pool"]
+            ),
+            "checkedout": GaugeMetricFamily(
+                "db_pool_checked_out", "Connections in use", labels=["pool"]
+            ),
+            "overflow": GaugeMetricFamily(
+                "db_pool_overflow",
+                "Connections over the pool size (negative: not opened yet)",
+                labels=["pool"],
+            ),
+        }
+        for label, engine in self.engines.items():
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                continue
+            for method, gauge in gauges.items():
+                gauge.add_metric([label], getattr(pool, method)())
+        yield from gauges.values()
+
+
+def register_pool_metrics(engines: dict, registry=REGISTRY) -> PoolCollector:
+    """
+    Add the pool gauges of `engines` to the registry served on /metrics.
+
+    Args:
+        engines (dict): Label -> Engine, e.g. {"sync": engine}
+        registry (CollectorRegistry): Registry to add the collector to
+
+    Returns:
+        PoolCollector: The registered collector
+    """
+    collector = PoolCollector(engines)
+    registry.register(collector)
+    return collector
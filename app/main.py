@@ -7,20 +7,55 @@ This module creates the FastAPI application instance and includes routers
 for different functional domains (members, miscellaneous).
 """
 
+from contextlib import asynccontextmanager
+
+from api.routes_bulk import router as bulk_router
+from api.routes_letters import router as letters_router
 from api.routes_member import router as member_router
+from api.routes_member_async import router as member_async_router
 from api.routes_membership import router as membership_router
+from api.routes_membership_async import router as membership_async_router
 from api.routes_misc import router as misc_router
+from cache_invalidation import invalidation_listener
+from config import settings
+from database import async_engine, engine
+from db_metrics import register_pool_metrics
 from fastapi import FastAPI
+from logging_config import CorrelationIdMiddleware
+from pdf.generate_welcome_letter import renderer, warm_up_renderer
+from pdf.jobs import letter_jobs
 from prometheus_fastapi_instrumentator import Instrumentator
+from query_stats import QueryStatsMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start-up and shutdown hooks of the application.
+    """
+    if settings.LETTER_WARM_UP:
+        renderer.warm_up()
+        letter_jobs.start(initializer=warm_up_renderer)
+    if settings.CACHE_INVALIDATION_LISTEN:
+        invalidation_listener.start()
+    yield
+    invalidation_listener.stop()
+    letter_jobs.shutdown()
+    await async_engine.dispose()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Membership Manager API",
     description="A simple API for managing memberships and members.",
     version="0.0.1",
     contact={"name": "Lionel", "email": "email@toto.com"},
 )
 
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(CorrelationIdMiddleware)
 Instrumentator().instrument(app).expose(app)
+register_pool_metrics({"sync": engine, "async": async_engine.sync_engine})
 
 
 @app.get("/")
@@ -36,5 +71,11 @@ def read_root():
 
 # Include API routers
 app.include_router(misc_router)
-app.include_router(member_router)
-app.include_router(membership_router)
+if settings.ASYNC_DB_ENABLED:
+    app.include_router(member_async_router)
+    app.include_router(membership_async_router)
+else:
+    app.include_router(member_router)
+    app.include_router(membership_router)
+app.include_router(letters_router)
+app.include_router(bulk_router)
@@ -2,6 +2,8 @@
 
 # model.py defines the database models for the application as a class.
 
+import logging
+
 from config import settings
 from database import Base
 from sqlalchemy import (
@@ -11,14 +13,20 @@ from sqlalchemy import (
     Column,
     Computed,
     Date,
+    FetchedValue,
     ForeignKey,
+    Index,
     Integer,
     Sequence,
     String,
+    UniqueConstraint,
     event,
     func,
 )
-from sqlalchemy.orm import relationship, validates
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship, validates
+
+logger = logging.getLogger(__name__)
 
 # Define the sequence for reference_number, starting at 2_000_000_000
 reference_number_seq = Sequence("reference_number_seq", start=2000000000, increment=1)
@@ -30,10 +38,49 @@ event.listen(
         "CREATE SEQUENCE IF NOT EXISTS reference_number_seq START WITH 2000000000 INCREMENT BY 1 OWNED BY NONE;"
     ),
 )
+# Version of each member row, taken from a sequence: see MEMBER_VERSION_DDL
+member_version_seq = Sequence("member_version_seq")
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE SEQUENCE IF NOT EXISTS member_version_seq;"),
+)
+# Trigram operator classes for the substring search indexes
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm;"),
+)
+
+# Columns searched with ilike('%term%'), served by trigram GIN indexes
+TRIGRAM_SEARCH_COLUMNS = ("first_name", "last_name", "city", "full_name")
+
+# Document of the ranked full-text search: names weigh most, notes least.
+# The 'simple' configuration does not stem, names are not dictionary words.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(first_name, '')), 'A')"
+    " || setweight(to_tsvector('simple', coalesce(last_name, '')), 'A')"
+    " || setweight(to_tsvector('simple', coalesce(organization, '')), 'B')"
+    " || setweight(to_tsvector('simple', coalesce(city, '')), 'B')"
+    " || setweight(to_tsvector('simple', coalesce(email, '')), 'C')"
+    " || setweight(to_tsvector('simple', coalesce(notes, '')), 'D')"
+)
 
 
 class Member(Base):
     __tablename__ = "members"
+    __table_args__ = (
+        *(
+            Index(
+                f"ix_members_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+            for column in TRIGRAM_SEARCH_COLUMNS
+        ),
+        Index("ix_members_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
     first_name = Column(String(100), index=True)
@@ -65,6 +112,20 @@ class Member(Base):
         index=True,
     )
 
+    # New value on every change of the member or of their memberships, set
+    # by triggers; the ETag of the member's documents
+    row_version = Column(
+        BigInteger,
+        nullable=False,
+        server_default=member_version_seq.next_value(),
+        server_onupdate=FetchedValue(),
+    )
+
+    # Only read by the search query, so never loaded with the member
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True), nullable=False)
+    )
+
     memberships = relationship(
         "Membership", back_populates="member", cascade="all, delete-orphan"
     )
@@ -72,6 +133,10 @@ class Member(Base):
 
 class Membership(Base):
     __tablename__ = "memberships"
+    # One membership per member and year, the target of bulk upserts
+    __table_args__ = (
+        UniqueConstraint("member_id", "year", name="uq_memberships_member_id_year"),
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
     member_id = Column(BigInteger, ForeignKey("members.id"), nullable=False, index=True)
@@ -91,15 +156,169 @@ class Membership(Base):
         """
         # note: value is the new amount
         self.is_paid = value > settings.UNPAID_MEMBERSHIP
-        print(f"[DEBUG] _compute_payment_flags: amount={value}, is_paid={self.is_paid}")
-        print(
-            f"[DEBUG] _compute_payment_flags: UNPAID_MEMBERSHIP={settings.UNPAID_MEMBERSHIP}, "
-            f"STANDARD_MEMBERSHIP_FEE={settings.STANDARD_MEMBERSHIP_FEE}"
-        )
         self.discounted = (
             settings.UNPAID_MEMBERSHIP < value < settings.STANDARD_MEMBERSHIP_FEE
         )
-        print(
-            f"[DEBUG] _compute_payment_flags: discounted={self.discounted}, STANDARD_MEMBERSHIP_FEE={settings.STANDARD_MEMBERSHIP_FEE} "
-        )
+        # Runs for every amount set, bulk updates included: keep the disabled
+        # case to one level check, and sample what is logged
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "_compute_payment_flags: amount=%s is_paid=%s discounted=%s "
+                "(UNPAID_MEMBERSHIP=%s, STANDARD_MEMBERSHIP_FEE=%s)",
+                value,
+                self.is_paid,
+                self.discounted,
+                settings.UNPAID_MEMBERSHIP,
+                settings.STANDARD_MEMBERSHIP_FEE,
+                extra={"sample_rate": settings.LOG_SAMPLE_RATE},
+            )
         return value
+
+
+# Every statement changing members or memberships publishes the ids of
+# the members it changed on this channel, comma-separated, for each API
+# worker to evict them from its caches; a statement changing too many
+# members for one payload publishes MEMBER_CHANGES_ALL instead. PostgreSQL
+# delivers notifications on commit, each distinct payload once per
+# transaction.
+MEMBER_CHANGES_CHANNEL = "member_changes"
+MEMBER_CHANGES_ALL = "*"
+# Longest id list sent, well below the 8000 byte limit of a payload
+MEMBER_CHANGES_MAX_PAYLOAD = 4000
+
+
+# Statement triggers with transition tables handle a single event each:
+# event -> REFERENCING clause of its trigger
+TRANSITION_TABLES = {
+    "insert": "REFERENCING NEW TABLE AS new_rows",
+    "update": "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "delete": "REFERENCING OLD TABLE AS old_rows",
+}
+
+
+def notify_change_ddl(table: str, member_id_column: str) -> list[DDL]:
+    """
+    Trigger function and statement triggers publishing a table's changes.
+
+    The triggers run once per statement, not per row, and read the
+    changed rows from their transition tables: a bulk import or upsert
+    sends one notification.
+    """
+    function = f"notify_{table}_change"
+    column = member_id_column
+    return [
+        DDL(
+            f"""
+            CREATE OR REPLACE FUNCTION {function}() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            DECLARE
+                payload text;
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    SELECT string_agg(DISTINCT {column}::text, ',') INTO payload
+                    FROM new_rows;
+                ELSIF TG_OP = 'DELETE' THEN
+                    SELECT string_agg(DISTINCT {column}::text, ',') INTO payload
+                    FROM old_rows;
+                ELSE
+                    SELECT string_agg(DISTINCT {column}::text, ',') INTO payload
+                    FROM (
+                        SELECT {column} FROM old_rows
+                        UNION ALL
+                        SELECT {column} FROM new_rows
+                    ) AS changed;
+                END IF;
+                IF length(payload) > {MEMBER_CHANGES_MAX_PAYLOAD} THEN
+                    payload := '{MEMBER_CHANGES_ALL}';
+                END IF;
+                IF payload IS NOT NULL THEN
+                    PERFORM pg_notify('{MEMBER_CHANGES_CHANNEL}', payload);
+                END IF;
+                RETURN NULL;
+            END
+            $$
+            """
+        ),
+        *(
+            DDL(
+                f"CREATE TRIGGER {table}_notify_{trigger_event} "
+                f"AFTER {trigger_event.upper()} ON {table} {referencing} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()"
+            )
+            for trigger_event, referencing in TRANSITION_TABLES.items()
+        ),
+    ]
+
+
+for _table, _column in ((Member.__table__, "id"), (Membership.__table__, "member_id")):
+    for _ddl in notify_change_ddl(_table.name, _column):
+        event.listen(_table, "after_create", _ddl)
+
+# Members get a new row version when updated, and when one of their
+# memberships is inserted, updated or deleted: once per statement, however
+# many of their memberships it changed
+MEMBER_VERSION_DDL = {
+    Member.__table__: [
+        DDL(
+            """
+            CREATE OR REPLACE FUNCTION bump_member_version() RETURNS trigger
+            LANGUAGE plpgsql AS $$
+            BEGIN
+                NEW.row_version := nextval('member_version_seq');
+                RETURN NEW;
+            END
+            $$
+            """
+        ),
+        DDL(
+            "CREATE TRIGGER members_bump_version BEFORE UPDATE ON members "
+            "FOR EACH ROW EXECUTE FUNCTION bump_member_version()"
+        ),
+    ],
+    Membership.__table__: [
+        DDL(
+            """
+            CREATE OR REPLACE FUNCTION bump_membership_member_version()
+            RETURNS trigger LANGUAGE plpgsql AS $$
+            DECLARE
+                member_ids bigint[];
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    SELECT array_agg(DISTINCT member_id) INTO member_ids
+                    FROM new_rows;
+                ELSIF TG_OP = 'DELETE' THEN
+                    SELECT array_agg(DISTINCT member_id) INTO member_ids
+                    FROM old_rows;
+                ELSE
+                    SELECT array_agg(DISTINCT member_id) INTO member_ids
+                    FROM (
+                        SELECT member_id FROM old_rows
+                        UNION ALL
+                        SELECT member_id FROM new_rows
+                    ) AS changed;
+                END IF;
+                -- Lock the members in id order, so that concurrent
+                -- statements cannot deadlock on them
+                PERFORM 1 FROM members WHERE id = ANY (member_ids)
+                ORDER BY id FOR UPDATE;
+                -- members_bump_version sets the new versions
+                UPDATE members SET row_version = row_version
+                WHERE id = ANY (member_ids);
+                RETURN NULL;
+            END
+            $$
+            """
+        ),
+        *(
+            DDL(
+                f"CREATE TRIGGER memberships_bump_member_version_{trigger_event} "
+                f"AFTER {trigger_event.upper()} ON memberships {referencing} "
+                "FOR EACH STATEMENT EXECUTE FUNCTION bump_membership_member_version()"
+            )
+            for trigger_event, referencing in TRANSITION_TABLES.items()
+        ),
+    ],
+}
+for _table, _ddls in MEMBER_VERSION_DDL.items():
+    for _ddl in _ddls:
+        event.listen(_table, "after_create", _ddl)
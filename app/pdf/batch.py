@@ -0,0 +1,208 @@
+# app/pdf/batch.py
+
+"""
+Parallel bulk rendering of welcome letters.
+
+Letters are described by the plain-data contexts built with
+`letter_context`, grouped into chunks and rendered by a pool of worker
+processes. Each worker is replaced after a number of chunks, because
+WeasyPrint memory keeps growing over a long run.
+"""
+
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+
+from config import settings
+from pdf.generate_welcome_letter import RENDER_ERRORS, render_letter
+
+
+@dataclass
+class LetterFailure:
+    reference_number: int | None
+    error: str
+
+
+@dataclass
+class BatchReport:
+    generated: int = 0
+    failures: list[LetterFailure] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.generated + len(self.failures)
+
+    @property
+    def throughput(self) -> float:
+        """Letters processed per second."""
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+
+def _chunks(
+    contexts: Iterable[dict], size: int, align: int = 0
+) -> Iterator[list[dict]]:
+    """Chunks of `size` contexts; with `align`, none spans a multiple of it."""
+    iterator = iter(contexts)
+    position = 0
+    while True:
+        take = min(size, align - position % align) if align else size
+        chunk = list(islice(iterator, take))
+        if not chunk:
+            return
+        position += len(chunk)
+        yield chunk
+
+
+def reference_number(context: dict) -> int | None:
+    return context.get("member", {}).get("reference_number")
+
+
+def render_chunk(
+    chunk: list[dict], output_dir: Path
+) -> list[tuple[int | None, str | None]]:
+    """
+    Render one chunk of letters, isolating failures per letter.
+
+    Args:
+        chunk (list[dict]): Letter contexts
+        output_dir (Path): Directory to save PDFs in
+
+    Returns:
+        list[tuple]: (reference_number, error) per letter, error is None on success
+    """
+    results = []
+    for context in chunk:
+        try:
+            render_letter(context, output_dir, settings.LOG_SAMPLE_RATE)
+            results.append((reference_number(context), None))
+        except RENDER_ERRORS as e:
+            results.append((reference_number(context), f"{type(e).__name__}: {e}"))
+    return results
+
+
+def _record(report: BatchReport, results: list[tuple[int | None, str | None]]):
+    for ref, error in results:
+        if error is None:
+            report.generated += 1
+        else:
+            report.failures.append(LetterFailure(ref, error))
+
+
+def run_chunks(
+    contexts: Iterable[dict],
+    task: Callable[[list[dict], Path], list[tuple[int | None, str | None]]],
+    target_for: Callable[[int], Path],
+    workers: int = 1,
+    chunk_size: int = 25,
+    recycle_after: int = 500,
+    on_progress: Callable[[BatchReport], None] | None = None,
+    report: BatchReport | None = None,
+    align: int = 0,
+) -> BatchReport:
+    """
+    Run `task(chunk, target_for(index))` over chunks of letter contexts.
+
+    With `workers` > 1 chunks run in a process pool whose workers are
+    replaced after `recycle_after` letters. Only a bounded number of chunks
+    is in flight at a time, so `contexts` may be a lazy iterator over a very
+    large result set. A failed letter is recorded in the report and never
+    stops the batch.
+
+    Args:
+        contexts (Iterable[dict]): Letter contexts from `letter_context`
+        task (Callable): Picklable top-level function rendering one chunk
+        target_for (Callable): Output location of the chunk with a given index
+        workers (int): Number of worker processes (1 renders in-process)
+        chunk_size (int): Letters sent to a worker per task
+        recycle_after (int): Letters a worker renders before it is replaced
+        on_progress (Callable): Called with the running report after each chunk
+        report (BatchReport | None): Report to fill, a new one by default
+        align (int): Start a new chunk every `align` letters, e.g. at each
+            volume of a print run; 0 to chunk straight through
+
+    Returns:
+        BatchReport: Counts, failures and timing of the run
+    """
+    report = report if report is not None else BatchReport()
+    start = time.perf_counter()
+
+    def _progress(results):
+        _record(report, results)
+        report.elapsed = time.perf_counter() - start
+        if on_progress:
+            on_progress(report)
+
+    chunks = enumerate(_chunks(contexts, chunk_size, align))
+
+    if workers <= 1:
+        for index, chunk in chunks:
+            _progress(task(chunk, target_for(index)))
+        return report
+
+    tasks_per_child = max(1, recycle_after // chunk_size)
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(
+        max_workers=workers, max_tasks_per_child=tasks_per_child
+    ) as pool:
+        in_flight: dict[Future, list[dict]] = {}
+        for index, chunk in chunks:
+            in_flight[pool.submit(task, chunk, target_for(index))] = chunk
+            if len(in_flight) >= max_in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _collect(future, in_flight.pop(future), _progress)
+        for future in list(in_flight):
+            _collect(future, in_flight.pop(future), _progress)
+
+    return report
+
+
+def render_letters(
+    contexts: Iterable[dict],
+    output_dir: Path,
+    workers: int = 1,
+    chunk_size: int = 25,
+    recycle_after: int = 500,
+    on_progress: Callable[[BatchReport], None] | None = None,
+) -> BatchReport:
+    """
+    Render one welcome letter PDF per context, in parallel when `workers` > 1.
+
+    Args:
+        contexts (Iterable[dict]): Letter contexts from `letter_context`
+        output_dir (Path): Directory to save PDFs in
+        workers (int): Number of worker processes (1 renders in-process)
+        chunk_size (int): Letters sent to a worker per task
+        recycle_after (int): Letters a worker renders before it is replaced
+        on_progress (Callable): Called with the running report after each chunk
+
+    Returns:
+        BatchReport: Counts, failures and timing of the run
+    """
+    return run_chunks(
+        contexts,
+        render_chunk,
+        lambda _: output_dir,
+        workers=workers,
+        chunk_size=chunk_size,
+        recycle_after=recycle_after,
+        on_progress=on_progress,
+    )
+
+
+def _collect(future: Future, chunk: list[dict], progress: Callable):
+    """
+    Report a finished chunk; a crashed worker, or a chunk whose output
+    could not be written, fails the whole chunk.
+    """
+    try:
+        results = future.result()
+    except (BrokenProcessPool, *RENDER_ERRORS) as e:
+        error = f"worker failed: {type(e).__name__}: {e}"
+        results = [(reference_number(context), error) for context in chunk]
+    progress(results)
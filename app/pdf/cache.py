@@ -0,0 +1,167 @@
+# app/pdf/cache.py
+
+"""
+Content-addressed cache for rendered welcome letters.
+
+A letter is identified by a hash of the template source and of the
+template context. A small SQLite manifest in the output directory maps
+each PDF file to the key it was rendered from, so unchanged letters are
+served from disk instead of being rendered again. SQLite is used because
+the batch workers update the manifest from several processes at once.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+from config import settings
+from prometheus_client import Counter
+
+MANIFEST_NAME = ".render_cache.sqlite3"
+
+cache_hits = Counter(
+    "welcome_letter_cache_hits_total", "Welcome letters served from the cache"
+)
+cache_misses = Counter(
+    "welcome_letter_cache_misses_total", "Welcome letters that had to be rendered"
+)
+cache_evictions = Counter(
+    "welcome_letter_cache_evictions_total", "Cached welcome letters evicted"
+)
+
+_digests: dict[Path, tuple[int, int, str]] = {}
+
+
+def _file_digest(path: Path) -> str:
+    """Hash a file, reusing the previous hash while its mtime and size match."""
+    stat = path.stat()
+    cached = _digests.get(path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    _digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+def render_key(context: dict, sources: list[Path]) -> str:
+    """
+    Compute the cache key of a letter.
+
+    Args:
+        context (dict): Template context from `letter_context`
+        sources (list[Path]): Template and stylesheet files the render reads
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    h = hashlib.sha256()
+    for source in sources:
+        h.update(_file_digest(source).encode())
+    h.update(json.dumps(context, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class LetterCache:
+    """
+    Manifest of rendered letters in one output directory, bounded in size.
+    """
+
+    def __init__(self, output_dir: Path, max_bytes: int):
+        self.output_dir = output_dir
+        self.max_bytes = max_bytes
+        self.manifest = output_dir / MANIFEST_NAME
+        output_dir.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS letters ("
+                " filename TEXT PRIMARY KEY,"
+                " key TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_used REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS letters_last_used ON letters (last_used)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call: callers may be threads or processes
+        return sqlite3.connect(self.manifest, timeout=30)
+
+    def lookup(self, filename: str, key: str) -> Path | None:
+        """
+        Return the cached file if it was rendered from `key` and still exists.
+        """
+        path = self.output_dir / filename
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT key FROM letters WHERE filename = ?", (filename,)
+            ).fetchone()
+            if row and row[0] == key and path.exists():
+                conn.execute(
+                    "UPDATE letters SET last_used = ? WHERE filename = ?",
+                    (time.time(), filename),
+                )
+                cache_hits.inc()
+                return path
+        cache_misses.inc()
+        return None
+
+    def store(self, filename: str, key: str):
+        """
+        Record a freshly rendered file, then evict old files if over budget.
+        """
+        size = (self.output_dir / filename).stat().st_size
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO letters (filename, key, size, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                (filename, key, size, time.time()),
+            )
+        self.evict(keep=filename)
+
+    def evict(self, keep: str | None = None) -> int:
+        """
+        Delete least recently used letters until the total size fits `max_bytes`.
+
+        Args:
+            keep (str | None): File never evicted, e.g. the one just rendered
+
+        Returns:
+            int: Number of evicted files
+        """
+        if self.max_bytes <= 0:
+            return 0
+        evicted = 0
+        with closing(self._connect()) as conn, conn:
+            (total,) = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM letters"
+            ).fetchone()
+            if total <= self.max_bytes:
+                return 0
+            rows = conn.execute("SELECT filename, size FROM letters ORDER BY last_used")
+            for filename, size in rows.fetchall():
+                if total <= self.max_bytes:
+                    break
+                if filename == keep:
+                    continue
+                (self.output_dir / filename).unlink(missing_ok=True)
+                conn.execute("DELETE FROM letters WHERE filename = ?", (filename,))
+                total -= size
+                evicted += 1
+        cache_evictions.inc(evicted)
+        return evicted
+
+
+_caches: dict[Path, LetterCache] = {}
+
+
+def letter_cache(output_dir: Path) -> LetterCache:
+    """Return the process-wide cache for an output directory."""
+    output_dir = output_dir.resolve()
+    if output_dir not in _caches:
+        _caches[output_dir] = LetterCache(output_dir, settings.LETTER_CACHE_MAX_BYTES)
+    return _caches[output_dir]
@@ -0,0 +1,87 @@
+# app/pdf/candidates.py
+
+"""
+Set-based selection of the memberships that need a welcome letter.
+"""
+
+from collections.abc import Iterator
+
+from models import Member, Membership
+from pdf.generate_welcome_letter import MEMBER_TEMPLATE_FIELDS
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+
+def letter_candidates_query(
+    year: int | None = None,
+    city: str | None = None,
+    postal_code_from: str | None = None,
+    postal_code_to: str | None = None,
+    postal_mail_only: bool = False,
+    sort_by_postal_code: bool = False,
+) -> Select:
+    """
+    Build the query selecting unpaid memberships and their member's letter fields.
+
+    Only the columns the template uses are selected, so rows are plain
+    tuples and never enter the session identity map.
+
+    Args:
+        year (int | None): Only memberships of this year
+        city (str | None): Only members in this city (case-insensitive)
+        postal_code_from (str | None): Lowest postal code, inclusive
+        postal_code_to (str | None): Highest postal code, inclusive
+        postal_mail_only (bool): Skip members who opted out of postal mail
+        sort_by_postal_code (bool): Order by postal code, as bulk mail requires
+
+    Returns:
+        Select: The candidate query, ordered by member (or postal code) and year
+    """
+    stmt = (
+        select(
+            *(getattr(Member, field) for field in MEMBER_TEMPLATE_FIELDS),
+            Membership.year,
+        )
+        .join(Membership, Membership.member_id == Member.id)
+        .where(Membership.amount == 0, Membership.is_paid.is_not(True))
+    )
+    if sort_by_postal_code:
+        stmt = stmt.order_by(Member.postal_code, Member.id, Membership.year)
+    else:
+        stmt = stmt.order_by(Member.id, Membership.year)
+    if postal_mail_only:
+        stmt = stmt.where(Member.no_postal_mail.is_not(True))
+    if year is not None:
+        stmt = stmt.where(Membership.year == year)
+    if city is not None:
+        # Exact match: the city must not act as a LIKE pattern
+        stmt = stmt.where(func.lower(Member.city) == city.lower())
+    if postal_code_from is not None:
+        stmt = stmt.where(Member.postal_code >= postal_code_from)
+    if postal_code_to is not None:
+        stmt = stmt.where(Member.postal_code <= postal_code_to)
+    return stmt
+
+
+def iter_letter_candidates(
+    db: Session, stmt: Select, batch_size: int = 500
+) -> Iterator[dict]:
+    """
+    Stream letter contexts for a candidate query through a server-side cursor.
+
+    Args:
+        db (Session): SQLAlchemy DB session, kept open while iterating
+        stmt (Select): Query from `letter_candidates_query`
+        batch_size (int): Rows fetched from the cursor at a time
+
+    Yields:
+        dict: Letter context, as built by `letter_context`
+    """
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        for row in partition:
+            mapping = row._mapping
+            yield {
+                "member": {field: mapping[field] for field in MEMBER_TEMPLATE_FIELDS},
+                "membership": {"year": mapping["year"]},
+            }
@@ -1,16 +1,130 @@
 # app/pdf/generate_welcome_letter.py
 
+import logging
 from pathlib import Path
 
-from jinja2 import Environment, FileSystemLoader
+from config import settings
+from jinja2 import Environment, FileSystemLoader, TemplateError
 from models import Member, Membership
-from weasyprint import HTML
+from pdf.cache import letter_cache, render_key
+from weasyprint import CSS, HTML, Document
+from weasyprint.text.fonts import FontConfiguration
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+TEMPLATE_NAME = "welcome_letter.html.jinja2"
+STYLESHEET_NAME = "welcome_letter.css"
+
+# What rendering one letter can raise: template errors, WeasyPrint's
+# InvalidValues and ImageLoadingError (ValueError) or URLFetchingError
+# (OSError), file writes, and contexts missing a field
+RENDER_ERRORS = (TemplateError, ValueError, OSError, LookupError)
 
 env = Environment(
-    loader=FileSystemLoader(Path(__file__).parent / "templates"),
+    loader=FileSystemLoader(TEMPLATES_DIR),
     autoescape=True,
 )
 
+# Member fields read by welcome_letter.html.jinja2
+MEMBER_TEMPLATE_FIELDS = (
+    "first_name",
+    "last_name",
+    "street_address",
+    "postal_code",
+    "city",
+    "reference_number",
+)
+
+
+def letter_context(member: Member, membership: Membership) -> dict:
+    """
+    Snapshot the fields the letter template uses into plain data.
+
+    The snapshot is detached from the SQLAlchemy session, so it can be
+    pickled and sent to worker processes.
+
+    Args:
+        member (Member): SQLAlchemy Member object
+        membership (Membership): Related unpaid Membership
+
+    Returns:
+        dict: Template context with "member" and "membership" keys
+    """
+    return {
+        "member": {field: getattr(member, field) for field in MEMBER_TEMPLATE_FIELDS},
+        "membership": {"year": membership.year},
+    }
+
+
+class LetterRenderer:
+    """
+    Long-lived WeasyPrint renderer for welcome letters.
+
+    The stylesheet is parsed once into a reusable CSS object and every
+    render shares one font configuration, so only the HTML of the letter
+    itself is parsed per call. Jinja keeps the compiled template in its
+    environment cache. The stylesheet is parsed again only if the file
+    changes, as the templates directory may be mounted into the container.
+    """
+
+    def __init__(self):
+        self.font_config = FontConfiguration()
+        self.stylesheet_path = TEMPLATES_DIR / STYLESHEET_NAME
+        self._stylesheet: CSS | None = None
+        self._stylesheet_mtime: int | None = None
+
+    @property
+    def sources(self) -> list[Path]:
+        """Files whose content determines the rendered PDF."""
+        return [TEMPLATES_DIR / TEMPLATE_NAME, self.stylesheet_path]
+
+    def stylesheet(self) -> CSS:
+        mtime = self.stylesheet_path.stat().st_mtime_ns
+        if self._stylesheet is None or mtime != self._stylesheet_mtime:
+            self._stylesheet = CSS(
+                filename=str(self.stylesheet_path), font_config=self.font_config
+            )
+            self._stylesheet_mtime = mtime
+        return self._stylesheet
+
+    def html(self, member: Member | dict, membership: Membership | dict) -> str:
+        template = env.get_template(TEMPLATE_NAME)
+        return template.render(member=member, membership=membership)
+
+    def document(
+        self, member: Member | dict, membership: Membership | dict
+    ) -> Document:
+        """Lay out one letter, ready to be written or merged with others."""
+        return HTML(
+            string=self.html(member, membership), base_url=str(TEMPLATES_DIR)
+        ).render(stylesheets=[self.stylesheet()], font_config=self.font_config)
+
+    def write_pdf(
+        self,
+        member: Member | dict,
+        membership: Membership | dict,
+        target: Path | None = None,
+    ) -> bytes | None:
+        """Write one letter to `target`, or return the PDF bytes without one."""
+        return self.document(member, membership).write_pdf(target)
+
+    def warm_up(self):
+        """
+        Render a throwaway letter, so the first real one does not pay for
+        parsing the stylesheet and loading fonts.
+        """
+        member = {field: "" for field in MEMBER_TEMPLATE_FIELDS}
+        self.write_pdf(member, {"year": 2000})
+
+
+renderer = LetterRenderer()
+
+
+def warm_up_renderer():
+    """Process pool initializer: warm the renderer of a new worker."""
+    renderer.warm_up()
+
 
 def render_letter_html(member: Member, membership: Membership) -> str:
     """
@@ -23,27 +137,78 @@ def render_letter_html(member: Member, membership: Membership) -> str:
     Returns:
         str: Rendered HTML
     """
-    template = env.get_template("welcome_letter.html.jinja2")
-    return template.render(member=member, membership=membership)
+    return renderer.html(member, membership)
 
 
-def generate_pdf(member: Member, membership: Membership, output_dir: Path) -> Path:
+def letter_filename(context: dict) -> str:
+    """File name of the letter for a context made by `letter_context`."""
+    return f"welcome_letter_{context['member']['reference_number']}.pdf"
+
+
+def render_letter_bytes(context: dict) -> bytes:
     """
-    Generate a welcome letter PDF.
+    Render a welcome letter PDF in memory, without touching the disk.
 
     Args:
-        member (Member): The member receiving the letter
-        membership (Membership): Their unpaid membership
+        context (dict): Template context for one letter
+
+    Returns:
+        bytes: The PDF document
+    """
+    return renderer.write_pdf(context["member"], context["membership"])
+
+
+def render_letter(
+    context: dict, output_dir: Path, log_sample_rate: float | None = None
+) -> Path:
+    """
+    Generate a welcome letter PDF from a snapshot made by `letter_context`.
+
+    When the render cache is enabled and the existing file was rendered
+    from the same template and context, it is returned without rendering.
+
+    Args:
+        context (dict): Template context for one letter
         output_dir (Path): Directory to save PDF in
+        log_sample_rate (float | None): Share of "PDF created" records
+            kept, for batches; None logs every letter
 
     Returns:
         Path: Output file path
     """
     output_dir.mkdir(parents=True, exist_ok=True)
-    html_str = render_letter_html(member, membership)
-    filename = f"welcome_letter_{member.reference_number}.pdf"
+    member, membership = context["member"], context["membership"]
+    filename = letter_filename(context)
     output_path = output_dir / filename
 
-    HTML(string=html_str).write_pdf(output_path)
-    print(f"✅ PDF created: {output_path}")
+    if settings.LETTER_CACHE_ENABLED:
+        cache = letter_cache(output_dir)
+        key = render_key(context, renderer.sources)
+        if cache.lookup(filename, key):
+            return output_path
+
+    renderer.write_pdf(member, membership, output_path)
+    logger.info(
+        "PDF created: %s",
+        output_path,
+        extra={"sample_rate": log_sample_rate},
+    )
+
+    if settings.LETTER_CACHE_ENABLED:
+        cache.store(filename, key)
     return output_path
+
+
+def generate_pdf(member: Member, membership: Membership, output_dir: Path) -> Path:
+    """
+    Generate a welcome letter PDF.
+
+    Args:
+        member (Member): The member receiving the letter
+        membership (Membership): Their unpaid membership
+        output_dir (Path): Directory to save PDF in
+
+    Returns:
+        Path: Output file path
+    """
+    return render_letter(letter_context(member, membership), output_dir)
@@ -0,0 +1,214 @@
+# app/pdf/jobs.py
+
+"""
+In-process job queue for PDF rendering.
+
+Renders run in a small local process pool, so WeasyPrint never blocks
+the API threadpool or holds the GIL of the web worker. Jobs are tracked
+in memory, which means no external broker is needed; the price is that
+job ids are only known to the worker process that created them.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class JobState(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass
+class JobResult:
+    paths: list[Path]
+    summary: dict = field(default_factory=dict)
+
+
+@dataclass
+class Job:
+    id: str
+    key: str
+    state: JobState = JobState.QUEUED
+    result: JobResult | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: float | None = None
+    future: Future | None = field(default=None, repr=False)
+
+    @property
+    def status(self) -> JobState:
+        if self.state is JobState.QUEUED and self.future and self.future.running():
+            return JobState.RUNNING
+        return self.state
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "state": self.status.value,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "summary": self.result.summary if self.result else None,
+        }
+
+
+class JobQueue:
+    """
+    Bounded pool of render workers with deduplication of identical jobs.
+
+    Submitting a job whose key matches an unfinished job returns that job,
+    so concurrent requests for the same letter share one render.
+    """
+
+    def __init__(self, workers: int, recycle_after: int, history: int):
+        self.workers = workers
+        self.recycle_after = recycle_after
+        self.history = history
+        self.initializer: Callable[[], None] | None = None
+        self._pool: ProcessPoolExecutor | None = None
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._pending: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # Created on first use, so importing the app never spawns processes
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                max_tasks_per_child=self.recycle_after,
+                initializer=self.initializer,
+            )
+        return self._pool
+
+    def start(self, initializer: Callable[[], None] | None = None):
+        """
+        Spawn the workers ahead of the first job.
+
+        A pool already created with another initializer, e.g. by a job
+        submitted before start-up, is replaced: its workers would never
+        run the new one. Its jobs still finish.
+
+        Args:
+            initializer (Callable | None): Run once in every new worker, e.g.
+                to warm up the renderer
+        """
+        with self._lock:
+            stale = None
+            if self._pool is not None and initializer is not self.initializer:
+                stale, self._pool = self._pool, None
+            self.initializer = initializer
+            pool = self._executor()
+            for _ in range(self.workers):
+                pool.submit(os.getpid)
+        if stale is not None:
+            stale.shutdown(wait=False)
+
+    def submit(self, key: str, fn: Callable[..., Path | JobResult], *args) -> Job:
+        """
+        Queue `fn(*args)` unless a job with the same key is already pending.
+
+        Args:
+            key (str): Deduplication key, e.g. the member the letter is for
+            fn (Callable): Picklable top-level function returning the output
+                path, or a JobResult when it produces several files
+            *args: Picklable arguments for `fn`
+
+        Returns:
+            Job: The new or the already pending job
+        """
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key]
+            future = self._executor().submit(fn, *args)
+            job = Job(id=uuid.uuid4().hex, key=key, future=future)
+            self._jobs[job.id] = job
+            self._pending[key] = job
+            self._trim_history()
+        future.add_done_callback(lambda f: self._finish(job, f))
+        return job
+
+    def call(self, fn: Callable, *args) -> Future:
+        """
+        Run `fn(*args)` in the pool without tracking it as a job.
+
+        For short renders the caller waits for, e.g. a letter streamed back
+        in the response. The future raises like `fn` would.
+
+        Args:
+            fn (Callable): Picklable top-level function
+            *args: Picklable arguments for `fn`
+
+        Returns:
+            Future: Resolves to the return value of `fn`
+        """
+        with self._lock:
+            future = self._executor().submit(fn, *args)
+        future.add_done_callback(self._reset_if_broken)
+        return future
+
+    def _reset_if_broken(self, future: Future):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            with self._lock:
+                self._pool = None
+
+    def _finish(self, job: Job, future: Future):
+        try:
+            result = future.result()
+            job.result = (
+                result if isinstance(result, JobResult) else JobResult([result])
+            )
+            job.state = JobState.DONE
+        except Exception as e:
+            logger.error("Job %s (%s) failed", job.id, job.key, exc_info=e)
+            job.error = f"{type(e).__name__}: {e}"
+            job.state = JobState.FAILED
+            if isinstance(e, BrokenProcessPool):
+                with self._lock:
+                    self._pool = None
+        job.finished_at = time.time()
+        job.future = None
+        with self._lock:
+            if self._pending.get(job.key) is job:
+                del self._pending[job.key]
+
+    def _trim_history(self):
+        """Forget the oldest finished jobs beyond `history`."""
+        excess = len(self._jobs) - self.history
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].state is not JobState.QUEUED:
+                del self._jobs[job_id]
+                excess -= 1
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+letter_jobs = JobQueue(
+    workers=settings.LETTER_JOB_WORKERS,
+    recycle_after=settings.LETTER_JOB_RECYCLE_AFTER,
+    history=settings.LETTER_JOB_HISTORY,
+)
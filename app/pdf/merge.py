@@ -0,0 +1,158 @@
+# app/pdf/merge.py
+
+"""
+Streaming concatenation of PDF files.
+
+Input files are read one at a time. Every object reachable from their
+pages is renumbered and written to the output as soon as it is read, so
+only one input file and the table of object offsets are held in memory,
+whatever the number of pages. Document-level data of the inputs
+(outlines, metadata, named destinations) is not carried over.
+"""
+
+from collections.abc import Iterable
+from pathlib import Path
+from typing import BinaryIO
+
+from pypdf import PdfReader
+from pypdf.generic import (
+    ArrayObject,
+    DictionaryObject,
+    IndirectObject,
+    NameObject,
+    NumberObject,
+    PdfObject,
+)
+
+# Page attributes a page may inherit from its ancestors in the page tree
+INHERITABLE = ("/Resources", "/MediaBox", "/CropBox", "/Rotate")
+
+
+def _inherited(page: DictionaryObject, key: str) -> PdfObject | None:
+    node = page.get("/Parent")
+    while node is not None:
+        node = node.get_object()
+        if key in node:
+            return node.raw_get(key)
+        node = node.get("/Parent")
+    return None
+
+
+class _StreamingWriter:
+    def __init__(self, fp: BinaryIO):
+        self.fp = fp
+        self.offsets: list[int] = []
+        self.kids: list[int] = []
+        fp.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        self.pages_num = self._reserve()
+        self.catalog_num = self._reserve()
+
+    def _reserve(self) -> int:
+        self.offsets.append(0)
+        return len(self.offsets)
+
+    def _ref(self, obj: IndirectObject, refs: dict, pending: list) -> IndirectObject:
+        key = (obj.idnum, obj.generation)
+        if key not in refs:
+            refs[key] = self._reserve()
+            pending.append(obj)
+        return IndirectObject(refs[key], 0, None)
+
+    def _remap(self, obj: PdfObject, refs: dict, pending: list) -> PdfObject:
+        """Point the references of `obj` to output object numbers, in place."""
+        if isinstance(obj, IndirectObject):
+            return self._ref(obj, refs, pending)
+        if isinstance(obj, DictionaryObject):
+            for key, value in list(dict.items(obj)):
+                dict.__setitem__(obj, key, self._remap(value, refs, pending))
+        elif isinstance(obj, ArrayObject):
+            for i, value in enumerate(obj):
+                list.__setitem__(obj, i, self._remap(value, refs, pending))
+        return obj
+
+    def _write(self, num: int, obj: PdfObject):
+        self.offsets[num - 1] = self.fp.tell()
+        self.fp.write(f"{num} 0 obj\n".encode())
+        obj.write_to_stream(self.fp)
+        self.fp.write(b"\nendobj\n")
+
+    def append(self, path: Path):
+        reader = PdfReader(path)
+        refs: dict[tuple[int, int], int] = {}
+        pending: list[IndirectObject] = []
+        parent = IndirectObject(self.pages_num, 0, None)
+
+        # Pages are numbered first, so references to them (links, annotations)
+        # never pull in the page tree of the input file.
+        pages = list(reader.pages)
+        for page in pages:
+            ref = page.indirect_reference
+            refs[(ref.idnum, ref.generation)] = self._reserve()
+
+        for page in pages:
+            for key in INHERITABLE:
+                if key not in page and (value := _inherited(page, key)) is not None:
+                    dict.__setitem__(page, NameObject(key), value)
+            dict.pop(page, "/Parent", None)
+            self._remap(page, refs, pending)
+            dict.__setitem__(page, NameObject("/Parent"), parent)
+
+            ref = page.indirect_reference
+            num = refs[(ref.idnum, ref.generation)]
+            self._write(num, page)
+            self.kids.append(num)
+
+            while pending:
+                obj = pending.pop()
+                num = refs[(obj.idnum, obj.generation)]
+                self._write(num, self._remap(obj.get_object(), refs, pending))
+
+    def close(self):
+        pages = DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Pages"),
+                NameObject("/Kids"): ArrayObject(
+                    IndirectObject(num, 0, None) for num in self.kids
+                ),
+                NameObject("/Count"): NumberObject(len(self.kids)),
+            }
+        )
+        self._write(self.pages_num, pages)
+        catalog = DictionaryObject(
+            {
+                NameObject("/Type"): NameObject("/Catalog"),
+                NameObject("/Pages"): IndirectObject(self.pages_num, 0, None),
+            }
+        )
+        self._write(self.catalog_num, catalog)
+
+        xref = self.fp.tell()
+        self.fp.write(f"xref\n0 {len(self.offsets) + 1}\n".encode())
+        self.fp.write(b"0000000000 65535 f \n")
+        for offset in self.offsets:
+            self.fp.write(f"{offset:010d} 00000 n \n".encode())
+        self.fp.write(
+            f"trailer\n<< /Size {len(self.offsets) + 1} "
+            f"/Root {self.catalog_num} 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n".encode()
+        )
+
+
+def merge_pdfs(inputs: Iterable[Path], output: Path) -> int:
+    """
+    Concatenate PDF files into one, in order, in roughly constant memory.
+
+    Args:
+        inputs (Iterable[Path]): PDF files to concatenate
+        output (Path): Merged PDF to write
+
+    Returns:
+        int: Number of pages in the merged PDF
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("wb") as fp:
+        writer = _StreamingWriter(fp)
+        for path in inputs:
+            writer.append(path)
+        writer.close()
+    return len(writer.kids)
@@ -0,0 +1,169 @@
+# app/pdf/print_run.py
+
+"""
+Print-run mode: welcome letters merged into a few large PDFs for bulk mail.
+
+Letters are rendered in parallel chunks, each chunk into one multi-page
+PDF, then the chunks are concatenated in order by the streaming merger.
+Neither step holds more than one chunk of pages in memory. Chunks are
+cut at volume boundaries, so a volume holds at most `volume_size`
+letters whatever the chunk size.
+"""
+
+import os
+import shutil
+import tempfile
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from config import settings
+from database import SessionLocal
+from pdf.batch import BatchReport, reference_number, run_chunks
+from pdf.candidates import iter_letter_candidates, letter_candidates_query
+from pdf.generate_welcome_letter import RENDER_ERRORS, renderer
+from pdf.jobs import JobResult
+from pdf.merge import merge_pdfs
+
+PRINT_RUNS_DIR = Path("output/print_runs")
+
+
+@dataclass
+class PrintRunReport(BatchReport):
+    volumes: list[Path] = field(default_factory=list)
+    pages: int = 0
+
+
+def render_chunk_document(
+    chunk: list[dict], output_path: Path
+) -> list[tuple[int | None, str | None]]:
+    """
+    Render a chunk of letters into a single multi-page PDF.
+
+    Args:
+        chunk (list[dict]): Letter contexts, in print order
+        output_path (Path): PDF file for the chunk
+
+    Returns:
+        list[tuple]: (reference_number, error) per letter, error is None on success
+    """
+    documents, results = [], []
+    for context in chunk:
+        try:
+            documents.append(
+                renderer.document(context["member"], context["membership"])
+            )
+            results.append((reference_number(context), None))
+        except RENDER_ERRORS as e:
+            results.append((reference_number(context), f"{type(e).__name__}: {e}"))
+    if documents:
+        pages = [page for document in documents for page in document.pages]
+        documents[0].copy(pages).write_pdf(output_path)
+    return results
+
+
+def render_print_run(
+    contexts: Iterable[dict],
+    output_dir: Path,
+    name: str,
+    workers: int = 1,
+    chunk_size: int = 50,
+    volume_size: int = 0,
+    recycle_after: int = 500,
+    on_progress: Callable[[BatchReport], None] | None = None,
+) -> PrintRunReport:
+    """
+    Render letters into merged PDF volumes, keeping the order of `contexts`.
+
+    Args:
+        contexts (Iterable[dict]): Letter contexts, already in print order
+        output_dir (Path): Directory to save the volumes in
+        name (str): Base file name of the volumes
+        workers (int): Number of worker processes (1 renders in-process)
+        chunk_size (int): Letters rendered into one intermediate PDF
+        volume_size (int): Letters per volume, 0 for a single PDF
+        recycle_after (int): Letters a worker renders before it is replaced
+        on_progress (Callable): Called with the running report after each chunk
+
+    Returns:
+        PrintRunReport: Counts, failures, timing and the written volumes
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    chunk_dir = Path(tempfile.mkdtemp(prefix=f".{name}_", dir=output_dir))
+    report = PrintRunReport()
+    try:
+        run_chunks(
+            contexts,
+            render_chunk_document,
+            lambda index: chunk_dir / f"chunk_{index:08d}.pdf",
+            workers=workers,
+            chunk_size=chunk_size,
+            recycle_after=recycle_after,
+            on_progress=on_progress,
+            report=report,
+            align=volume_size,
+        )
+        # Chunks never span two volumes, so each volume has the same number
+        # of chunks; fully failed chunks left no file
+        per_volume = -(-volume_size // chunk_size) if volume_size else None
+        groups: dict[int, list[Path]] = {}
+        for path in sorted(chunk_dir.glob("chunk_*.pdf")):
+            index = int(path.stem.removeprefix("chunk_"))
+            groups.setdefault(index // per_volume if per_volume else 0, []).append(path)
+        for number, group in enumerate(groups[key] for key in sorted(groups)):
+            suffix = f"_{number + 1:03d}" if per_volume else ""
+            volume = output_dir / f"{name}{suffix}.pdf"
+            report.pages += merge_pdfs(group, volume)
+            report.volumes.append(volume)
+    finally:
+        shutil.rmtree(chunk_dir, ignore_errors=True)
+    return report
+
+
+def print_run_job(filters: dict, volume_size: int) -> JobResult:
+    """
+    Background job: select, render and merge a print run.
+
+    Args:
+        filters (dict): Keyword filters for `letter_candidates_query`
+        volume_size (int): Letters per volume, 0 for a single PDF
+
+    Returns:
+        JobResult: The volumes and a summary of the run
+    """
+    stmt = letter_candidates_query(
+        **filters, postal_mail_only=True, sort_by_postal_code=True
+    )
+    # This runs in a letter job worker: its render pool shares the host
+    # with the other job workers, and this one only waits for it
+    workers = min(
+        settings.PRINT_RUN_WORKERS,
+        (os.cpu_count() or 1) - settings.LETTER_JOB_WORKERS + 1,
+    )
+    name = f"print_run_{datetime.now():%Y%m%d_%H%M%S}"
+    db = SessionLocal()
+    try:
+        report = render_print_run(
+            iter_letter_candidates(db, stmt),
+            PRINT_RUNS_DIR,
+            name,
+            workers=max(1, workers),
+            volume_size=volume_size,
+            recycle_after=settings.PRINT_RUN_RECYCLE_AFTER,
+        )
+    finally:
+        db.close()
+    if not report.volumes:
+        raise ValueError("No letters to print")
+    return JobResult(
+        paths=report.volumes,
+        summary={
+            "letters": report.generated,
+            "pages": report.pages,
+            "failures": [
+                {"reference_number": f.reference_number, "error": f.error}
+                for f in report.failures
+            ],
+        },
+    )
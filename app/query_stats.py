@@ -0,0 +1,146 @@
+# app/query_stats.py
+
+"""
+Per-request SQL statistics: query count, database time and rows returned.
+
+Cursor execution hooks add every statement run on any engine to the
+statistics of the current request, held in a context variable. The
+context is copied into the threadpool running sync routes and into the
+greenlets of the async engine, so statements are attributed to their
+request whichever stack runs them. At the end of the request the totals
+are observed in Prometheus histograms labelled by route template, and
+with SERVER_TIMING_ENABLED they are also sent in a `Server-Timing` header.
+"""
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from config import settings
+from prometheus_client import Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+request_queries = Histogram(
+    "http_request_db_queries",
+    "SQL statements run per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds",
+    "Time spent in SQL statements per request",
+    ["method", "route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+request_db_rows = Histogram(
+    "http_request_db_rows",
+    "Rows returned by SQL statements per request",
+    ["method", "route"],
+    buckets=(0, 1, 10, 50, 100, 500, 1000, 5000, 10000, 100000),
+)
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    duration: float = 0.0
+    rows: int = 0
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries, '
+            f'{self.rows} rows"'
+        )
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+_current_scope: ContextVar[dict | None] = ContextVar("request_scope", default=None)
+
+
+def current_route() -> str | None:
+    """
+    Method and route template of the request being served, e.g.
+    "GET /members/search/city/{city}". The raw path before routing or
+    when no route matched, None outside of a request.
+    """
+    scope = _current_scope.get()
+    if scope is None:
+        return None
+    route = scope.get("route")
+    return f"{scope['method']} {route.path if route is not None else scope['path']}"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_stats_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    stats.count += 1
+    stats.duration += time.perf_counter() - context._query_stats_start
+    # rowcount is -1 for server-side cursors, whose rows are not known yet
+    if cursor.description is not None and cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Collect the statistics of the statements run inside the block.
+
+    Only statements of the current context count: those of this thread
+    or task, and of the threads and greenlets it starts.
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware attributing SQL statistics to each HTTP request.
+
+    A plain ASGI middleware rather than BaseHTTPMiddleware, so streaming
+    responses pass through without an extra task and memory stream.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", stats.server_timing()
+                )
+            await send(message)
+
+        scope_token = _current_scope.set(scope)
+        with track_queries() as stats:
+            wrapped = send_with_timing if settings.SERVER_TIMING_ENABLED else send
+            try:
+                await self.app(scope, receive, wrapped)
+            finally:
+                # The router records the matched route in the scope
+                route = scope.get("route")
+                if route is not None:
+                    labels = (scope["method"], route.path)
+                    request_queries.labels(*labels).observe(stats.count)
+                    request_db_seconds.labels(*labels).observe(stats.duration)
+                    request_db_rows.labels(*labels).observe(stats.rows)
+                _current_scope.reset(scope_token)
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Annotated, List, Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, model_validator
 
 
 class MembershipResponse(BaseModel):
@@ -106,3 +106,33 @@ class MembershipCreate(BaseModel):
     amount: int = Field(
         default=0, ge=0, description="Membership amount in euros (default: 0 = unpaid)"
     )
+
+
+class MembershipUpsert(BaseModel):
+    member_id: Optional[int] = None
+    reference_number: Optional[int] = None
+    year: int
+    amount: int = Field(ge=0, description="Membership amount in euros (0 = unpaid)")
+
+    @model_validator(mode="after")
+    def _one_member_key(self):
+        if (self.member_id is None) == (self.reference_number is None):
+            raise ValueError("Give either member_id or reference_number")
+        return self
+
+
+class MembershipBulkUpsert(BaseModel):
+    memberships: Annotated[
+        List[MembershipUpsert], Field(min_length=1, max_length=10000)
+    ]
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "memberships": [
+                    {"member_id": 3, "year": 2025, "amount": 25},
+                    {"reference_number": 2000000004, "year": 2025, "amount": 0},
+                ]
+            }
+        },
+    }
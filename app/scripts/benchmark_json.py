@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+# app/scripts/benchmark_json.py
+
+"""
+Benchmark of member response serialization, JSONResponse vs FastJSONResponse.
+
+Builds --members in-memory members with two memberships each and times
+the search response body both ways: model_dump() dicts serialized again
+by json.dumps (JSONResponse), and the validated models written to bytes
+in one pass by pydantic-core (FastJSONResponse). Validation from the ORM
+objects is the same in both and timed separately. No database is used.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add /app to PYTHONPATH
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from api.responses import FastJSONResponse
+from fastapi.responses import JSONResponse
+from models import Member, Membership
+from schemas import MemberResponse
+
+
+def make_members(count: int) -> list[Member]:
+    return [
+        Member(
+            id=i,
+            reference_number=2_000_000_000 + i,
+            first_name=f"First{i}",
+            last_name=f"Läst{i}",
+            city="Jyväskylä",
+            email=f"member{i}@example.com",
+            postal_code="40100",
+            street_address=f"Street {i}",
+            notes="Prefers email contact",
+            no_postal_mail=False,
+            memberships=[
+                Membership(year=2024, amount=25),
+                Membership(year=2025, amount=10),
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+def timed(fn, repeat: int) -> float:
+    """Median time of `fn` in ms."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--members", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    members = make_members(args.members)
+    models = [MemberResponse.model_validate(m) for m in members]
+
+    def before():
+        return JSONResponse(content={"results": [m.model_dump() for m in models]})
+
+    def after():
+        return FastJSONResponse(content={"results": models})
+
+    assert len(before().body) >= len(after().body) > 0
+    validate = timed(
+        lambda: [MemberResponse.model_validate(m) for m in members], args.repeat
+    )
+    slow, fast = timed(before, args.repeat), timed(after, args.repeat)
+    per_1000 = 1000 / args.members
+    print(f"validation (both):          {validate * per_1000:8.2f} ms / 1000 members")
+    print(f"model_dump + JSONResponse:  {slow * per_1000:8.2f} ms / 1000 members")
+    print(f"FastJSONResponse:           {fast * per_1000:8.2f} ms / 1000 members")
+    print(f"speed-up:                   {slow / fast:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# app/scripts/benchmark_letters.py
+
+"""
+Micro-benchmark of welcome letter rendering.
+
+Compares the per-letter time of the original render path (stylesheet
+inlined in the HTML, parsed again and fonts resolved again for every
+letter) with the long-lived LetterRenderer. No database is needed.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add /app to PYTHONPATH
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from pdf.generate_welcome_letter import LetterRenderer
+from weasyprint import HTML
+
+
+def sample_letter(n: int) -> tuple[dict, dict]:
+    member = {
+        "first_name": "Bench",
+        "last_name": f"Member {n}",
+        "street_address": "Mittarikatu 1",
+        "postal_code": "00100",
+        "city": "Helsinki",
+        "reference_number": 2000000000 + n,
+    }
+    return member, {"year": 2025}
+
+
+def render_inline(renderer: LetterRenderer, member: dict, membership: dict):
+    """The original path: one self-contained HTML string per letter."""
+    css = renderer.stylesheet_path.read_text()
+    html = renderer.html(member, membership).replace(
+        "</head>", f"<style>{css}</style></head>", 1
+    )
+    return HTML(string=html).write_pdf()
+
+
+def render_shared(renderer: LetterRenderer, member: dict, membership: dict):
+    return renderer.write_pdf(member, membership)
+
+
+def measure(render, renderer: LetterRenderer, letters: int) -> list[float]:
+    timings = []
+    for n in range(letters):
+        member, membership = sample_letter(n)
+        start = time.perf_counter()
+        render(renderer, member, membership)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list[float]):
+    print(
+        f"{label:<22} first {timings[0]:7.1f} ms | "
+        f"mean {statistics.mean(timings[1:] or timings):7.1f} ms | "
+        f"median {statistics.median(timings):7.1f} ms"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--letters", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    cold = LetterRenderer()
+    report("inline <style> (before)", measure(render_inline, cold, args.letters))
+    report("LetterRenderer (after)", measure(render_shared, cold, args.letters))
+
+    warm = LetterRenderer()
+    warm.warm_up()
+    report("warmed LetterRenderer", measure(render_shared, warm, args.letters))
+
+
+if __name__ == "__main__":
+    main()
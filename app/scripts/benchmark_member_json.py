@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+# app/scripts/benchmark_member_json.py
+
+"""
+Benchmark of the member read paths: ORM objects vs SQL-built JSON documents.
+
+For a city search page of --limit members, and for the reference lookup,
+times the whole path from query to response body: ORM loading of the
+members and their memberships, Pydantic validation and serialization,
+against PostgreSQL building the documents with json_build_object and
+json_agg and the API passing them through. Run it against a database
+with data, e.g. after scripts/benchmark_search.py has seeded it.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add /app to PYTHONPATH
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from api.member_json import (
+    MEMBER_LOOKUP_FIELDS,
+    member_body,
+    member_document_query,
+    page_document_query,
+    search_body,
+)
+from api.pagination import PageParams, encode_cursor
+from api.responses import FastJSONResponse
+from database import SessionLocal
+from models import Member
+from schemas import MemberResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload, selectinload
+
+
+def orm_search(db, city: str, params: PageParams) -> bytes:
+    keys = (Member.city, Member.id)
+    # First page only: the keys are selected for the cursor of the last row,
+    # and one extra row tells whether another page follows
+    rows = (
+        db.query(Member)
+        .options(selectinload(Member.memberships))
+        .filter(Member.city == city)
+        .add_columns(*keys)
+        .order_by(*keys)
+        .limit(params.limit + 1)
+        .all()
+    )
+    members = [row[0] for row in rows[: params.limit]]
+    next_cursor = None
+    if len(rows) > params.limit:
+        next_cursor = encode_cursor(tuple(rows[params.limit - 1][1:]))
+    return FastJSONResponse(
+        {
+            "message": f"Found {len(members)} member(s) in city '{city}'.",
+            "results": [MemberResponse.model_validate(m) for m in members],
+            "next_cursor": next_cursor,
+            "total": None,
+        }
+    ).body
+
+
+def sql_search(db, city: str, params: PageParams) -> bytes:
+    criterion = Member.city == city
+    keys = (Member.city, Member.id)
+    rows = db.execute(page_document_query(criterion, keys, params)).all()
+    return search_body(f"in city '{city}'", rows, params)
+
+
+def orm_lookup(db, reference_number: int) -> bytes:
+    member = (
+        db.query(Member)
+        .options(joinedload(Member.memberships))
+        .filter(Member.reference_number == reference_number)
+        .first()
+    )
+    document = {field: getattr(member, field) for field in MEMBER_LOOKUP_FIELDS}
+    document["memberships"] = [
+        {
+            "year": m.year,
+            "amount": m.amount,
+            "is_paid": m.is_paid,
+            "discounted": m.discounted,
+        }
+        for m in member.memberships
+    ]
+    return FastJSONResponse({"message": "found", "member": document}).body
+
+
+def sql_lookup(db, reference_number: int) -> bytes:
+    document = db.execute(
+        member_document_query(
+            Member.reference_number == reference_number, MEMBER_LOOKUP_FIELDS
+        )
+    ).scalar()
+    return member_body("found", document)
+
+
+def timed(fn, repeat: int) -> float:
+    """Median time of `fn` in ms, each run in a fresh session."""
+    timings = []
+    for _ in range(repeat):
+        with SessionLocal() as db:
+            start = time.perf_counter()
+            fn(db)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with SessionLocal() as db:
+        city = db.execute(
+            select(Member.city)
+            .where(Member.city.is_not(None))
+            .group_by(Member.city)
+            .order_by(func.count().desc())
+            .limit(1)
+        ).scalar_one()
+        reference_number = db.execute(
+            select(Member.reference_number).order_by(Member.id.desc()).limit(1)
+        ).scalar_one()
+
+    params = PageParams(limit=args.limit)
+    cases = {
+        f"search city '{city}' ({args.limit})": (
+            lambda db: orm_search(db, city, params),
+            lambda db: sql_search(db, city, params),
+        ),
+        f"lookup {reference_number}": (
+            lambda db: orm_lookup(db, reference_number),
+            lambda db: sql_lookup(db, reference_number),
+        ),
+    }
+    for label, (orm, sql) in cases.items():
+        before, after = timed(orm, args.repeat), timed(sql, args.repeat)
+        print(
+            f"{label:<40} ORM: {before:8.2f} ms | SQL JSON: {after:8.2f} ms | "
+            f"{before / after:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
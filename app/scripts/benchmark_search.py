@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+# app/scripts/benchmark_search.py
+
+"""
+Benchmark of the ilike member search endpoints with and without trigram indexes.
+
+Fills the members table of DATABASE_URL up to --rows synthetic members,
+then runs each search query under EXPLAIN ANALYZE twice: once with bitmap
+and index scans disabled, which gives the sequential scan plan the
+endpoints had before the pg_trgm GIN indexes, and once as the planner
+chooses. Only run it against a disposable database.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+
+# Add /app to PYTHONPATH
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from api.member_common import contains
+from database import engine
+from models import Member
+from sqlalchemy import func, select, text
+
+FIRST_NAMES = ["Aino", "Eino", "Helmi", "Juhani", "Lauri", "Maria", "Olavi", "Sofia"]
+LAST_NAMES = ["Virtanen", "Korhonen", "Nieminen", "Mäkinen", "Hämäläinen", "Laine"]
+CITIES = ["Helsinki", "Espoo", "Tampere", "Vantaa", "Oulu", "Turku", "Jyväskylä"]
+
+SEED_SQL = text(
+    """
+    INSERT INTO members (first_name, last_name, city, postal_code)
+    SELECT
+        (:first_names)[1 + gs % cardinality(:first_names)],
+        (:last_names)[1 + (gs / 7) % cardinality(:last_names)]
+            || '-' || substr(md5(gs::text), 1, 6),
+        (:cities)[1 + (gs / 11) % cardinality(:cities)],
+        lpad((gs % 99999)::text, 5, '0')
+    FROM generate_series(1, :count) AS gs
+    """
+)
+
+
+def seed(rows: int):
+    with engine.begin() as conn:
+        existing = conn.execute(select(func.count()).select_from(Member)).scalar()
+        if existing < rows:
+            print(f"Seeding {rows - existing} members…")
+            conn.execute(
+                SEED_SQL,
+                {
+                    "first_names": FIRST_NAMES,
+                    "last_names": LAST_NAMES,
+                    "cities": CITIES,
+                    "count": rows - existing,
+                },
+            )
+        conn.execute(text("ANALYZE members"))
+
+
+def search_queries(conn) -> dict:
+    """The queries of the three search endpoints, for terms taken from a real row."""
+    sample = conn.execute(
+        select(Member.first_name, Member.last_name, Member.city)
+        .order_by(Member.id.desc())
+        .limit(1)
+    ).one()
+    full_name = f"{sample.first_name} {sample.last_name}"
+    return {
+        f"full_name '{full_name[3:-2]}'": select(Member).where(
+            contains(Member.full_name, full_name[3:-2])
+        ),
+        f"name '{sample.last_name[-6:]}'": select(Member).where(
+            contains(Member.first_name, sample.last_name[-6:])
+            | contains(Member.last_name, sample.last_name[-6:])
+        ),
+        f"city '{sample.city[1:-2]}'": select(Member).where(
+            contains(Member.city, sample.city[1:-2])
+        ),
+    }
+
+
+def explain(stmt, repeat: int, sequential: bool) -> tuple[str, float]:
+    """Return the top scan node of the plan and the median execution time in ms."""
+    compiled = stmt.compile(dialect=engine.dialect)
+    sql = "EXPLAIN (ANALYZE, FORMAT JSON) " + str(compiled)
+    timings, plan = [], None
+    with engine.begin() as conn:
+        if sequential:
+            conn.execute(text("SET LOCAL enable_bitmapscan = off"))
+            conn.execute(text("SET LOCAL enable_indexscan = off"))
+        for _ in range(repeat):
+            (result,) = conn.exec_driver_sql(sql, compiled.params).one()
+            result = json.loads(result) if isinstance(result, str) else result
+            plan = result[0]["Plan"]
+            timings.append(result[0]["Execution Time"])
+    while plan.get("Plans") and "Scan" not in plan["Node Type"]:
+        plan = plan["Plans"][0]
+    return plan["Node Type"], statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    seed(args.rows)
+    with engine.connect() as conn:
+        queries = search_queries(conn)
+    for label, stmt in queries.items():
+        before = explain(stmt, args.repeat, sequential=True)
+        after = explain(stmt, args.repeat, sequential=False)
+        print(
+            f"{label:<32} "
+            f"before: {before[0]:<18} {before[1]:9.1f} ms | "
+            f"after: {after[0]:<18} {after[1]:9.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
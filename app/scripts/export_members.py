@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+# app/scripts/export_members.py
+
+"""
+Export members and their memberships as CSV or NDJSON.
+
+Usage:
+    python scripts/export_members.py members.csv --year 2025 --unpaid
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add /app to PYTHONPATH
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from bulk.export import EXPORT_FORMATS, EXPORT_LAYOUTS, export_query, stream_export
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "output", type=Path, nargs="?", help="Output file, default: stdout"
+    )
+    parser.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        help="Default: from the output suffix, or csv",
+    )
+    parser.add_argument("--layout", choices=EXPORT_LAYOUTS, default="flat")
+    parser.add_argument("--year", type=int)
+    paid = parser.add_mutually_exclusive_group()
+    paid.add_argument("--paid", dest="is_paid", action="store_true", default=None)
+    paid.add_argument("--unpaid", dest="is_paid", action="store_false")
+    parser.add_argument("--city")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt is None:
+        suffix = args.output.suffix.lower().lstrip(".") if args.output else ""
+        fmt = "ndjson" if suffix in ("ndjson", "jsonl") else "csv"
+
+    stmt = export_query(year=args.year, is_paid=args.is_paid, city=args.city)
+    chunks = stream_export(stmt, fmt, args.layout, args.batch_size)
+    if args.output is None:
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        return 0
+    with args.output.open("wb") as out:
+        for chunk in chunks:
+            out.write(chunk)
+    print(f"✅ Members exported to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,10 @@
 
 # app/scripts/generate_letters.py
 
+import argparse
+import os
 import sys
+from datetime import datetime
 from pathlib import Path
 
 # Add /app to PYTHONPATH
@@ -10,25 +13,119 @@ sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 # Now the rest of your script...
 from database import SessionLocal
-from models import Member
-from pdf.generate_welcome_letter import generate_pdf
+from pdf.batch import BatchReport, render_letters
+from pdf.candidates import iter_letter_candidates, letter_candidates_query
+from pdf.print_run import PRINT_RUNS_DIR, render_print_run
 
 output_dir = Path("output/letters")
 
 
-def main():
-    db = SessionLocal()
-    members = db.query(Member).all()
-    count = 0
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Generate welcome letters for unpaid memberships."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes (1 renders in this process).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Letters handed to a worker per task (default: 25, print run: 50).",
+    )
+    parser.add_argument(
+        "--recycle-after",
+        type=int,
+        default=500,
+        help="Letters a worker renders before it is replaced by a fresh one.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Rows fetched from the database cursor at a time.",
+    )
+    parser.add_argument("--year", type=int, help="Only memberships of this year.")
+    parser.add_argument("--city", help="Only members living in this city.")
+    parser.add_argument(
+        "--postal-code-from", help="Lowest postal code to include (inclusive)."
+    )
+    parser.add_argument(
+        "--postal-code-to", help="Highest postal code to include (inclusive)."
+    )
+    parser.add_argument(
+        "--print-run",
+        action="store_true",
+        help="Merge the letters, sorted by postal code, into PDFs for bulk mail. "
+        "Members who opted out of postal mail are skipped.",
+    )
+    parser.add_argument(
+        "--volume-size",
+        type=int,
+        default=0,
+        help="Print run: letters per merged PDF (default: one single PDF).",
+    )
+    return parser.parse_args(argv)
+
+
+def print_progress(report: BatchReport):
+    print(
+        f"⏳ {report.processed} letter(s) processed, "
+        f"{len(report.failures)} failed, {report.throughput:.1f} letters/s"
+    )
+
 
-    for member in members:
-        for membership in member.memberships:
-            if membership.amount == 0 and not membership.is_paid:
-                generate_pdf(member, membership, output_dir)
-                count += 1
+def main(argv=None):
+    args = parse_args(argv)
+
+    stmt = letter_candidates_query(
+        year=args.year,
+        city=args.city,
+        postal_code_from=args.postal_code_from,
+        postal_code_to=args.postal_code_to,
+        postal_mail_only=args.print_run,
+        sort_by_postal_code=args.print_run,
+    )
+
+    db = SessionLocal()
+    try:
+        contexts = iter_letter_candidates(db, stmt, batch_size=args.batch_size)
+        if args.print_run:
+            report = render_print_run(
+                contexts,
+                PRINT_RUNS_DIR,
+                f"print_run_{datetime.now():%Y%m%d_%H%M%S}",
+                workers=args.workers,
+                chunk_size=args.chunk_size or 50,
+                volume_size=args.volume_size,
+                recycle_after=args.recycle_after,
+                on_progress=print_progress,
+            )
+        else:
+            report = render_letters(
+                contexts,
+                output_dir,
+                workers=args.workers,
+                chunk_size=args.chunk_size or 25,
+                recycle_after=args.recycle_after,
+                on_progress=print_progress,
+            )
+    finally:
+        db.close()
 
-    db.close()
-    print(f"✅ Generated {count} welcome letter(s).")
+    print(
+        f"✅ Generated {report.generated} welcome letter(s) "
+        f"in {report.elapsed:.1f}s ({report.throughput:.1f} letters/s)."
+    )
+    for volume in getattr(report, "volumes", []):
+        print(f"📦 Print-run volume: {volume}")
+    if report.failures:
+        print(f"❌ {len(report.failures)} letter(s) failed:")
+        for failure in report.failures:
+            print(f"   - reference {failure.reference_number}: {failure.error}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
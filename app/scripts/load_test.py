@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+
+# app/scripts/load_test.py
+
+"""
+Load test of the member read endpoints with many concurrent clients.
+
+Each client sends requests back to back for --duration seconds, after a
+--warm-up that is not measured, and the script reports throughput and
+latency percentiles per target. To compare the sync and the async stack,
+run the API twice against the same database, with the member and search
+caches off so that every request queries the database, e.g.
+
+    export MEMBER_CACHE_ENABLED=false SEARCH_CACHE_ENABLED=false
+    uvicorn main:app --port 8000
+    ASYNC_DB_ENABLED=true uvicorn main:app --port 8001
+
+and pass both: --target sync=http://localhost:8000 --target async=http://localhost:8001
+
+The cache hits of each server during the run are read from its /metrics
+and printed with the results: hits mean that cache was on.
+"""
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+# Requests cycled through by every client: a lookup and two searches
+DEFAULT_PATHS = (
+    "/members/search/reference/{reference}",
+    "/members/search/name/{name}?limit=20",
+    "/members/search?q={name}&limit=20",
+)
+
+# Counters of the requests served from each cache, see app/cache.py
+CACHE_HIT_METRICS = {
+    "member": "member_cache_hits_total",
+    "search": "search_cache_hits_total",
+}
+
+
+@dataclass
+class LoadResult:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed: float = 0.0
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies) or [0.0]
+        quantiles = statistics.quantiles(ordered, n=100) if len(ordered) > 1 else []
+
+        def percentile(p: int) -> float:
+            return (quantiles[p - 1] if quantiles else ordered[0]) * 1000
+
+        return {
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "rps": len(self.latencies) / self.elapsed if self.elapsed else 0.0,
+            "p50": percentile(50),
+            "p95": percentile(95),
+            "p99": percentile(99),
+            "max": ordered[-1] * 1000,
+        }
+
+
+async def run_client(
+    client: httpx.AsyncClient,
+    paths: list[str],
+    measure_from: float,
+    stop: float,
+    result: LoadResult,
+    offset: int,
+):
+    # Clients start at different points of the cycle, so requests are mixed
+    for path in itertools.islice(itertools.cycle(paths), offset, None):
+        now = time.perf_counter()
+        if now >= stop:
+            return
+        try:
+            response = await client.get(path)
+            failed = response.status_code >= 500
+        except httpx.HTTPError:
+            failed = True
+        end = time.perf_counter()
+        if now >= measure_from:
+            if failed:
+                result.errors += 1
+            else:
+                result.latencies.append(end - now)
+
+
+def cache_hits(base_url: str) -> dict[str, float] | None:
+    """Hits of each cache counted by a server so far, None without /metrics."""
+    try:
+        response = httpx.get(f"{base_url}/metrics", timeout=10.0)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return None
+    hits = dict.fromkeys(CACHE_HIT_METRICS, 0.0)
+    for line in response.text.splitlines():
+        for cache, metric in CACHE_HIT_METRICS.items():
+            if line.startswith((f"{metric} ", f"{metric}{{")):
+                hits[cache] += float(line.rsplit(" ", 1)[1])
+    return hits
+
+
+async def load(
+    base_url: str, paths: list[str], clients: int, duration: float, warm_up: float
+) -> LoadResult:
+    """Run `clients` concurrent clients against one server."""
+    result = LoadResult()
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=60.0
+    ) as client:
+        start = time.perf_counter()
+        measure_from = start + warm_up
+        stop = measure_from + duration
+        await asyncio.gather(
+            *(
+                run_client(client, paths, measure_from, stop, result, i)
+                for i in range(clients)
+            )
+        )
+    result.elapsed = duration
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--target",
+        action="append",
+        required=True,
+        metavar="NAME=URL",
+        help="Server to load, e.g. async=http://localhost:8001 (repeatable)",
+    )
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warm-up", type=float, default=5.0)
+    parser.add_argument(
+        "--reference", required=True, help="Reference number of an existing member"
+    )
+    parser.add_argument("--name", default="virt", help="Name term that has matches")
+    args = parser.parse_args(argv)
+
+    paths = [p.format(reference=args.reference, name=args.name) for p in DEFAULT_PATHS]
+    print(
+        f"{'target':<10} {'requests':>9} {'errors':>7} {'req/s':>9} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}  cache hits"
+    )
+    for target in args.target:
+        name, _, url = target.partition("=") if "=" in target else (target, "", target)
+        before = cache_hits(url)
+        result = asyncio.run(
+            load(url, paths, args.clients, args.duration, args.warm_up)
+        )
+        after = cache_hits(url)
+        if before is None or after is None:
+            hits = "unknown, no /metrics"
+        else:
+            hits = " ".join(f"{c}={after[c] - before[c]:.0f}" for c in after)
+        s = result.summary()
+        print(
+            f"{name:<10} {s['requests']:>9} {s['errors']:>7} {s['rps']:>9.1f} "
+            f"{s['p50']:>8.1f} {s['p95']:>8.1f} {s['p99']:>8.1f} {s['max']:>8.1f}"
+            f"  {hits}"
+        )
+
+
+if __name__ == "__main__":
+    main()
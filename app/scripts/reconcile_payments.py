@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+# app/scripts/reconcile_payments.py
+
+"""
+Record the incoming payments of a bank statement as membership amounts.
+
+Usage:
+    python scripts/reconcile_payments.py statement.xml --year 2025
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add /app to PYTHONPATH
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from bulk.payments import (
+    STATEMENT_FORMATS,
+    read_payments,
+    reconcile_payments,
+    statement_format,
+)
+from config import settings
+from database import SessionLocal
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", type=Path, help="CSV export or camt.053 XML file")
+    parser.add_argument("--year", type=int, default=datetime.now().year)
+    parser.add_argument(
+        "--format",
+        choices=STATEMENT_FORMATS,
+        help="Default: guessed from the file suffix",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.BULK_IMPORT_BATCH_SIZE
+    )
+    args = parser.parse_args(argv)
+
+    fmt = args.format or statement_format(filename=args.path.name)
+    if fmt is None:
+        parser.error("cannot guess the format from the file name, pass --format")
+
+    db = SessionLocal()
+    try:
+        with args.path.open("rb") as stream:
+            report = reconcile_payments(
+                db, read_payments(stream, fmt), args.year, args.batch_size
+            )
+    finally:
+        db.close()
+
+    counts = ", ".join(f"{n} {outcome}" for outcome, n in report.counts.items() if n)
+    print(
+        f"✅ {report.payments} payment(s) for {args.year} in {report.elapsed:.1f}s: "
+        f"{counts or 'nothing recorded'}"
+    )
+    for label, payments in (
+        ("Unmatched", report.unmatched),
+        ("Duplicate", report.duplicates),
+    ):
+        for payment in payments:
+            print(
+                f"  {label}: #{payment.position} ref={payment.reference} "
+                f"amount={payment.amount} payer={payment.payer}"
+            )
+    for payment, error in report.invalid:
+        print(f"  Invalid: #{payment.position} {error}")
+    return 1 if report.unmatched or report.duplicates or report.invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# ./app/seed/import_members.py
+
+"""
+Bulk import members from a CSV or NDJSON file, e.g. an export of the old
+member register.
+
+Usage:
+    python seed/import_members.py members.csv [--errors errors.csv]
+"""
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+# Add parent directory (/app) to sys.path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from bulk.members import import_members
+from bulk.readers import FORMATS, detect_format, read_rows
+from config import settings
+from database import SessionLocal
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", type=Path, help="CSV (with header) or NDJSON file")
+    parser.add_argument(
+        "--format", choices=FORMATS, help="Default: guessed from the file suffix"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.BULK_IMPORT_BATCH_SIZE
+    )
+    parser.add_argument(
+        "--errors", type=Path, help="Write the rejected lines to this CSV file"
+    )
+    args = parser.parse_args(argv)
+
+    fmt = args.format or detect_format(filename=args.path.name)
+    if fmt is None:
+        parser.error("cannot guess the format from the file name, pass --format")
+
+    db = SessionLocal()
+    try:
+        with args.path.open("rb") as stream:
+            report = import_members(db, read_rows(stream, fmt), args.batch_size)
+    finally:
+        db.close()
+
+    print(
+        f"✅ Imported {report.inserted} member(s) in {report.elapsed:.1f}s, "
+        f"rejected {report.rejected} row(s)"
+    )
+    if args.errors:
+        with args.errors.open("w", newline="") as out:
+            writer = csv.writer(out)
+            writer.writerow(["line", "error"])
+            for error in report.errors:
+                writer.writerows([error.line, message] for message in error.errors)
+        print(f"📄 Row errors written to {args.errors}")
+    else:
+        for error in report.errors[:20]:
+            print(f"  line {error.line}: {'; '.join(error.errors)}")
+        if report.rejected > 20:
+            print(f"  … and {report.rejected - 20} more, use --errors to save them all")
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
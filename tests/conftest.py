@@ -4,9 +4,12 @@ import os
 os.environ["ENV_FILE"] = ".env.test"
 
 import uuid
+from contextlib import contextmanager
 
 import pytest
 from models import Member
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 IS_MONITORING_TEST = os.environ.get("ONLY_MONITORING_TESTS") == "1"
 
@@ -21,6 +24,14 @@ def initialize_test_database():
     yield
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start each test with empty caches; tests write past the routes."""
+    from cache import members_changed
+
+    members_changed()
+
+
 @pytest.fixture
 def db_session():
     """
@@ -88,3 +99,33 @@ def make_membership(db_session, make_member):
         return membership
 
     return _make_membership
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Context manager failing the test if its block runs more than `limit`
+    SQL statements, so that N+1 query regressions are caught.
+    Statements of every thread count, as the test client runs the app
+    in a thread of its own.
+    """
+
+    @contextmanager
+    def _assert_max_queries(limit: int):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(Engine, "after_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, "after_cursor_execute", record)
+        assert (
+            len(statements) <= limit
+        ), f"{len(statements)} queries, expected at most {limit}:\n" + "\n".join(
+            statements
+        )
+
+    return _assert_max_queries
@@ -0,0 +1,113 @@
+# tests/test_api_responses.py
+
+import json
+from datetime import date
+
+from api.responses import (
+    BytesRangeResponse,
+    FastJSONResponse,
+    conditional_response,
+    etag_matches,
+)
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from schemas import MembershipResponse
+
+CONTENT = b"%PDF-0123456789"
+ETAG = '"abc"'
+
+app = FastAPI()
+
+
+@app.get("/doc.pdf")
+def document():
+    return BytesRangeResponse(
+        CONTENT,
+        headers={"ETag": ETAG},
+        media_type="application/pdf",
+        filename="doc.pdf",
+    )
+
+
+client = TestClient(app)
+
+
+def test_full_body_without_range():
+    response = client.get("/doc.pdf")
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-disposition"] == 'attachment; filename="doc.pdf"'
+
+
+def test_single_ranges():
+    first = client.get("/doc.pdf", headers={"Range": "bytes=0-3"})
+    assert first.status_code == 206
+    assert first.content == b"%PDF"
+    assert first.headers["content-range"] == f"bytes 0-3/{len(CONTENT)}"
+
+    rest = client.get("/doc.pdf", headers={"Range": "bytes=5-"})
+    assert rest.status_code == 206
+    assert rest.content == CONTENT[5:]
+
+    suffix = client.get("/doc.pdf", headers={"Range": "bytes=-4"})
+    assert suffix.status_code == 206
+    assert suffix.content == b"6789"
+
+
+def test_unsatisfiable_range():
+    response = client.get("/doc.pdf", headers={"Range": "bytes=100-"})
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_ignored_ranges_return_full_body():
+    for headers in (
+        {"Range": "bytes=0-1,4-5"},
+        {"Range": "pages=1"},
+        {"Range": "bytes=0-3", "If-Range": '"stale"'},
+    ):
+        response = client.get("/doc.pdf", headers=headers)
+        assert response.status_code == 200
+        assert response.content == CONTENT
+
+    matching = client.get("/doc.pdf", headers={"Range": "bytes=0-3", "If-Range": ETAG})
+    assert matching.status_code == 206
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', ETAG)
+    assert etag_matches('"x", W/"abc"', ETAG)
+    assert etag_matches("*", ETAG)
+    assert not etag_matches('"x"', ETAG)
+    assert not etag_matches(None, ETAG)
+
+
+def test_conditional_response():
+    fresh = conditional_response(b"{}", ETAG, None)
+    assert fresh.status_code == 200
+    assert fresh.body == b"{}"
+    assert fresh.headers["etag"] == ETAG
+    assert fresh.headers["cache-control"] == "no-cache"
+
+    cached = conditional_response(b"{}", ETAG, ETAG)
+    assert cached.status_code == 304
+    assert cached.body == b""
+    assert cached.headers["etag"] == ETAG
+
+
+def test_fast_json_response_serializes_models_in_one_pass():
+    membership = MembershipResponse(
+        year=2025, amount=25, is_paid=True, discounted=False
+    )
+    content = {"message": "Ünicode", "membership": membership, "on": date(2025, 1, 2)}
+
+    fast = FastJSONResponse(content)
+    standard = JSONResponse(
+        {**content, "membership": membership.model_dump(), "on": "2025-01-02"}
+    )
+    assert fast.media_type == "application/json"
+    assert json.loads(fast.body) == json.loads(standard.body)
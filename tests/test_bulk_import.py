@@ -0,0 +1,78 @@
+# tests/test_bulk_import.py
+
+import io
+import json
+
+import pytest
+from bulk.members import import_members
+from bulk.readers import read_rows
+from database import get_db
+from fastapi.testclient import TestClient
+from models import Member
+
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def override_get_db(db_session):
+    def _override():
+        yield db_session
+
+    app.dependency_overrides[get_db] = _override
+
+
+def test_import_members_merges_valid_rows(db_session, make_member):
+    make_member(email="taken@bulk.example.com")
+    upload = io.BytesIO(
+        b"first_name,last_name,city,email,postal_code\n"
+        b"Aino,Bulk,BulkCity,aino@bulk.example.com,00100\n"
+        b"Eino,Bulk,BulkCity,taken@bulk.example.com,00100\n"
+        b"Helmi,Bulk,BulkCity,,not-a-code\n"
+        b"Lauri,Bulk,BulkCity,aino@bulk.example.com,00100\n"
+        b"Olavi,Bulk,BulkCity,,33100\n"
+    )
+
+    report = import_members(db_session, read_rows(upload, "csv"), batch_size=2)
+
+    assert report.inserted == 2
+    assert [e.line for e in report.errors] == [3, 4, 5]
+    assert report.errors[0].errors == ["email: already registered"]
+    assert report.errors[1].errors[0].startswith("postal_code")
+
+    imported = (
+        db_session.query(Member)
+        .filter(Member.city == "BulkCity")
+        .order_by(Member.reference_number)
+        .all()
+    )
+    assert [m.first_name for m in imported] == ["Aino", "Olavi"]
+    assert imported[0].reference_number < imported[1].reference_number
+
+
+def test_import_endpoint_accepts_ndjson():
+    rows = [
+        {"first_name": "Sofia", "last_name": "Nd", "city": "NdjsonCity"},
+        {"first_name": "Maria", "city": "NdjsonCity"},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows).encode()
+
+    response = client.post(
+        "/members/import",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["inserted"] == 1
+    assert payload["rejected"] == 1
+    assert payload["errors"][0]["line"] == 2
+
+
+def test_import_endpoint_rejects_unknown_format():
+    response = client.post(
+        "/members/import", content=b"x", headers={"Content-Type": "text/plain"}
+    )
+    assert response.status_code == 415
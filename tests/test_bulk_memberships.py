@@ -0,0 +1,93 @@
+# tests/test_bulk_memberships.py
+
+import pytest
+from config import settings
+from database import get_db
+from fastapi.testclient import TestClient
+from models import Membership
+
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def override_get_db(db_session):
+    def _override():
+        yield db_session
+
+    app.dependency_overrides[get_db] = _override
+
+
+def test_bulk_upsert_reports_outcome_per_row(db_session, make_member, make_membership):
+    existing = make_member()
+    make_membership(member=existing, year=2025, amount=0)
+    unchanged = make_member()
+    make_membership(
+        member=unchanged, year=2025, amount=settings.STANDARD_MEMBERSHIP_FEE
+    )
+    new = make_member()
+
+    response = client.post(
+        "/members/memberships/bulk",
+        json={
+            "memberships": [
+                {"member_id": existing.id, "year": 2025, "amount": 10},
+                {"reference_number": new.reference_number, "year": 2025, "amount": 0},
+                {"member_id": unchanged.id, "year": 2025, "amount": 25},
+                {"member_id": 999999999, "year": 2025, "amount": 25},
+                {"member_id": new.id, "year": 2025, "amount": 25},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert [r["outcome"] for r in payload["results"]] == [
+        "updated",
+        "superseded",
+        "unchanged",
+        "member_not_found",
+        "created",
+    ]
+    assert payload["counts"]["superseded"] == 1
+
+    db_session.expire_all()
+    updated = db_session.query(Membership).filter_by(member_id=existing.id).one()
+    assert (updated.amount, updated.is_paid, updated.discounted) == (10, True, True)
+    created = db_session.query(Membership).filter_by(member_id=new.id).one()
+    assert (created.amount, created.is_paid, created.discounted) == (25, True, False)
+
+
+def test_single_membership_per_year(make_member):
+    member = make_member()
+    payload = {"year": 2025, "amount": 0}
+    assert (
+        client.post(f"/members/{member.id}/memberships", json=payload).status_code
+        == 201
+    )
+    assert (
+        client.post(f"/members/{member.id}/memberships", json=payload).status_code
+        == 409
+    )
+
+
+def test_bulk_upsert_bumps_each_member_version_once(db_session, make_member):
+    members = [make_member() for _ in range(2)]
+    latest = max(m.row_version for m in members)
+
+    response = client.post(
+        "/members/memberships/bulk",
+        json={
+            "memberships": [
+                {"member_id": m.id, "year": year, "amount": 0}
+                for m in members
+                for year in (2026, 2027)
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    db_session.expire_all()
+    # One new version per member, however many of its memberships were written
+    assert sorted(m.row_version for m in members) == [latest + 1, latest + 2]
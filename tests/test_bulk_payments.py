@@ -0,0 +1,86 @@
+# tests/test_bulk_payments.py
+
+import io
+from decimal import Decimal
+
+from bulk.payments import (
+    parse_amount,
+    parse_reference,
+    read_camt053_payments,
+    read_csv_payments,
+    statement_format,
+)
+
+CAMT053 = b"""<?xml version="1.0" encoding="UTF-8"?>
+<Document xmlns="urn:iso:std:iso:20022:tech:xsd:camt.053.001.02">
+  <BkToCstmrStmt><Stmt>
+    <Ntry>
+      <Amt Ccy="EUR">25.00</Amt><CdtDbtInd>CRDT</CdtDbtInd>
+      <BookgDt><Dt>2025-02-03</Dt></BookgDt>
+      <NtryDtls>
+        <TxDtls>
+          <AmtDtls><TxAmt><Amt Ccy="EUR">15.00</Amt></TxAmt></AmtDtls>
+          <RltdPties><Dbtr><Nm>Aino Virtanen</Nm></Dbtr></RltdPties>
+          <RmtInf><Strd><CdtrRefInf><Ref>2000000012</Ref></CdtrRefInf></Strd></RmtInf>
+        </TxDtls>
+        <TxDtls>
+          <AmtDtls><TxAmt><Amt Ccy="EUR">10.00</Amt></TxAmt></AmtDtls>
+          <RmtInf><Strd><CdtrRefInf><Ref>RF18 2000 0000 13</Ref></CdtrRefInf></Strd></RmtInf>
+        </TxDtls>
+      </NtryDtls>
+    </Ntry>
+    <Ntry>
+      <Amt Ccy="EUR">99.00</Amt><CdtDbtInd>DBIT</CdtDbtInd>
+    </Ntry>
+  </Stmt></BkToCstmrStmt>
+</Document>
+"""
+
+
+def test_statement_format():
+    assert statement_format("text/csv") == "csv"
+    assert statement_format("application/xml; charset=utf-8") == "camt053"
+    assert statement_format(None, "tiliote.XML") == "camt053"
+    assert statement_format("application/pdf") is None
+
+
+def test_parse_reference_and_amount():
+    assert parse_reference(" 0020 0000 0012 ") == 2000000012
+    assert parse_reference("RF18 2000 0000 13") == 2000000013
+    assert parse_reference("invoice 7") is None
+    assert parse_amount("1 234,50 €") == Decimal("1234.50")
+    assert parse_amount("25.00") == Decimal("25.00")
+    assert parse_amount("1,234.50") == Decimal("1234.50")
+    assert parse_amount("1.234,50") == Decimal("1234.50")
+    assert parse_amount("1.234.567") == Decimal("1234567")
+    # Decimal or thousands separator: ambiguous
+    assert parse_amount("1,234") is None
+    assert parse_amount("n/a") is None
+
+
+def test_read_csv_payments_skips_outgoing():
+    statement = io.BytesIO(
+        "Kirjauspäivä;Määrä;Saaja/Maksaja;Viite\n"
+        "03.02.2025;25,00;Aino Virtanen;2000000012\n"
+        "03.02.2025;-12,00;Kauppa;\n"
+        "04.02.2025;10,00;Eino;\n".encode()
+    )
+
+    payments = list(read_csv_payments(statement))
+
+    assert [(p.position, p.reference, p.amount) for p in payments] == [
+        (2, "2000000012", Decimal("25.00")),
+        (4, None, Decimal("10.00")),
+    ]
+    assert payments[0].payer == "Aino Virtanen"
+
+
+def test_read_camt053_payments_per_transaction():
+    payments = list(read_camt053_payments(io.BytesIO(CAMT053)))
+
+    assert [(p.position, p.reference, p.amount) for p in payments] == [
+        (1, "2000000012", Decimal("15.00")),
+        (2, "RF18 2000 0000 13", Decimal("10.00")),
+    ]
+    assert payments[0].payer == "Aino Virtanen"
+    assert payments[0].date == "2025-02-03"
@@ -0,0 +1,47 @@
+# tests/test_bulk_readers.py
+
+import io
+
+import pytest
+from bulk.readers import RawRow, detect_format, read_rows
+
+
+def test_detect_format():
+    assert detect_format("text/csv; charset=utf-8") == "csv"
+    assert detect_format("application/x-ndjson") == "ndjson"
+    assert detect_format("application/octet-stream", "export.JSONL") == "ndjson"
+    assert detect_format(None, "export.xlsx") is None
+
+
+def test_read_csv_rows_with_line_numbers():
+    upload = io.BytesIO(
+        "﻿first_name,city,notes\n"
+        'Aino,Oulu,"two\nlines"\n'
+        "Eino,,\n"
+        "Too,many,values,here\n".encode()
+    )
+
+    assert list(read_rows(upload, "csv")) == [
+        RawRow(2, {"first_name": "Aino", "city": "Oulu", "notes": "two\nlines"}),
+        RawRow(4, {"first_name": "Eino", "city": None, "notes": None}),
+        RawRow(5, None, "More values than headers"),
+    ]
+
+
+def test_read_ndjson_rows_reports_bad_lines():
+    upload = io.BytesIO(b'{"first_name": "Aino"}\n\n[1, 2]\n{broken\n')
+
+    rows = list(read_rows(upload, "ndjson"))
+
+    assert rows[0] == RawRow(1, {"first_name": "Aino"})
+    assert rows[1] == RawRow(3, None, "Expected a JSON object")
+    assert rows[2].line == 4 and rows[2].error.startswith("Invalid JSON")
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        list(read_rows(io.BytesIO(b""), "xlsx"))
+
+
+def test_read_empty_csv_upload():
+    assert list(read_rows(io.BytesIO(b""), "csv")) == []
@@ -0,0 +1,181 @@
+# tests/test_cache.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cache
+import pytest
+from cache import MemberCache, SearchCache
+
+
+def test_lookup_by_reference():
+    members = MemberCache(max_entries=10, ttl=60)
+    members.put("lookup", 1, 1001, '{"id":1}', 1, members.generation)
+
+    assert members.get_by_reference("lookup", 1001) == ('{"id":1}', 1)
+    assert members.get_by_reference("member", 1001) is None
+    assert members.get_by_reference("lookup", 1002) is None
+
+
+def test_invalidate_drops_every_kind_of_the_member():
+    members = MemberCache(max_entries=10, ttl=60)
+    members.put("lookup", 1, 1001, "a", 1, members.generation)
+    members.put("member", 1, 1001, "b", 1, members.generation)
+    members.put("lookup", 2, 1002, "c", 1, members.generation)
+
+    members.invalidate(1)
+
+    assert members.get_by_reference("lookup", 1001) is None
+    assert members.get_by_reference("member", 1001) is None
+    assert members.get_by_reference("lookup", 1002) == ("c", 1)
+    assert len(members) == 1
+
+
+def test_put_is_skipped_after_an_invalidation_during_the_read():
+    members = MemberCache(max_entries=10, ttl=60)
+    generation = members.generation
+    # An update commits and invalidates while the old document is read
+    members.invalidate(1)
+    members.put("lookup", 1, 1001, "stale", 1, generation)
+
+    assert members.get_by_reference("lookup", 1001) is None
+
+
+def test_least_recently_used_are_evicted_beyond_max_entries():
+    members = MemberCache(max_entries=2, ttl=60)
+    members.put("lookup", 1, 1001, "a", 1, members.generation)
+    members.put("lookup", 2, 1002, "b", 1, members.generation)
+    members.get_by_reference("lookup", 1001)
+    members.put("lookup", 3, 1003, "c", 1, members.generation)
+
+    assert len(members) == 2
+    assert members.get_by_reference("lookup", 1002) is None
+    assert members.get_by_reference("lookup", 1001) == ("a", 1)
+    assert members.get_by_reference("lookup", 1003) == ("c", 1)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    members = MemberCache(max_entries=10, ttl=60)
+    members.put("lookup", 1, 1001, "a", 1, members.generation)
+
+    now[0] += 59
+    assert members.get_by_reference("lookup", 1001) == ("a", 1)
+    now[0] += 2
+    assert members.get_by_reference("lookup", 1001) is None
+    assert len(members) == 0
+
+
+def test_disabled_cache_stores_nothing():
+    members = MemberCache(max_entries=10, ttl=60, enabled=False)
+    members.put("lookup", 1, 1001, "a", 1, members.generation)
+
+    assert members.get_by_reference("lookup", 1001) is None
+    assert len(members) == 0
+
+
+def test_hits_and_misses_are_counted():
+    def count(counter):
+        return counter.labels("counted")._value.get()
+
+    hits, misses = count(cache.cache_hits), count(cache.cache_misses)
+    members = MemberCache(max_entries=10, ttl=60)
+    members.put("counted", 1, 1001, "a", 1, members.generation)
+    members.get_by_reference("counted", 1001)
+    members.get_by_reference("counted", 1002)
+
+    assert count(cache.cache_hits) == hits + 1
+    assert count(cache.cache_misses) == misses + 1
+
+
+def test_search_pages_are_stale_after_a_write():
+    searches = SearchCache(max_entries=10, ttl=60)
+    calls = []
+
+    def query():
+        calls.append(1)
+        return b"page %d" % len(calls)
+
+    assert searches.get_or_compute("key", query) == b"page 1"
+    assert searches.get_or_compute("key", query) == b"page 1"
+    searches.bump()
+    assert searches.get_or_compute("key", query) == b"page 2"
+    assert len(calls) == 2
+
+
+def test_page_queried_across_a_write_is_not_cached():
+    searches = SearchCache(max_entries=10, ttl=60)
+
+    def query():
+        searches.bump()
+        return b"old"
+
+    assert searches.get_or_compute("key", query) == b"old"
+    assert len(searches) == 0
+
+
+def test_concurrent_identical_misses_run_one_query():
+    searches = SearchCache(max_entries=10, ttl=60)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def query():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return b"page"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        leader = pool.submit(searches.get_or_compute, "key", query)
+        started.wait(5)
+        followers = [
+            pool.submit(searches.get_or_compute, "key", query) for _ in range(3)
+        ]
+        # Let the followers reach the flight before it lands
+        time.sleep(0.1)
+        release.set()
+        bodies = [leader.result()] + [f.result() for f in followers]
+
+    assert bodies == [b"page"] * 4
+    assert len(calls) == 1
+
+
+def test_waiting_searches_query_themselves_when_the_leader_fails():
+    searches = SearchCache(max_entries=10, ttl=60)
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("connection lost")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(searches.get_or_compute, "key", failing)
+        started.wait(5)
+        follower = pool.submit(searches.get_or_compute, "key", lambda: b"page")
+        time.sleep(0.1)
+        release.set()
+        with pytest.raises(RuntimeError):
+            leader.result()
+        assert follower.result() == b"page"
+
+
+def test_async_identical_misses_run_one_query():
+    searches = SearchCache(max_entries=10, ttl=60)
+    calls = []
+
+    async def query():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b"page"
+
+    async def main():
+        return await asyncio.gather(
+            *(searches.get_or_compute_async("key", query) for _ in range(5))
+        )
+
+    assert asyncio.run(main()) == [b"page"] * 5
+    assert len(calls) == 1
@@ -0,0 +1,119 @@
+# tests/test_cache_invalidation.py
+
+import time
+
+import pytest
+from cache import member_cache, search_cache
+from cache_invalidation import (
+    InvalidationListener,
+    handle_notification,
+    listener_conninfo,
+    notifications_received,
+)
+from config import settings
+from models import Member
+
+
+def cache_member(member_id: int, reference_number: int):
+    member_cache.put(
+        "lookup", member_id, reference_number, "{}", 1, member_cache.generation
+    )
+
+
+def test_listener_conninfo_drops_the_driver():
+    conninfo = listener_conninfo("postgresql+psycopg2://u:secret@db:5432/members")
+    assert conninfo == "postgresql://u:secret@db:5432/members"
+
+
+def test_notification_evicts_the_member_and_search_pages():
+    cache_member(1, 1001)
+    cache_member(2, 1002)
+    generation = search_cache.generation
+
+    handle_notification("1")
+
+    assert member_cache.get_by_reference("lookup", 1001) is None
+    assert member_cache.get_by_reference("lookup", 1002) == ("{}", 1)
+    assert search_cache.generation > generation
+
+
+def test_notification_lists_the_members_of_a_statement():
+    for member_id in (1, 2, 3):
+        cache_member(member_id, 1000 + member_id)
+
+    handle_notification("1,3")
+
+    assert member_cache.get_by_reference("lookup", 1001) is None
+    assert member_cache.get_by_reference("lookup", 1002) == ("{}", 1)
+    assert member_cache.get_by_reference("lookup", 1003) is None
+
+
+def test_all_members_notification_evicts_everything():
+    cache_member(1, 1001)
+    handle_notification("*")
+    assert len(member_cache) == 0
+
+
+def test_unreadable_notification_evicts_everything():
+    cache_member(1, 1001)
+    handle_notification("not an id")
+    assert len(member_cache) == 0
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.fixture
+def listener():
+    listener = InvalidationListener(
+        listener_conninfo(settings.DATABASE_URL), poll_interval=0.1
+    )
+    listener.start()
+    assert listener.wait_listening(5)
+    yield listener
+    listener.stop()
+
+
+def test_commits_of_another_session_evict_the_member(
+    listener, db_session, make_member, make_membership
+):
+    received = notifications_received._value.get()
+    member = make_member(first_name="Notified")
+    # Let the notification of the insert pass first
+    assert wait_for(lambda: notifications_received._value.get() > received)
+    cache_member(member.id, member.reference_number)
+
+    member.city = "Elsewhere"
+    db_session.commit()
+    assert wait_for(
+        lambda: member_cache.get_by_reference("lookup", member.reference_number) is None
+    )
+
+    cache_member(member.id, member.reference_number)
+    make_membership(member=member)
+    assert wait_for(
+        lambda: member_cache.get_by_reference("lookup", member.reference_number) is None
+    )
+
+
+def test_bulk_statement_sends_one_notification(listener, db_session, make_member):
+    received = notifications_received._value.get()
+    members = [make_member(city="Bulkton") for _ in range(3)]
+    assert wait_for(lambda: notifications_received._value.get() == received + 3)
+    for member in members:
+        cache_member(member.id, member.reference_number)
+
+    db_session.query(Member).filter(Member.city == "Bulkton").update(
+        {Member.notes: "bulk"}
+    )
+    db_session.commit()
+
+    assert wait_for(lambda: len(member_cache) == 0)
+    time.sleep(0.3)  # A few poll intervals, for any further notification
+    assert notifications_received._value.get() == received + 4
@@ -0,0 +1,63 @@
+# tests/test_db_metrics.py
+
+import pytest
+from config import settings
+from database import engine_options
+from db_metrics import InstrumentedQueuePool, PoolCollector
+from prometheus_client import REGISTRY, CollectorRegistry
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+
+def sqlite_engine(tmp_path, name: str, **options):
+    return create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name=name,
+        **options,
+    )
+
+
+def sample(name: str, pool: str, registry=REGISTRY):
+    return registry.get_sample_value(name, {"pool": pool}) or 0
+
+
+def test_checkout_wait_and_pool_gauges(tmp_path):
+    engine = sqlite_engine(tmp_path, "test_gauges", pool_size=2, max_overflow=1)
+    registry = CollectorRegistry()
+    registry.register(PoolCollector({"test_gauges": engine}))
+    before = sample("db_pool_checkout_wait_seconds_count", "test_gauges")
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        assert sample("db_pool_checked_out", "test_gauges", registry) == 1
+    assert sample("db_pool_checked_out", "test_gauges", registry) == 0
+    assert sample("db_pool_checked_in", "test_gauges", registry) == 1
+    assert sample("db_pool_size", "test_gauges", registry) == 2
+    assert sample("db_pool_checkout_wait_seconds_count", "test_gauges") == before + 1
+
+    # The collector follows the pool that dispose() puts in place
+    engine.dispose()
+    assert sample("db_pool_checked_in", "test_gauges", registry) == 0
+
+
+def test_checkout_timeout_is_counted(tmp_path):
+    engine = sqlite_engine(
+        tmp_path, "test_timeout", pool_size=1, max_overflow=0, pool_timeout=0.01
+    )
+    with engine.connect(), pytest.raises(PoolTimeoutError):
+        engine.connect()
+    assert sample("db_pool_checkout_timeouts_total", "test_timeout") == 1
+
+
+def test_pgbouncer_mode_disables_prepared_statements(monkeypatch):
+    psycopg = make_url("postgresql+psycopg://u:p@db/members")
+    psycopg2 = make_url("postgresql://u:p@db/members")
+
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", False)
+    assert "connect_args" not in engine_options(psycopg)
+
+    monkeypatch.setattr(settings, "DB_PGBOUNCER", True)
+    assert engine_options(psycopg)["connect_args"] == {"prepare_threshold": None}
+    assert "connect_args" not in engine_options(psycopg2)
+    assert engine_options(psycopg)["pool_size"] == settings.DB_POOL_SIZE
@@ -1,11 +1,16 @@
 # tests/test_routes_member.py
 
+import time
+from concurrent.futures import Future
 from pathlib import Path
 
 import pytest
+from api.routes_letters import LETTERS_DIR
+from config import settings
 from database import get_db
 from fastapi.testclient import TestClient
 from models import Member, Membership
+from pdf.jobs import letter_jobs
 from sqlalchemy.orm import Session
 
 from app.main import app
@@ -47,16 +52,39 @@ def create_member_with_membership(db: Session) -> Member:
     return member
 
 
+def wait_for_job(job_id: str, timeout: float = 60.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/members/letter_jobs/{job_id}").json()
+        if job["state"] in ("done", "failed"):
+            return job
+        time.sleep(0.1)
+    raise AssertionError(f"Job {job_id} did not finish in {timeout}s")
+
+
 def test_generate_welcome_letter_success(db_session):
     member = create_member_with_membership(db_session)
     response = client.post(f"/members/members/{member.id}/generate_welcome_letter")
 
-    assert response.status_code == 200
-    assert "PDF generated successfully" in response.json()["message"]
-    output_path = Path(response.json()["path"])
+    assert response.status_code == 202
+    assert "PDF generation queued" in response.json()["message"]
+    job = wait_for_job(response.json()["job_id"])
+
+    assert job["state"] == "done", job["error"]
+    output_path = Path(job["path"])
     assert output_path.exists()
     assert output_path.suffix == ".pdf"
 
+    download = client.get(job["download_url"])
+    assert download.status_code == 200
+    assert download.headers["content-type"] == "application/pdf"
+    assert download.content.startswith(b"%PDF")
+
+
+def test_letter_job_not_found():
+    assert client.get("/members/letter_jobs/unknown").status_code == 404
+    assert client.get("/members/letter_jobs/unknown/download").status_code == 404
+
 
 def test_generate_letter_member_not_found():
     response = client.post("/members/members/999999/generate_welcome_letter")
@@ -82,3 +110,54 @@ def test_generate_letter_member_has_no_membership(db_session):
 
     assert response.status_code == 400
     assert "no memberships" in response.text
+
+
+def test_download_welcome_letter_in_memory(db_session, make_member, make_membership):
+    member = make_member(city="StreamCity")
+    make_membership(member=member, year=2025, amount=0)
+    url = f"/members/members/{member.id}/welcome_letter.pdf"
+
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.content.startswith(b"%PDF")
+    assert not (LETTERS_DIR / f"welcome_letter_{member.reference_number}.pdf").exists()
+
+    etag = response.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    partial = client.get(url, headers={"Range": "bytes=0-3", "If-Range": etag})
+    assert partial.status_code == 206
+    assert partial.content == b"%PDF"
+
+
+def test_download_welcome_letter_saved(db_session, make_member, make_membership):
+    member = make_member(city="SaveCity")
+    make_membership(member=member, year=2025, amount=0)
+    url = f"/members/members/{member.id}/welcome_letter.pdf"
+
+    saved = client.get(url, params={"save": True})
+
+    assert saved.status_code == 200
+    assert (LETTERS_DIR / f"welcome_letter_{member.reference_number}.pdf").exists()
+
+    # Served from the file on disk from now on, with the same ETag
+    cached = client.get(url, headers={"Range": "bytes=0-3"})
+    assert cached.status_code == 206
+    assert cached.content == b"%PDF"
+    assert cached.headers["etag"] == saved.headers["etag"]
+
+
+def test_download_welcome_letter_render_timeout(
+    db_session, make_member, make_membership, monkeypatch
+):
+    member = make_member(city="SlowCity")
+    make_membership(member=member, year=2025, amount=0)
+    monkeypatch.setattr(settings, "LETTER_RENDER_TIMEOUT", 0.1)
+    # A render that never finishes
+    monkeypatch.setattr(letter_jobs, "call", lambda fn, *args: Future())
+
+    response = client.get(f"/members/members/{member.id}/welcome_letter.pdf")
+
+    assert response.status_code == 504
@@ -0,0 +1,77 @@
+# tests/test_letter_candidates.py
+
+from pdf.candidates import iter_letter_candidates, letter_candidates_query
+
+
+def test_candidates_are_unpaid_memberships(db_session, make_member, make_membership):
+    unpaid = make_member(city="CandidateCity", postal_code="33100")
+    make_membership(member=unpaid, year=2025, amount=0)
+    make_membership(member=unpaid, year=2024, amount=25)
+    paid = make_member(city="CandidateCity", postal_code="33200")
+    make_membership(member=paid, year=2025, amount=25)
+
+    stmt = letter_candidates_query(city="candidatecity")
+    contexts = list(iter_letter_candidates(db_session, stmt, batch_size=1))
+
+    assert contexts == [
+        {
+            "member": {
+                "first_name": unpaid.first_name,
+                "last_name": unpaid.last_name,
+                "street_address": None,
+                "postal_code": "33100",
+                "city": "CandidateCity",
+                "reference_number": unpaid.reference_number,
+            },
+            "membership": {"year": 2025},
+        }
+    ]
+
+
+def test_candidates_filters(db_session, make_member, make_membership):
+    for postal_code in ("40100", "40200", "40300"):
+        member = make_member(city="FilterCity", postal_code=postal_code)
+        make_membership(member=member, year=2025, amount=0)
+        make_membership(member=member, year=2026, amount=0)
+
+    stmt = letter_candidates_query(
+        year=2026,
+        city="FilterCity",
+        postal_code_from="40150",
+        postal_code_to="40300",
+    )
+    contexts = list(iter_letter_candidates(db_session, stmt))
+
+    assert [c["member"]["postal_code"] for c in contexts] == ["40200", "40300"]
+    assert {c["membership"]["year"] for c in contexts} == {2026}
+
+
+def test_print_run_candidates_skip_no_postal_mail_and_sort(
+    db_session, make_member, make_membership
+):
+    for postal_code, no_postal_mail in (
+        ("50300", False),
+        ("50100", False),
+        ("50200", True),
+    ):
+        member = make_member(
+            city="PrintCity", postal_code=postal_code, no_postal_mail=no_postal_mail
+        )
+        make_membership(member=member, year=2025, amount=0)
+
+    stmt = letter_candidates_query(
+        city="PrintCity", postal_mail_only=True, sort_by_postal_code=True
+    )
+    contexts = list(iter_letter_candidates(db_session, stmt))
+
+    assert [c["member"]["postal_code"] for c in contexts] == ["50100", "50300"]
+
+
+def test_candidates_city_is_not_a_like_pattern(
+    db_session, make_member, make_membership
+):
+    make_membership(member=make_member(city="PatternCity"), year=2025, amount=0)
+
+    for city in ["Pattern%", "PatternCit_", "%"]:
+        stmt = letter_candidates_query(city=city)
+        assert list(iter_letter_candidates(db_session, stmt)) == []
@@ -0,0 +1,36 @@
+# tests/test_letter_renderer.py
+
+import os
+
+from pdf.generate_welcome_letter import LetterRenderer
+
+MEMBER = {
+    "first_name": "Render",
+    "last_name": "Test",
+    "street_address": None,
+    "postal_code": "00100",
+    "city": "Helsinki",
+    "reference_number": 2000000001,
+}
+
+
+def test_renderer_reuses_parsed_stylesheet():
+    renderer = LetterRenderer()
+
+    pdf = renderer.write_pdf(MEMBER, {"year": 2025})
+
+    assert pdf.startswith(b"%PDF")
+    assert renderer.stylesheet() is renderer.stylesheet()
+
+
+def test_renderer_reparses_changed_stylesheet(tmp_path):
+    renderer = LetterRenderer()
+    renderer.stylesheet_path = tmp_path / "letter.css"
+    renderer.stylesheet_path.write_text("body { font-size: 10pt; }")
+    first = renderer.stylesheet()
+
+    renderer.stylesheet_path.write_text("body { font-size: 12pt; }")
+    stat = renderer.stylesheet_path.stat()
+    os.utime(renderer.stylesheet_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    assert renderer.stylesheet() is not first
@@ -0,0 +1,65 @@
+# tests/test_logging_config.py
+
+import json
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from logging_config import (
+    CorrelationIdFilter,
+    CorrelationIdMiddleware,
+    JsonFormatter,
+    SamplingFilter,
+    correlation_id,
+)
+
+
+def make_record(msg="hello %s", args=("world",), **extra):
+    record = logging.makeLogRecord(
+        {"name": "test", "levelname": "INFO", "msg": msg, "args": args}
+    )
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extras_and_correlation_id():
+    record = make_record(route="GET /x", duration_ms=1.5)
+    token = correlation_id.set("abc123")
+    try:
+        CorrelationIdFilter().filter(record)
+    finally:
+        correlation_id.reset(token)
+
+    document = json.loads(JsonFormatter().format(record))
+    assert document["message"] == "hello world"
+    assert document["level"] == "INFO"
+    assert document["correlation_id"] == "abc123"
+    assert document["route"] == "GET /x"
+    assert document["duration_ms"] == 1.5
+    assert "args" not in document
+
+
+def test_sampling_filter_only_applies_to_sampled_records():
+    sampling = SamplingFilter()
+    assert sampling.filter(make_record())
+    assert sampling.filter(make_record(sample_rate=1.0))
+    assert not sampling.filter(make_record(sample_rate=0.0))
+
+
+def test_middleware_reuses_or_generates_request_id():
+    app = FastAPI()
+    app.add_middleware(CorrelationIdMiddleware)
+    seen = []
+
+    @app.get("/")
+    def index():
+        seen.append(correlation_id.get())
+        return {}
+
+    client = TestClient(app)
+    resp = client.get("/", headers={"X-Request-ID": "req-1"})
+    assert resp.headers["x-request-id"] == "req-1"
+
+    resp = client.get("/")
+    assert len(resp.headers["x-request-id"]) == 32
+    assert seen == ["req-1", resp.headers["x-request-id"]]
@@ -0,0 +1,102 @@
+# tests/test_member_export.py
+
+import csv
+import io
+import json
+from datetime import date
+
+from bulk.export import (
+    MEMBER_EXPORT_FIELDS,
+    MEMBERSHIP_EXPORT_FIELDS,
+    encode_export,
+    export_query,
+    iter_export_records,
+)
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def member_record(**values) -> dict:
+    return {**dict.fromkeys(MEMBER_EXPORT_FIELDS), **values}
+
+
+def test_encode_ndjson():
+    record = member_record(id=1, created_at=date(2025, 1, 2), memberships=[])
+
+    lines = b"".join(encode_export([record, record], "ndjson", "nested")).splitlines()
+
+    assert len(lines) == 2
+    assert json.loads(lines[0])["created_at"] == "2025-01-02"
+
+
+def test_encode_csv_layouts():
+    flat = member_record(id=1, first_name="Aino", year=2025, amount=0)
+    flat.update({"is_paid": False, "discounted": False})
+    nested = member_record(id=1, memberships=[{"year": 2025}])
+
+    flat_rows = list(
+        csv.DictReader(
+            io.StringIO(b"".join(encode_export([flat], "csv", "flat")).decode())
+        )
+    )
+    nested_rows = list(
+        csv.DictReader(
+            io.StringIO(b"".join(encode_export([nested], "csv", "nested")).decode())
+        )
+    )
+
+    assert list(flat_rows[0]) == [*MEMBER_EXPORT_FIELDS, *MEMBERSHIP_EXPORT_FIELDS]
+    assert flat_rows[0]["first_name"] == "Aino"
+    assert flat_rows[0]["email"] == ""
+    assert json.loads(nested_rows[0]["memberships"]) == [{"year": 2025}]
+
+
+def test_export_records_filters_and_nests(db_session, make_member, make_membership):
+    both = make_member(city="ExportCity")
+    make_membership(member=both, year=2024, amount=25)
+    make_membership(member=both, year=2025, amount=0)
+    make_member(city="ExportCity")  # No memberships
+
+    nested = list(
+        iter_export_records(db_session, export_query(city="exportcity"), "nested")
+    )
+    assert [len(r["memberships"]) for r in nested] == [2, 0]
+
+    unpaid = list(
+        iter_export_records(
+            db_session, export_query(is_paid=False, city="ExportCity"), "flat"
+        )
+    )
+    assert [(r["id"], r["year"]) for r in unpaid] == [(both.id, 2025)]
+
+
+def test_export_city_is_not_a_like_pattern(db_session, make_member):
+    make_member(city="PatternCity")
+
+    for city in ["Pattern%", "PatternCit_", "%"]:
+        stmt = export_query(city=city)
+        assert list(iter_export_records(db_session, stmt)) == []
+
+
+def test_export_endpoint_streams_ndjson(make_member, make_membership):
+    member = make_member(city="StreamExportCity")
+    make_membership(member=member, year=2025, amount=25)
+
+    response = client.get(
+        "/members/export",
+        params={"format": "ndjson", "layout": "nested", "city": "StreamExportCity"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "attachment" in response.headers["content-disposition"]
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["id"] for r in records] == [member.id]
+    assert records[0]["memberships"][0]["is_paid"] is True
+
+
+def test_export_endpoint_rejects_unknown_format():
+    assert client.get("/members/export", params={"format": "xlsx"}).status_code == 422
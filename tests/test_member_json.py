@@ -0,0 +1,39 @@
+# tests/test_member_json.py
+
+import json
+
+from api.member_json import member_body, page_document_query, search_body
+from api.pagination import PageParams, decode_cursor
+from models import Member
+from sqlalchemy.dialects import postgresql
+
+
+def test_page_query_builds_documents_in_one_statement():
+    stmt = page_document_query(
+        Member.city == "Oulu", (Member.city, Member.id), PageParams(limit=2)
+    )
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert sql.count("SELECT") == 2  # The page subquery and the documents
+    assert "json_agg(json_build_object('year', memberships.year" in sql
+    assert "ORDER BY memberships.year" in sql
+    assert "LEFT OUTER JOIN memberships" in sql
+
+
+def test_search_body_wraps_documents_and_cursor():
+    docs = ['{"id" : 1}', '{"id" : 2}', '{"id" : 3}']
+    rows = [(doc, "Oulu", i + 1) for i, doc in enumerate(docs)]
+
+    body = json.loads(search_body("in city 'Oulu'", rows, PageParams(limit=2)))
+    assert body["message"] == "Found 2 member(s) in city 'Oulu'."
+    assert body["results"] == [{"id": 1}, {"id": 2}]
+    assert decode_cursor(body["next_cursor"], (str, int)) == ("Oulu", 2)
+    assert body["total"] is None
+
+    last = json.loads(search_body("x", rows[:1], PageParams(limit=2), total=1))
+    assert last["next_cursor"] is None
+    assert last["total"] == 1
+
+
+def test_member_body():
+    body = json.loads(member_body("Found ä", '{"id" : 1, "memberships" : []}'))
+    assert body == {"message": "Found ä", "member": {"id": 1, "memberships": []}}
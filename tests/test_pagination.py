@@ -0,0 +1,35 @@
+# tests/test_pagination.py
+
+import pytest
+from api.pagination import decode_cursor, encode_cursor
+from fastapi import HTTPException
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(("Mäkinen Aino", 42))
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, (str, int)) == ("Mäkinen Aino", 42)
+
+
+def test_float_key_accepts_integral_values():
+    assert decode_cursor(encode_cursor((0, 7)), (float, int)) == (0, 7)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        encode_cursor((1,)),
+        "e30",
+        encode_cursor(("x", "abc")),
+        encode_cursor(("x", True)),
+        encode_cursor(("x", None)),
+        encode_cursor(("x\x00", 1)),
+        encode_cursor((1.5, 1)),
+    ],
+)
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, (str, int))
+    assert exc.value.status_code == 400
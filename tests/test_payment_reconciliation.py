@@ -0,0 +1,115 @@
+# tests/test_payment_reconciliation.py
+
+import pytest
+from database import get_db
+from fastapi.testclient import TestClient
+from models import Membership
+
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def override_get_db(db_session):
+    def _override():
+        yield db_session
+
+    app.dependency_overrides[get_db] = _override
+
+
+def test_reconcile_csv_statement(db_session, make_member, make_membership):
+    unpaid = make_member()
+    make_membership(member=unpaid, year=2031, amount=0)
+    no_membership_yet = make_member()
+    statement = (
+        "date,amount,payer,reference\n"
+        f"2031-02-01,25.00,Payer One,{unpaid.reference_number}\n"
+        f'2031-02-02,"10,00",Payer Two,RF18{no_membership_yet.reference_number}\n'
+        f"2031-02-03,25.00,Payer One,{unpaid.reference_number}\n"
+        "2031-02-04,25.00,Stranger,1999999999\n"
+        "2031-02-05,25.00,No Reference,\n"
+    )
+
+    response = client.post(
+        "/members/payments/reconcile?year=2031",
+        content=statement.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["payments"] == 5
+    assert report["counts"]["updated"] == 1
+    assert report["counts"]["created"] == 1
+    assert [p["position"] for p in report["duplicates"]] == [4]
+    assert [p["reference"] for p in report["unmatched"]] == ["1999999999"]
+    assert report["invalid"][0]["error"] == "No reference number"
+
+    db_session.expire_all()
+    paid = db_session.query(Membership).filter_by(member_id=unpaid.id, year=2031).one()
+    assert (paid.amount, paid.is_paid, paid.discounted) == (25, True, False)
+    created = (
+        db_session.query(Membership)
+        .filter_by(member_id=no_membership_yet.id, year=2031)
+        .one()
+    )
+    assert (created.amount, created.discounted) == (10, True)
+
+
+def test_reconcile_never_lowers_a_recorded_amount(
+    db_session, make_member, make_membership
+):
+    paid = make_member()
+    make_membership(member=paid, year=2032, amount=25)
+    statement = f"amount,reference\n10.00,{paid.reference_number}\n"
+
+    response = client.post(
+        "/members/payments/reconcile?year=2032",
+        content=statement.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["counts"]["lower_amount"] == 1
+    assert [p["amount"] for p in report["lower_amounts"]] == ["10.00"]
+    db_session.expire_all()
+    kept = db_session.query(Membership).filter_by(member_id=paid.id, year=2032).one()
+    assert (kept.amount, kept.is_paid) == (25, True)
+
+
+def test_reconcile_drops_cents_and_repeats_unmatched(
+    db_session, make_member, make_membership
+):
+    member = make_member()
+    make_membership(member=member, year=2033, amount=0)
+    statement = (
+        "amount,reference\n"
+        f"24.50,{member.reference_number}\n"
+        "25.00,1999999999\n"
+        "25.00,1999999999\n"
+    )
+
+    response = client.post(
+        "/members/payments/reconcile?year=2033",
+        content=statement.encode(),
+        headers={"Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert [p["position"] for p in report["unmatched"]] == [3, 4]
+    assert report["duplicates"] == []
+    db_session.expire_all()
+    paid = db_session.query(Membership).filter_by(member_id=member.id, year=2033).one()
+    assert paid.amount == 24
+
+
+def test_reconcile_rejects_statement_without_columns():
+    response = client.post(
+        "/members/payments/reconcile",
+        content=b"foo,bar\n1,2\n",
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 400
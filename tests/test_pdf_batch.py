@@ -0,0 +1,62 @@
+# tests/test_pdf_batch.py
+
+import pdf.batch
+from jinja2 import TemplateError
+from pdf.batch import render_letters
+
+
+def make_context(reference_number: int) -> dict:
+    return {
+        "member": {
+            "first_name": "Batch",
+            "last_name": "Member",
+            "street_address": "Testikatu 1",
+            "postal_code": "00100",
+            "city": "Helsinki",
+            "reference_number": reference_number,
+        },
+        "membership": {"year": 2025},
+    }
+
+
+def test_failed_letter_does_not_stop_batch(tmp_path, monkeypatch):
+    def fake_render(context, output_dir, log_sample_rate=None):
+        if context["member"]["reference_number"] == 2:
+            raise TemplateError("broken template")
+        return output_dir / "ok.pdf"
+
+    monkeypatch.setattr(pdf.batch, "render_letter", fake_render)
+
+    progress = []
+    report = render_letters(
+        [make_context(n) for n in range(1, 6)],
+        tmp_path,
+        workers=1,
+        chunk_size=2,
+        on_progress=lambda r: progress.append(r.processed),
+    )
+
+    assert report.generated == 4
+    assert [f.reference_number for f in report.failures] == [2]
+    assert "broken template" in report.failures[0].error
+    assert progress == [2, 4, 5]
+
+
+def test_parallel_render_writes_every_letter(tmp_path):
+    contexts = [make_context(3000000100 + n) for n in range(4)]
+
+    report = render_letters(
+        contexts, tmp_path, workers=2, chunk_size=1, recycle_after=2
+    )
+
+    assert report.generated == 4
+    assert not report.failures
+    for context in contexts:
+        reference_number = context["member"]["reference_number"]
+        assert (tmp_path / f"welcome_letter_{reference_number}.pdf").exists()
+
+
+def test_chunks_are_cut_at_alignment_boundaries():
+    chunks = [len(chunk) for chunk in pdf.batch._chunks(range(10), 4, align=5)]
+    assert chunks == [4, 1, 4, 1]
+    assert [len(chunk) for chunk in pdf.batch._chunks(range(10), 4)] == [4, 4, 2]
@@ -0,0 +1,49 @@
+# tests/test_pdf_cache.py
+
+from pdf.cache import LetterCache, render_key
+
+
+def write_letter(cache: LetterCache, filename: str, key: str, size: int = 10):
+    (cache.output_dir / filename).write_bytes(b"%" * size)
+    cache.store(filename, key)
+
+
+def test_render_key_tracks_context_and_template(tmp_path):
+    template = tmp_path / "letter.jinja2"
+    template.write_text("v1")
+    context = {"member": {"reference_number": 1}, "membership": {"year": 2025}}
+
+    key = render_key(context, [template])
+    assert key == render_key(dict(context), [template])
+
+    changed = {"member": {"reference_number": 1}, "membership": {"year": 2026}}
+    assert render_key(changed, [template]) != key
+
+    template.write_text("v2 with another size")
+    assert render_key(context, [template]) != key
+
+
+def test_lookup_hits_only_for_same_key(tmp_path):
+    cache = LetterCache(tmp_path, max_bytes=0)
+
+    assert cache.lookup("a.pdf", "k1") is None
+    write_letter(cache, "a.pdf", "k1")
+
+    assert cache.lookup("a.pdf", "k1") == tmp_path / "a.pdf"
+    assert cache.lookup("a.pdf", "k2") is None
+
+    (tmp_path / "a.pdf").unlink()
+    assert cache.lookup("a.pdf", "k1") is None
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    cache = LetterCache(tmp_path, max_bytes=25)
+    write_letter(cache, "a.pdf", "ka")
+    write_letter(cache, "b.pdf", "kb")
+    assert cache.lookup("a.pdf", "ka")  # a is now more recent than b
+
+    write_letter(cache, "c.pdf", "kc")
+
+    assert not (tmp_path / "b.pdf").exists()
+    assert cache.lookup("a.pdf", "ka")
+    assert cache.lookup("c.pdf", "kc")
@@ -0,0 +1,74 @@
+# tests/test_pdf_jobs.py
+
+import os
+import time
+
+import pytest
+from pdf.jobs import JobQueue, JobState
+
+
+@pytest.fixture
+def queue():
+    q = JobQueue(workers=1, recycle_after=10, history=2)
+    yield q
+    q.shutdown()
+
+
+def wait_until_finished(queue: JobQueue, job_id: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while queue.get(job_id).state is JobState.QUEUED:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.05)
+    return queue.get(job_id)
+
+
+def test_pending_jobs_with_same_key_are_shared(queue):
+    first = queue.submit("member:1", time.sleep, 0.5)
+    second = queue.submit("member:1", time.sleep, 0.5)
+    other = queue.submit("member:2", time.sleep, 0)
+
+    assert first is second
+    assert other is not first
+    assert wait_until_finished(queue, first.id).state is JobState.DONE
+
+    third = queue.submit("member:1", time.sleep, 0)
+    assert third is not first
+
+
+def test_failed_job_reports_error(queue):
+    job = queue.submit("missing", os.stat, "/no/such/file")
+
+    job = wait_until_finished(queue, job.id)
+    assert job.state is JobState.FAILED
+    assert "FileNotFoundError" in job.error
+    assert job.to_dict()["state"] == "failed"
+
+
+def test_history_forgets_oldest_finished_jobs(queue):
+    jobs = [queue.submit(f"job:{n}", time.sleep, 0) for n in range(3)]
+    for job in jobs:
+        wait_until_finished(queue, job.id)
+
+    queue.submit("job:3", time.sleep, 0)
+
+    assert queue.get(jobs[0].id) is None
+    assert queue.get(jobs[2].id) is not None
+
+
+def test_call_returns_untracked_future(queue):
+    future = queue.call(os.getpid)
+
+    assert future.result(timeout=30) != os.getpid()
+    assert not queue._jobs
+
+
+def mark_worker_warm():
+    os.environ["PDF_JOBS_TEST_WARM"] = "1"
+
+
+def test_start_replaces_a_pool_created_without_the_initializer(queue):
+    assert queue.call(os.getenv, "PDF_JOBS_TEST_WARM").result(timeout=30) is None
+
+    queue.start(initializer=mark_worker_warm)
+
+    assert queue.call(os.getenv, "PDF_JOBS_TEST_WARM").result(timeout=30) == "1"
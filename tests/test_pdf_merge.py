@@ -0,0 +1,38 @@
+# tests/test_pdf_merge.py
+
+from pdf.merge import merge_pdfs
+from pypdf import PdfReader, PdfWriter
+
+
+def write_pdf(path, widths):
+    writer = PdfWriter()
+    for width in widths:
+        writer.add_blank_page(width=width, height=500)
+    writer.write(path)
+    return path
+
+
+def test_merge_keeps_every_page_in_order(tmp_path):
+    inputs = [
+        write_pdf(tmp_path / "a.pdf", [100, 101]),
+        write_pdf(tmp_path / "b.pdf", [200]),
+        write_pdf(tmp_path / "c.pdf", [300, 301, 302]),
+    ]
+
+    pages = merge_pdfs(inputs, tmp_path / "out" / "merged.pdf")
+
+    reader = PdfReader(tmp_path / "out" / "merged.pdf", strict=True)
+    assert pages == 6
+    assert [int(page.mediabox.width) for page in reader.pages] == [
+        100,
+        101,
+        200,
+        300,
+        301,
+        302,
+    ]
+
+
+def test_merge_of_nothing_is_an_empty_document(tmp_path):
+    assert merge_pdfs([], tmp_path / "empty.pdf") == 0
+    assert len(PdfReader(tmp_path / "empty.pdf").pages) == 0
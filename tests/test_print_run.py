@@ -0,0 +1,59 @@
+# tests/test_print_run.py
+
+from pdf.print_run import render_print_run
+from pypdf import PdfReader
+
+
+def make_context(reference_number: int, postal_code: str) -> dict:
+    return {
+        "member": {
+            "first_name": "Print",
+            "last_name": "Run",
+            "street_address": "Postikatu 2",
+            "postal_code": postal_code,
+            "city": "Helsinki",
+            "reference_number": reference_number,
+        },
+        "membership": {"year": 2025},
+    }
+
+
+def test_print_run_single_volume(tmp_path):
+    contexts = [make_context(3000000200 + n, f"0010{n}") for n in range(3)]
+
+    report = render_print_run(contexts, tmp_path, "run", chunk_size=2)
+
+    assert report.generated == 3
+    assert report.volumes == [tmp_path / "run.pdf"]
+    assert len(PdfReader(report.volumes[0]).pages) == report.pages
+    assert report.pages >= 3
+    # Intermediate chunk files are cleaned up
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["run.pdf"]
+
+
+def test_print_run_volumes_and_failures(tmp_path):
+    contexts = [make_context(3000000300 + n, f"0020{n}") for n in range(5)]
+    contexts[1] = {"member": {"reference_number": 42}}  # no membership: fails
+
+    report = render_print_run(
+        contexts, tmp_path, "run", workers=2, chunk_size=2, volume_size=2
+    )
+
+    assert report.generated == 4
+    assert [f.reference_number for f in report.failures] == [42]
+    assert [p.name for p in report.volumes] == [
+        "run_001.pdf",
+        "run_002.pdf",
+        "run_003.pdf",
+    ]
+
+
+def test_print_run_volumes_hold_volume_size_letters(tmp_path):
+    contexts = [make_context(3000000400 + n, f"0030{n}") for n in range(7)]
+
+    report = render_print_run(contexts, tmp_path, "run", chunk_size=2, volume_size=3)
+
+    # Chunks are cut at volume boundaries: 3 + 3 + 1 letters, not 4 + 3
+    pages = [len(PdfReader(volume).pages) for volume in report.volumes]
+    per_letter = report.pages // 7
+    assert pages == [3 * per_letter, 3 * per_letter, per_letter]
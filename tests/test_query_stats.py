@@ -0,0 +1,54 @@
+# tests/test_query_stats.py
+
+import pytest
+from config import settings
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from query_stats import QueryStatsMiddleware, track_queries
+from sqlalchemy import create_engine, text
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_track_queries_counts_statements_of_the_block(engine):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        with track_queries() as stats:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        conn.execute(text("SELECT 3"))
+    assert stats.count == 2
+    assert stats.duration > 0
+
+
+def test_middleware_labels_by_route_and_sends_server_timing(engine, monkeypatch):
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    labels = {"method": "GET", "route": "/items/{item_id}"}
+    before = REGISTRY.get_sample_value("http_request_db_queries_sum", labels) or 0
+
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", True)
+    resp = TestClient(app).get("/items/7")
+    assert resp.status_code == 200
+    assert resp.headers["server-timing"].startswith("db;dur=")
+    assert 'desc="2 queries' in resp.headers["server-timing"]
+    assert REGISTRY.get_sample_value("http_request_db_queries_sum", labels) == (
+        before + 2
+    )
+
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", False)
+    assert "server-timing" not in TestClient(app).get("/items/7").headers
@@ -0,0 +1,104 @@
+# tests/test_routes_async.py
+import uuid
+
+import httpx
+import pytest
+import pytest_asyncio
+from api.routes_member_async import router as member_async_router
+from api.routes_membership_async import router as membership_async_router
+from database import async_engine
+from fastapi import FastAPI
+
+app = FastAPI()
+app.include_router(member_async_router)
+app.include_router(membership_async_router)
+
+
+@pytest_asyncio.fixture
+async def client():
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+    # Pooled connections belong to this test's event loop
+    await async_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_search_by_city_pages_with_memberships(
+    client, make_member, make_membership
+):
+    city = f"Async-{uuid.uuid4().hex[:8]}"
+    first = make_member(first_name="Aino", city=city)
+    make_membership(member=first, year=2024, amount=25)
+    make_member(first_name="Eino", city=city)
+
+    resp = await client.get(f"/members/search/city/{city}", params={"limit": 1})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [m["first_name"] for m in data["results"]] == ["Aino"]
+    assert data["results"][0]["memberships"][0]["is_paid"] is True
+
+    resp = await client.get(
+        f"/members/search/city/{city}",
+        params={"limit": 1, "cursor": data["next_cursor"], "count": True},
+    )
+    data = resp.json()
+    assert [m["first_name"] for m in data["results"]] == ["Eino"]
+    assert data["next_cursor"] is None
+    assert data["total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_member_by_reference(client, make_member, make_membership):
+    member = make_member()
+    make_membership(member=member, year=2025, amount=0)
+
+    resp = await client.get(f"/members/search/{member.reference_number}")
+    assert resp.status_code == 200
+    assert resp.json()["member"]["memberships"] == [
+        {"year": 2025, "amount": 0, "is_paid": False, "discounted": False}
+    ]
+
+    resp = await client.get("/members/search/reference/0")
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_register_update_and_delete_member(client):
+    payload = {
+        "first_name": "Helmi",
+        "last_name": "Async",
+        "city": "Oulu",
+        "email": f"async_{uuid.uuid4().hex}@example.com",
+    }
+    resp = await client.post("/members/new_member", json=payload)
+    assert resp.status_code == 201
+    member = resp.json()["member"]
+    assert member["reference_number"]
+    assert len(member["memberships"]) == 1
+
+    resp = await client.put(f"/members/{member['id']}", json={"last_name": "Sync"})
+    assert resp.status_code == 200
+    assert resp.json()["member"]["last_name"] == "Sync"
+
+    resp = await client.delete(f"/members/members/{member['id']}")
+    assert resp.status_code == 200
+    resp = await client.put(f"/members/{member['id']}", json={"city": "Turku"})
+    assert resp.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_create_membership_conflict(client, make_member):
+    member = make_member()
+    payload = {"year": 2025, "amount": 10}
+
+    resp = await client.post(f"/members/{member.id}/memberships", json=payload)
+    assert resp.status_code == 201
+    assert resp.json()["membership"]["is_paid"] is True
+
+    resp = await client.post(f"/members/{member.id}/memberships", json=payload)
+    assert resp.status_code == 409
+
+    resp = await client.post("/members/999999/memberships", json=payload)
+    assert resp.status_code == 404
@@ -1,9 +1,14 @@
 # tests/test_routes_member_search.py
 
+import uuid
+
 import pytest
+from api.member_common import prefix_tsquery
+from cache import members_changed
 from database import get_db
 from fastapi.testclient import TestClient
 from models import Member, Membership
+from schemas import MemberResponse
 
 from app.main import app
 
@@ -97,3 +102,215 @@ def test_search_by_postal_code(db_session, make_member):
     payload = resp.json()
     assert payload["message"].startswith("Found")
     assert len(payload.get("results", [])) == 2
+
+
+def test_search_treats_like_wildcards_literally(db_session, make_member):
+    make_member(first_name="Per%cent", last_name="Wild", city="Wild_City")
+    make_member(first_name="Percy", last_name="Wild", city="WildXCity")
+
+    by_name = client.get("/members/search/name/r%25c").json()
+    assert [m["first_name"] for m in by_name["results"]] == ["Per%cent"]
+
+    by_city = client.get("/members/search/city/wild_city").json()
+    assert [m["city"] for m in by_city["results"]] == ["Wild_City"]
+
+
+def test_search_pages_with_cursor(db_session, make_member):
+    names = ["Ada", "Bea", "Cid", "Dan", "Eve"]
+    for first_name in names:
+        make_member(first_name=first_name, last_name="Pager", city="PageCity")
+
+    first = client.get("/members/search/city/PageCity?limit=2&count=true").json()
+    assert first["total"] == 5
+    assert [m["first_name"] for m in first["results"]] == names[:2]
+
+    seen = [m["first_name"] for m in first["results"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get(
+            "/members/search/city/PageCity", params={"limit": 2, "cursor": cursor}
+        ).json()
+        assert page["total"] is None
+        seen += [m["first_name"] for m in page["results"]]
+        cursor = page["next_cursor"]
+
+    # Same city for all, so the id decides the order
+    assert seen == names
+
+
+def test_member_lookups_run_one_query(db_session, make_member, assert_max_queries):
+    m = create_member_with_two(db_session, make_member)
+    db_session.expire_all()
+
+    with assert_max_queries(1):
+        resp = client.get(f"/members/search/{m.reference_number}")
+    assert len(resp.json()["member"]["memberships"]) == 2
+
+    db_session.expire_all()
+    with assert_max_queries(1):
+        resp = client.get(f"/members/search/reference/{m.reference_number}")
+    assert len(resp.json()["member"]["memberships"]) == 2
+
+
+def test_search_loads_memberships_without_n_plus_one(
+    db_session, make_member, make_membership, assert_max_queries
+):
+    city = f"Batch-{uuid.uuid4().hex[:8]}"
+    for first_name in ["Ada", "Bea", "Cid", "Dan"]:
+        make_membership(member=make_member(first_name=first_name, city=city))
+    db_session.expire_all()
+
+    # The page and the memberships of all its members
+    with assert_max_queries(2):
+        resp = client.get(f"/members/search/city/{city}")
+    results = resp.json()["results"]
+    assert len(results) == 4
+    assert all(len(m["memberships"]) == 1 for m in results)
+
+
+def test_search_documents_match_member_response(db_session, make_member):
+    m = create_member_with_two(db_session, make_member)
+    expected = MemberResponse.model_validate(m).model_dump()
+
+    resp = client.get(f"/members/search/reference/{m.reference_number}")
+    assert resp.headers["content-type"] == "application/json"
+    assert resp.json()["member"] == expected
+
+    city = client.get("/members/search/full_name/Alice Wonder").json()
+    assert expected in city["results"]
+    # Memberships come oldest first
+    assert [ms["year"] for ms in expected["memberships"]] == [2023, 2024]
+
+
+def test_search_rejects_bad_pagination_params():
+    assert client.get("/members/search/city/x?limit=0").status_code == 422
+    assert client.get("/members/search/city/x?cursor=garbage").status_code == 400
+
+
+def test_prefix_tsquery():
+    assert prefix_tsquery("anna virt") == "anna:* & virt:*"
+    assert prefix_tsquery("x' | !y & (z)") == "x:* & y:* & z:*"
+    assert prefix_tsquery("--") is None
+
+
+def test_full_text_search_ranks_and_matches_prefixes(db_session, make_member):
+    by_note = make_member(
+        first_name="Otto", last_name="Noted", notes="Met Quillfeather at the fair"
+    )
+    by_name = make_member(first_name="Quillfeather", last_name="Named")
+    make_member(first_name="Otto", last_name="Unrelated")
+
+    resp = client.get("/members/search", params={"q": "quillfea", "count": True})
+
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert payload["total"] == 2
+    assert [m["id"] for m in payload["results"]] == [by_name.id, by_note.id]
+
+    first = client.get("/members/search", params={"q": "quillfea", "limit": 1})
+    cursor = first.json()["next_cursor"]
+    second = client.get(
+        "/members/search", params={"q": "quillfea", "limit": 1, "cursor": cursor}
+    ).json()
+    assert [m["id"] for m in second["results"]] == [by_note.id]
+    assert second["next_cursor"] is None
+
+
+def test_full_text_search_pages_through_tied_ranks(db_session, make_member):
+    tied = [make_member(first_name="Tiebreaker", last_name="Same") for _ in range(4)]
+
+    seen = []
+    params = {"q": "tiebreaker", "limit": 1}
+    while True:
+        page = client.get("/members/search", params=params).json()
+        seen += [m["id"] for m in page["results"]]
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+
+    # Equal ranks, so the id decides the order: no member repeated or skipped
+    assert seen == sorted((m.id for m in tied), reverse=True)
+
+
+def test_full_text_search_needs_words():
+    assert client.get("/members/search", params={"q": "&|!"}).status_code == 400
+
+
+def test_reference_lookups_are_cached_until_the_member_changes(
+    db_session, make_member, assert_max_queries
+):
+    m = create_member_with_two(db_session, make_member)
+    client.get(f"/members/search/{m.reference_number}")
+
+    with assert_max_queries(0):
+        resp = client.get(f"/members/search/{m.reference_number}")
+    assert resp.json()["member"]["first_name"] == "Alice"
+
+    client.put(f"/members/{m.id}", json={"first_name": "Alicia"})
+    resp = client.get(f"/members/search/{m.reference_number}")
+    assert resp.json()["member"]["first_name"] == "Alicia"
+
+    client.post(f"/members/{m.id}/memberships", json={"year": 2025, "amount": 25})
+    resp = client.get(f"/members/search/{m.reference_number}")
+    assert [ms["year"] for ms in resp.json()["member"]["memberships"]] == [
+        2023,
+        2024,
+        2025,
+    ]
+
+
+def test_search_pages_are_cached_until_a_member_changes(
+    db_session, make_member, assert_max_queries
+):
+    city = f"Cached-{uuid.uuid4().hex[:8]}"
+    m = make_member(first_name="Ada", city=city)
+    client.get(f"/members/search/city/{city}")
+
+    with assert_max_queries(0):
+        resp = client.get(f"/members/search/city/{city}?limit=50")
+    assert [r["first_name"] for r in resp.json()["results"]] == ["Ada"]
+
+    client.put(f"/members/{m.id}", json={"first_name": "Adele"})
+    resp = client.get(f"/members/search/city/{city}")
+    assert [r["first_name"] for r in resp.json()["results"]] == ["Adele"]
+
+
+def test_reference_lookup_answers_matching_etag_with_304(
+    db_session, make_member, assert_max_queries
+):
+    m = create_member_with_two(db_session, make_member)
+    url = f"/members/search/reference/{m.reference_number}"
+    etag = client.get(url).headers["etag"]
+
+    # From the member cache, without any query
+    with assert_max_queries(0):
+        resp = client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+
+    # Cold cache: the row version alone is read
+    members_changed()
+    with assert_max_queries(1):
+        resp = client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+    # A new membership gives the member a new version
+    client.post(f"/members/{m.id}/memberships", json={"year": 2025, "amount": 25})
+    resp = client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["etag"] != etag
+    assert len(resp.json()["member"]["memberships"]) == 3
+
+
+def test_search_page_answers_matching_etag_with_304(db_session, make_member):
+    city = f"Etag-{uuid.uuid4().hex[:8]}"
+    m = make_member(first_name="Ada", city=city)
+    url = f"/members/search/city/{city}"
+    etag = client.get(url).headers["etag"]
+
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    client.put(f"/members/{m.id}", json={"first_name": "Adele"})
+    resp = client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()["results"][0]["first_name"] == "Adele"
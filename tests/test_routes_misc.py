@@ -33,3 +33,21 @@ def test_misc_endpoints(path, expected):
     resp = client.get(path)
     assert resp.status_code == 200
     assert resp.json() == expected
+
+
+def test_slow_queries_lists_statements_with_route_and_plan(monkeypatch):
+    from database import slow_query_log
+
+    monkeypatch.setattr(slow_query_log, "threshold", 0)
+    monkeypatch.setattr(slow_query_log, "explain_sample_rate", 1.0)
+    slow_query_log.clear()
+
+    client.get("/members/search/city/Nowhere")
+    queries = client.get("/misc/slow_queries").json()["queries"]
+    search = next(q for q in queries if q["route"] == "GET /members/search/city/{city}")
+    assert search["statement"].lstrip().startswith("SELECT")
+    assert set(search["parameters"].values()) <= {"str", "int"}
+    assert "actual time" in search["plan"]
+
+    assert client.delete("/misc/slow_queries").status_code == 200
+    assert client.get("/misc/slow_queries").json()["queries"] == []
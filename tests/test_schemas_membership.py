@@ -3,7 +3,7 @@ from datetime import datetime
 
 import pytest
 from pydantic import ValidationError
-from schemas import MembershipCreate, MembershipResponse
+from schemas import MembershipCreate, MembershipResponse, MembershipUpsert
 
 
 def test_membership_create_defaults_year_and_amount():
@@ -28,3 +28,12 @@ def test_membership_response_model():
     assert resp.year == 2023
     assert resp.is_paid
     assert resp.discounted is False
+
+
+def test_membership_upsert_needs_exactly_one_member_key():
+    assert MembershipUpsert(member_id=1, year=2025, amount=0).member_id == 1
+    assert MembershipUpsert(reference_number=2000000001, year=2025, amount=25)
+    with pytest.raises(ValidationError):
+        MembershipUpsert(year=2025, amount=25)
+    with pytest.raises(ValidationError):
+        MembershipUpsert(member_id=1, reference_number=2000000001, year=2025, amount=0)
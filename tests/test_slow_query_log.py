@@ -0,0 +1,54 @@
+# tests/test_slow_query_log.py
+
+import pytest
+from database import SlowQueryLog, parameters_shape
+from sqlalchemy import create_engine, text
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_parameters_shape_hides_values():
+    assert parameters_shape({"name": "Aino", "id": 3}) == {"name": "str", "id": "int"}
+    assert parameters_shape(("Aino", None)) == ["str", "NoneType"]
+    assert parameters_shape([("a",), ("b",)], executemany=True) == {
+        "rows": 2,
+        "each": ["str"],
+    }
+
+
+def test_records_statements_over_threshold_in_a_ring_buffer(engine):
+    log = SlowQueryLog(threshold_ms=0, explain_sample_rate=1.0, size=2)
+    log.attach(engine)
+    try:
+        with engine.connect() as conn:
+            for n in range(3):
+                conn.execute(text("SELECT :n"), {"n": n})
+    finally:
+        log.detach(engine)
+
+    records = log.snapshot()
+    assert len(records) == 2
+    assert records[0]["statement"] == "SELECT ?"
+    assert records[0]["parameters"] == ["int"]
+    assert records[0]["route"] is None
+    # Plans are only captured on PostgreSQL
+    assert records[0]["plan"] is None
+
+    log.clear()
+    assert log.snapshot() == []
+
+
+def test_fast_statements_are_not_recorded(engine):
+    log = SlowQueryLog(threshold_ms=60_000, explain_sample_rate=1.0, size=10)
+    log.attach(engine)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    finally:
+        log.detach(engine)
+    assert log.snapshot() == []